@@ -0,0 +1,684 @@
+"""Performance benchmarks for the create_assign_material addon.
+
+Run headless with blender, e.g.:
+
+    blender -b --factory-startup --python benchmark.py -- --faces 100000 1000000 --json timings.json
+
+Pass --compare with an earlier json file to see the speedup between commits.
+
+Without blender the benchmarks run under plain CPython on the stand-in bpy of the tests, e.g.:
+
+    python benchmark.py -- --faces 1000 100000 --json timings.json
+
+Only the benchmarks which don't need blender's own geometry or drawing run there (assign, cleanup, names,
+merge, menu and create). Those timings measure the python side of the addon and are only comparable to
+other stand-in runs.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+try:
+    import bpy
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "standin"))
+    import bpy
+STANDIN = getattr(bpy, "standin", False)
+
+import bmesh
+import numpy as np
+
+from mathutils import Vector
+
+from create_assign_material import core as cam
+from create_assign_material import operators, picking, ui
+
+
+# -------------------------------------
+# Scene helpers
+# -------------------------------------
+
+def make_grid_object(face_count, name="BenchmarkGrid"):
+    """Builds a quad grid with roughly face_count faces in bulk and links it to the scene"""
+    size = max(1, int(np.sqrt(face_count)))
+    xs, ys = np.meshgrid(np.arange(size + 1, dtype=np.float32), np.arange(size + 1, dtype=np.float32))
+    coords = np.stack((xs.ravel(), ys.ravel(), np.zeros(xs.size, dtype=np.float32)), axis=1)
+
+    row = np.arange(size)
+    corner = (row[None, :] + row[:, None] * (size + 1)).ravel()
+    quads = np.stack((corner, corner + 1, corner + size + 2, corner + size + 1), axis=1)
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(coords))
+    mesh.vertices.foreach_set("co", coords.ravel())
+    mesh.loops.add(quads.size)
+    mesh.loops.foreach_set("vertex_index", quads.ravel().astype(np.int32))
+    mesh.polygons.add(len(quads))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, quads.size, 4, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_total", np.full(len(quads), 4, dtype=np.int32))
+    mesh.update(calc_edges=True)
+
+    object = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(object)
+    return object
+
+
+def select_half(mesh):
+    selection = np.zeros(len(mesh.polygons), dtype=bool)
+    selection[::2] = True
+    mesh.polygons.foreach_set("select", selection)
+
+
+def enter_edit_mode(object):
+    bpy.context.view_layer.objects.active = object
+    object.select_set(True)
+    bpy.ops.object.mode_set(mode='EDIT')
+
+
+def leave_edit_mode():
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+
+def remove_object(object):
+    mesh = object.data
+    bpy.data.objects.remove(object)
+    bpy.data.meshes.remove(mesh)
+
+
+# -------------------------------------
+# Reference implementations
+# -------------------------------------
+
+def legacy_apply_material_to_polygons(object, material):
+    """The per face index loop used before the bulk assignment"""
+    bm = bmesh.from_edit_mesh(object.data)
+    bm.faces.ensure_lookup_table()
+    selected_faces = [f.index for f in bm.faces if f.select]
+    material_index = cam.MaterialCreateAssignMethods().get_material_slot(
+        object.data, material, len(bm.faces) == len(selected_faces))
+    for index in selected_faces:
+        bm.faces[index].material_index = material_index
+    bmesh.update_edit_mesh(object.data)
+
+
+def legacy_create_material(name, color, shader):
+    """Builds the node tree from scratch, as create_material did before the templates"""
+    material = bpy.data.materials.new(name=name)
+    material.use_nodes = True
+    material.diffuse_color = color
+    nodes = material.node_tree.nodes
+    shader_node = nodes.get('Principled BSDF')
+    node_types = {"Diffuse": 'ShaderNodeBsdfDiffuse', "Emission": 'ShaderNodeEmission', "PrincipledVolume": 'ShaderNodeVolumePrincipled'}
+    if shader in node_types:
+        nodes.remove(shader_node)
+        shader_node = nodes.new(node_types[shader])
+        material.node_tree.links.new(nodes.get('Material Output').inputs[0], shader_node.outputs[0])
+    shader_node.inputs[0].default_value = color
+    return material
+
+
+def legacy_create_unique_name(name, existing_material_names):
+    """The suffix probing name generator used before the NameAllocator"""
+    while name in existing_material_names:
+        parts = name.split("_")
+        last_part = parts[-1]
+        if last_part.isnumeric():
+            name = "_".join(parts[:-1]) + "_" + str(int(last_part) + 1)
+        else:
+            name = name + "_1"
+    return name
+
+
+def legacy_cleanup_material_slots(object):
+    """The operator round trip used before the native slot cleanup"""
+    bpy.context.view_layer.objects.active = object
+    bpy.ops.object.mode_set(mode='EDIT')
+    bpy.ops.object.mode_set(mode='OBJECT')
+    bpy.ops.object.material_slot_remove_unused()
+
+
+def legacy_menu_names(max_materials):
+    """The per draw material scan used before the cached MaterialIndex"""
+    names = []
+    for material_name, material in bpy.data.materials.items():
+        if material.is_grease_pencil:
+            continue
+        names.append((material_name, type(material.preview) is bpy.types.ImagePreview))
+        if len(names) >= max_materials:
+            break
+    return names
+
+
+# -------------------------------------
+# Benchmarks
+# -------------------------------------
+
+class Results():
+    """Collects timings, prints them and writes them as json for comparisons across commits"""
+
+    def __init__(self):
+        self.entries = []
+
+    def add(self, benchmark, variant, scale, seconds, count):
+        seconds = max(seconds, 1e-9)
+        self.entries.append({
+            "benchmark": benchmark,
+            "variant": variant,
+            "scale": scale,
+            "seconds": seconds,
+            "rate": count / seconds,
+        })
+        print(f"{benchmark:<20} {variant:<16} {scale:>9} | {seconds * 1e3:>11.3f} ms | {count / seconds:>14,.0f} /s")
+
+    def add_memory(self, benchmark, variant, scale, size):
+        self.entries.append({
+            "benchmark": benchmark,
+            "variant": variant,
+            "scale": scale,
+            "bytes": size,
+        })
+        print(f"{benchmark:<20} {variant:<16} {scale:>9} | {size / 2 ** 20:>11.3f} MiB")
+
+    def write(self, filepath):
+        data = {
+            "blender": bpy.app.version_string,
+            "standin": STANDIN,
+            "commit": git_commit(),
+            "results": self.entries,
+        }
+        with open(filepath, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+
+    def compare(self, filepath):
+        with open(filepath, encoding="utf-8") as file:
+            baseline = {(e["benchmark"], e["variant"], e["scale"]): e for e in json.load(file)["results"]}
+
+        print(f"\ncompared to {filepath} (>1 is faster now)")
+        for entry in self.entries:
+            old = baseline.get((entry["benchmark"], entry["variant"], entry["scale"]))
+            if old and "seconds" in old and "seconds" in entry:
+                print(f"{entry['benchmark']:<20} {entry['variant']:<16} {entry['scale']:>9} | {old['seconds'] / entry['seconds']:>8.2f}x")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def resident_memory():
+    """Resident set size of blender in bytes, 0 where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def bench_polygon_assignment(results, face_count):
+    methods = cam.MaterialCreateAssignMethods()
+    # a new material each round, so every variant writes all selected faces
+    materials = [bpy.data.materials.new("BenchmarkMaterial") for _ in range(3)]
+
+    object = make_grid_object(face_count)
+    faces = len(object.data.polygons)
+    select_half(object.data)
+
+    enter_edit_mode(object)
+    results.add("assign polygons", "legacy", faces, timed(legacy_apply_material_to_polygons, object, materials[0]), faces)
+    results.add("assign polygons", "edit mode", faces, timed(methods.apply_material_to_polygons, object, materials[1]), faces)
+    leave_edit_mode()
+
+    results.add("assign polygons", "object mode", faces, timed(methods.apply_material_to_polygons, object, materials[2]), faces)
+
+    remove_object(object)
+    for material in materials:
+        bpy.data.materials.remove(material)
+
+
+def bench_multi_edit_assignment(results, object_count, face_count=1_000):
+    methods = cam.MaterialCreateAssignMethods()
+    material = bpy.data.materials.new("BenchmarkMaterial")
+
+    objects = [make_grid_object(face_count, f"BenchmarkGrid_{i}") for i in range(object_count)]
+    for object in objects:
+        select_half(object.data)
+        object.select_set(True)
+    faces = sum(len(object.data.polygons) for object in objects)
+
+    # all selected objects enter edit mode together
+    enter_edit_mode(objects[0])
+    results.add("assign multi edit", "legacy", object_count,
+                timed(lambda: [legacy_apply_material_to_polygons(object, material) for object in objects]), faces)
+
+    # a new material each round, so every variant writes all selected faces
+    per_object = bpy.data.materials.new("BenchmarkMaterial")
+    results.add("assign multi edit", "per object", object_count,
+                timed(lambda: [methods.apply_material_to_polygons(object, per_object) for object in objects]), faces)
+
+    batched = bpy.data.materials.new("BenchmarkMaterial")
+    results.add("assign multi edit", "batched", object_count,
+                timed(methods.apply_material_to_edit_meshes, objects, batched), faces)
+    leave_edit_mode()
+
+    for object in objects:
+        remove_object(object)
+    for material in (material, per_object, batched):
+        bpy.data.materials.remove(material)
+
+
+def bench_region_pick(results, object_count, width=1920, height=1080, stride=4):
+    materials = [bpy.data.materials.new(f"Region_{i}") for i in range(4)]
+    objects = [make_grid_object(100, f"RegionGrid_{i}") for i in range(object_count)]
+
+    # 10 x 10 unit grids in a square layout, seen from above by an orthographic view covering all of them
+    side = int(np.ceil(np.sqrt(object_count)))
+    for i, object in enumerate(objects):
+        object.location = (i % side * 12.0, i // side * 12.0, 0.0)
+        object.data.materials.append(materials[i % len(materials)])
+    extent = side * 12.0
+    bpy.context.view_layer.update()
+
+    coords = picking.region_samples([(0, 0), (width, height)], False, stride, float("inf"))
+    origins = np.column_stack((coords[:, 0] / width * extent, coords[:, 1] / height * extent, np.full(len(coords), 10.0)))
+    directions = np.tile((0.0, 0.0, -1.0), (len(coords), 1))
+    projection = np.array([
+        (2.0 / extent, 0.0, 0.0, -1.0),
+        (0.0, 2.0 / extent, 0.0, -1.0),
+        (0.0, 0.0, -0.01, 0.0),
+        (0.0, 0.0, 0.0, 1.0),
+    ])
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    def cast(view):
+        region_cast = picking.RegionCast(depsgraph, objects, coords, origins, directions, view)
+        region_cast.task.step(float("inf"))
+        region_cast.materials()
+        return region_cast
+
+    # the trees are built while hovering in a session, so they are not part of the timings
+    cast(None)
+
+    def legacy():
+        # one ray at a time against every object, on every 16th sample
+        for origin in origins[::16].tolist():
+            picking.pick_cache.ray_cast(bpy.context, depsgraph, Vector(origin), Vector((0.0, 0.0, -1.0)))
+
+    rays = len(coords)
+    results.add("region pick", "single rays", object_count, timed(legacy), len(origins[::16]))
+    results.add("region pick", "batched", object_count, timed(cast, None), rays)
+    results.add("region pick", "culled", object_count, timed(cast, (projection, width, height)), rays)
+
+    region_cast = cast((projection, width, height))
+    region_materials, material_ids = region_cast.materials()
+    hit = material_ids >= 0
+    target = make_grid_object(100_000, "RegionTarget")
+    target.scale = (extent / 316.0, extent / 316.0, 1.0)
+    bpy.context.view_layer.update()
+    faces = len(target.data.polygons)
+    results.add("region transfer", "nearest", object_count,
+                timed(picking.transfer_nearest_materials, [target], region_cast.locations[hit], region_materials, material_ids[hit]), faces)
+
+    remove_object(target)
+    for object in objects:
+        remove_object(object)
+    for material in materials:
+        bpy.data.materials.remove(material)
+    picking.pick_cache.clear()
+
+
+def bench_queue_memory(results, face_count, assignments=50):
+    materials = [bpy.data.materials.new(f"Queued_{i}") for i in range(4)]
+    object = make_grid_object(face_count)
+    faces = len(object.data.polygons)
+    select_half(object.data)
+    enter_edit_mode(object)
+
+    # every undo step of an edit mode assignment holds a copy of the mesh, background mode has no undo stack
+    # so the copies are made directly
+    before = resident_memory()
+    copies = [object.data.copy() for _ in range(assignments)]
+    results.add_memory("undo memory", "undo steps", faces, resident_memory() - before)
+    for mesh in copies:
+        bpy.data.meshes.remove(mesh)
+
+    queue = cam.AssignmentQueue()
+    results.add("undo memory", "queue record", faces,
+                timed(lambda: [queue.record(bpy.context, materials[i % len(materials)]) for i in range(assignments)]), assignments)
+    results.add_memory("undo memory", "queue deltas", faces, queue.memory())
+    results.add("undo memory", "queue commit", faces, timed(queue.commit), assignments)
+    leave_edit_mode()
+
+    remove_object(object)
+    for material in materials:
+        bpy.data.materials.remove(material)
+
+
+def bench_live_tweak(results, face_count, tweaks=20):
+    methods = cam.MaterialCreateAssignMethods()
+    object = make_grid_object(face_count)
+    faces = len(object.data.polygons)
+    select_half(object.data)
+    enter_edit_mode(object)
+
+    # the redo panel undoes and runs execute again, creating the material and writing every face
+    def redo(color):
+        material = methods.create_material("Tweak", color, "Principled")
+        methods.apply_material_to_selection(bpy.context, material)
+
+    colors = [(i / tweaks, 0.5, 0.5, 1.0) for i in range(tweaks)]
+    results.add("tweak", "redo", faces, timed(lambda: [redo(color) for color in colors]), tweaks)
+
+    live = operators.LiveMaterial(bpy.context, "Live", colors[0], "Principled")
+    results.add("tweak", "live color", faces, timed(lambda: [live.set_color(color) for color in colors]), tweaks)
+
+    shaders = ["Diffuse", "Principled"] * (tweaks // 2)
+    results.add("tweak", "live shader", faces, timed(lambda: [live.set_shader(shader, colors[0]) for shader in shaders]), len(shaders))
+    leave_edit_mode()
+
+    materials = list(object.data.materials)
+    remove_object(object)
+    for material in materials:
+        if material:
+            bpy.data.materials.remove(material)
+
+
+def bench_face_data_assignment(results, face_count, part_count=64):
+    object = make_grid_object(face_count)
+    mesh = object.data
+    faces = len(mesh.polygons)
+
+    attribute = mesh.attributes.new("part_id", 'INT', 'FACE')
+    attribute.data.foreach_set("value", (np.arange(faces) % part_count).astype(np.int32))
+
+    results.add("assign face data", "attribute", faces,
+                timed(cam.assign_materials_from_face_data, [object], 'ATTRIBUTE', "part_id"), faces)
+
+    materials = list(mesh.materials)
+    remove_object(object)
+    for material in materials:
+        bpy.data.materials.remove(material)
+
+
+def bench_object_assignment(results, object_count):
+    methods = cam.MaterialCreateAssignMethods()
+    material = bpy.data.materials.new("BenchmarkMaterial")
+
+    # instances sharing one mesh, the worst case for per object writes
+    mesh = bpy.data.meshes.new("BenchmarkShared")
+    objects = [bpy.data.objects.new(f"BenchmarkInstance_{i}", mesh) for i in range(object_count)]
+
+    def legacy():
+        for object in objects:
+            methods.apply_material_to_object(object, material)
+
+    results.add("assign objects", "legacy", object_count, timed(legacy), object_count)
+    results.add("assign objects", "grouped", object_count, timed(methods.apply_material_to_objects, objects, material), object_count)
+    results.add("assign objects", "object link", object_count, timed(methods.apply_material_to_objects, objects, material, 'OBJECT'), object_count)
+
+    for object in objects:
+        bpy.data.objects.remove(object)
+    bpy.data.meshes.remove(mesh)
+    bpy.data.materials.remove(material)
+
+
+def bench_cleanup(results, face_count, slot_count=16):
+    materials = [bpy.data.materials.new(f"BenchmarkSlot_{i}") for i in range(slot_count)]
+
+    def setup():
+        mesh = object.data
+        mesh.materials.clear()
+        for material in materials + materials[:4]:
+            mesh.materials.append(material)
+        # every other slot stays unused, the duplicates at the end are used
+        indices = (np.arange(len(mesh.polygons)) % (slot_count + 4)) // 2 * 2
+        mesh.polygons.foreach_set("material_index", indices.astype(np.int32))
+
+    object = make_grid_object(face_count)
+    faces = len(object.data.polygons)
+
+    if not STANDIN:
+        setup()
+        results.add("cleanup slots", "legacy", faces, timed(legacy_cleanup_material_slots, object), faces)
+    setup()
+    results.add("cleanup slots", "native", faces, timed(cam.cleanup_material_slots, [object]), faces)
+
+    remove_object(object)
+    for material in materials:
+        bpy.data.materials.remove(material)
+
+
+def bench_merge_duplicates(results, material_count, distinct=100):
+    methods = cam.MaterialCreateAssignMethods()
+    colors = [(i / distinct, 0.5, 0.5, 1.0) for i in range(distinct)]
+    materials = [methods.create_material("Duplicate", colors[i % distinct], "Principled") for i in range(material_count)]
+
+    # one single face object per material, as left behind by repeated create and assign
+    objects = []
+    for material in materials:
+        mesh = bpy.data.meshes.new("BenchmarkFace")
+        mesh.from_pydata([(0, 0, 0), (1, 0, 0), (1, 1, 0)], [], [(0, 1, 2)])
+        mesh.materials.append(material)
+        object = bpy.data.objects.new("BenchmarkFace", mesh)
+        bpy.context.scene.collection.objects.link(object)
+        objects.append(object)
+
+    cam.material_signatures.clear()
+    results.add("merge duplicates", "signatures", material_count,
+                timed(lambda: [cam.material_signatures.get(material) for material in materials]), material_count)
+    results.add("merge duplicates", "merge", material_count,
+                timed(cam.merge_duplicate_materials, materials), material_count)
+
+    survivors = {material for object in objects for material in object.data.materials}
+    for object in objects:
+        remove_object(object)
+    for material in survivors:
+        bpy.data.materials.remove(material)
+
+
+def bench_unique_names(results, material_count, calls=1000):
+    materials = [bpy.data.materials.new("Metal")]
+    materials += [bpy.data.materials.new(f"Metal_{i}") for i in range(1, material_count)]
+
+    existing = {m.name for m in bpy.data.materials}
+    results.add("unique names", "legacy", material_count,
+                timed(lambda: [legacy_create_unique_name("Metal", existing) for _ in range(calls)]), calls)
+
+    cam.invalidate_material_caches()
+    results.add("unique names", "index rebuild", material_count, timed(cam.material_names.ensure), material_count)
+    results.add("unique names", "allocator", material_count,
+                timed(lambda: [cam.create_unique_name("Metal") for _ in range(calls)]), calls)
+
+    for material in materials:
+        bpy.data.materials.remove(material)
+
+
+def bench_menu(results, material_count, draws=100, max_materials=50):
+    materials = [bpy.data.materials.new(f"Menu_{i}") for i in range(material_count)]
+
+    results.add("menu draw", "legacy", material_count,
+                timed(lambda: [legacy_menu_names(max_materials) for _ in range(draws)]), draws)
+
+    cam.invalidate_material_caches()
+    results.add("menu draw", "index rebuild", material_count, timed(cam.cached_materials.ensure), material_count)
+
+    def cached():
+        material_index = cam.cached_materials.ensure()
+        return [(name, ui.material_previews.icon(name)) for name in material_index.names[:max_materials]]
+
+    results.add("menu draw", "cached", material_count, timed(lambda: [cached() for _ in range(draws)]), draws)
+
+    results.add("search", "index build", material_count, timed(cam.material_search.ensure), material_count)
+    queries = ["menu", "menu_1", "enu_42", "mnu", "m"]
+    results.add("search", "query", material_count,
+                timed(lambda: [cam.material_search.query(q) for _ in range(draws // len(queries)) for q in queries]), draws)
+
+    for material in materials:
+        bpy.data.materials.remove(material)
+
+
+def bench_create_material(results, material_count):
+    methods = cam.MaterialCreateAssignMethods()
+    color = (0.8, 0.2, 0.1, 1.0)
+
+    for shader in cam.material_templates:
+        before = set(bpy.data.materials)
+        results.add("create material", f"legacy {shader}", material_count,
+                    timed(lambda: [legacy_create_material("Bench", color, shader) for _ in range(material_count)]), material_count)
+        results.add("create material", f"template {shader}", material_count,
+                    timed(lambda: [methods.create_material("Bench", color, shader) for _ in range(material_count)]), material_count)
+
+        for material in set(bpy.data.materials) - before:
+            bpy.data.materials.remove(material)
+
+
+def bench_startup(results, repeats=20):
+    import addon_utils
+
+    package = "create_assign_material"
+
+    def forget_modules():
+        for name in [name for name in sys.modules if name.partition(".")[0] == package]:
+            del sys.modules[name]
+
+    def import_api():
+        forget_modules()
+        importlib.import_module(package)
+
+    def import_interface():
+        for module in ("operators", "picking", "ui", "profiling"):
+            importlib.import_module(f"{package}.{module}")
+
+    import_seconds = interface_seconds = 0.0
+    for _ in range(repeats):
+        import_seconds += timed(import_api)
+        interface_seconds += timed(import_interface)
+    results.add("startup", "import api", 1, import_seconds, repeats)
+    results.add("startup", "import interface", 1, interface_seconds, repeats)
+
+    # enabling creates the preferences entry, which the full registration reads
+    addon_utils.enable(package, default_set=False)
+    addon = sys.modules[package]
+    addon.unregister()
+
+    for variant, headless in (("register headless", True), ("register interface", False)):
+        seconds = 0.0
+        for _ in range(repeats):
+            seconds += timed(addon.register, headless)
+            addon.unregister()
+        results.add("startup", variant, 1, seconds, repeats)
+
+    addon.register(True)
+    addon_utils.disable(package, default_set=False)
+
+    materials = [bpy.data.materials.new(f"WarmUp_{i}") for i in range(10_000)]
+    addon.core.invalidate_material_caches()
+    results.add("startup", "warm up", len(materials), timed(sys.modules[f"{package}.ui"].warm_up_caches), len(materials))
+    for material in materials:
+        bpy.data.materials.remove(material)
+
+
+# the benchmarks which run on the stand-in bpy
+STANDIN_BENCHMARKS = {"assign", "cleanup", "names", "merge", "menu", "create"}
+
+
+def start_standin():
+    """Registers the addon on an empty stand-in file, as blender does when loading one with the addon enabled"""
+    import standin
+    import create_assign_material
+
+    standin.reset()
+    create_assign_material.register(headless=True)
+    standin.load_post()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="benchmark.py")
+    parser.add_argument("--faces", type=int, nargs="+",
+                        default=[1_000, 100_000, 1_000_000] if STANDIN else [1_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--objects", type=int, nargs="+", default=[100, 10_000])
+    parser.add_argument("--edit-objects", type=int, nargs="+", default=[10, 200])
+    parser.add_argument("--materials", type=int, nargs="+", default=[10, 1_000, 50_000])
+    parser.add_argument("--create", type=int, nargs="+", default=[1_000, 5_000])
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks (assign, pick, queue, tweak, cleanup, names, merge, menu, create, startup)")
+    parser.add_argument("--json", help="write the timings to this file")
+    parser.add_argument("--compare", help="compare against timings written by an earlier --json run")
+    args = parser.parse_args(argv)
+
+    def enabled(name):
+        if STANDIN and name not in STANDIN_BENCHMARKS:
+            return False
+        return not args.only or name in args.only
+
+    if STANDIN:
+        start_standin()
+
+    results = Results()
+
+    if enabled("assign"):
+        for face_count in args.faces:
+            bench_polygon_assignment(results, face_count)
+            if not STANDIN:
+                bench_face_data_assignment(results, face_count)
+        for object_count in args.objects:
+            bench_object_assignment(results, object_count)
+        for object_count in args.edit_objects:
+            bench_multi_edit_assignment(results, object_count)
+
+    if enabled("pick"):
+        for object_count in args.edit_objects:
+            bench_region_pick(results, object_count)
+
+    if enabled("queue"):
+        for face_count in args.faces:
+            bench_queue_memory(results, face_count)
+
+    if enabled("tweak"):
+        for face_count in args.faces:
+            bench_live_tweak(results, face_count)
+
+    if enabled("cleanup"):
+        for face_count in args.faces:
+            bench_cleanup(results, face_count)
+
+    if enabled("names"):
+        for material_count in args.materials:
+            bench_unique_names(results, material_count)
+
+    if enabled("merge"):
+        for material_count in args.materials:
+            bench_merge_duplicates(results, material_count)
+
+    if enabled("menu"):
+        for material_count in args.materials:
+            bench_menu(results, material_count)
+
+    if enabled("create"):
+        for material_count in args.create:
+            bench_create_material(results, material_count)
+
+    if enabled("startup"):
+        bench_startup(results)
+
+    if args.json:
+        results.write(args.json)
+    if args.compare:
+        results.compare(args.compare)
+
+
+if __name__ == "__main__":
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
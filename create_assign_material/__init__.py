@@ -0,0 +1,149 @@
+import bpy
+
+# the python api for batch runs
+from .core import (
+    CollectionNameRule,
+    FaceAttributeRule,
+    ObjectNameRule,
+    apply_rules,
+    assign_materials_from_face_data,
+    cleanup_material_slots,
+    create_materials,
+    merge_duplicate_materials,
+    process_files,
+    read_palette,
+    register_material_template,
+)
+from .preferences import AddonPrefs
+from . import core
+
+bl_info = {
+    "name": "Create Assign Material",
+    "author": "Benjamin Sauder",
+    "blender": (3, 1, 0),
+    "description": "Creates and assigns a material to the selected objects/faces.",
+    "category": "Object",
+    "doc_url": "https://github.com/BenjaminSauder/create_assign_material",
+}
+
+
+# -------------------------------------
+# Addon registering boilerplate
+# -------------------------------------
+
+def interface_classes():
+    # the operator, picking and menu modules are only imported by sessions with an interface
+    from . import operators, picking, profiling, ui
+
+    return [
+        # Operators
+        operators.MaterialSlotCleanup,
+        operators.MaterialMergeDuplicates,
+        operators.MaterialCreateAssign,
+        operators.MaterialPaletteCreate,
+        picking.MaterialPick,
+        operators.MaterialAssign,
+        operators.MaterialAssignChunked,
+        operators.MaterialAssignFromFaceData,
+        operators.MaterialLibraryAssign,
+        operators.MaterialQueueCommit,
+        operators.MaterialQueueDiscard,
+        # UI
+        core.MaterialHistoryItem,
+        ui.MaterialMenuPage,
+        ui.VIEW3D_MT_MaterialList,
+        ui.VIEW3D_MT_Material,
+        ui.VIEW3D_MT_Material_PIE,
+        # Profiling
+        profiling.MaterialProfileReset,
+        profiling.MaterialProfileExport,
+        profiling.VIEW3D_PT_MaterialProfiling,
+    ]
+
+
+registered_classes = []
+addon_keymaps = []
+
+# set by register, background sessions run without the interface
+interface_registered = False
+
+def register(headless=None):
+    """Registers the addon. Headless sessions (by default background ones) only get the python api and the
+    cache handlers, no operators, menus or keymaps."""
+    global interface_registered
+
+    if headless is None:
+        headless = bpy.app.background
+
+    classes = [AddonPrefs] if headless else [AddonPrefs] + interface_classes()
+    for c in classes:
+        bpy.utils.register_class(c)
+    registered_classes[:] = classes
+
+    for handlers, handler in core.app_handlers:
+        handlers.append(handler)
+
+    interface_registered = not headless
+    if headless:
+        return
+
+    from . import profiling, ui
+
+    bpy.types.Scene.material_history = bpy.props.CollectionProperty(type=core.MaterialHistoryItem)
+    bpy.types.WindowManager.material_menu_page = bpy.props.IntProperty(min=0)
+
+    # keymaps & prefs
+    addon_prefs = core.get_preferences()
+    if addon_prefs.menu_visible:
+        bpy.types.VIEW3D_MT_editor_menus.append(ui.VIEW3D_MT_Material.menu_draw)
+    if addon_prefs.profiling:
+        profiling.profiler.enable()
+
+    wm = bpy.context.window_manager
+    if  wm.keyconfigs.addon:
+        keymap = wm.keyconfigs.addon.keymaps.new(name='3D View', space_type='VIEW_3D')
+
+        keymap_item = keymap.keymap_items.new("wm.call_menu_pie", type="NONE", value='PRESS', ctrl=False)
+        keymap_item.properties.name = "VIEW3D_MT_create_assign_pie"
+        addon_keymaps.append((keymap, keymap_item))
+
+        keymap_item = keymap.keymap_items.new("wm.call_menu", type="NONE", value='PRESS', ctrl=False)
+        keymap_item.properties.name = "VIEW3D_MT_Material"
+        addon_keymaps.append((keymap, keymap_item))
+
+    ui.schedule_warm_up()
+
+
+def unregister():
+    global interface_registered
+
+    if interface_registered:
+        from . import profiling, ui
+
+        # keymaps & prefs
+        addon_prefs = core.get_preferences()
+        if addon_prefs.menu_visible:
+            bpy.types.VIEW3D_MT_editor_menus.remove(ui.VIEW3D_MT_Material.menu_draw)
+
+        for keymap, keymap_item in addon_keymaps:
+            keymap.keymap_items.remove(keymap_item)
+        addon_keymaps.clear()
+
+        profiling.profiler.disable()
+        ui.material_previews.clear()
+        if bpy.app.timers.is_registered(ui.warm_up_caches):
+            bpy.app.timers.unregister(ui.warm_up_caches)
+
+        del bpy.types.Scene.material_history
+        del bpy.types.WindowManager.material_menu_page
+
+    for handlers, handler in core.app_handlers:
+        if handler in handlers:
+            handlers.remove(handler)
+
+    core.assignment_queue.clear()
+
+    for c in reversed(registered_classes):
+        bpy.utils.unregister_class(c)
+    registered_classes.clear()
+    interface_registered = False
@@ -0,0 +1,1706 @@
+"""Material caches, assignment functions and the python api, everything that works without an interface"""
+
+import array
+import bisect
+import collections
+import colorsys
+import csv
+import fnmatch
+import heapq
+import itertools
+import json
+import operator
+import os
+import time
+
+import bpy
+import bmesh
+import numpy as np
+
+
+# -------------------------------------
+# Bulk face assignment
+# -------------------------------------
+
+def get_polygon_selection(mesh):
+    """Returns the polygon selection of a mesh as boolean array, read in one foreach_get"""
+    selection = np.empty(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get("select", selection)
+    return selection
+
+
+def set_polygon_material_index(mesh, mask, material_index):
+    """Writes material_index to all polygons in mask with a single foreach_set"""
+    if mask.all():
+        indices = np.full(len(mesh.polygons), material_index, dtype=np.int32)
+    else:
+        indices = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("material_index", indices)
+        indices[mask] = material_index
+
+    mesh.polygons.foreach_set("material_index", indices)
+    mesh.update()
+
+
+def get_material_indices(data):
+    """Returns the per face (mesh), per spline (curve) or per character (text) material indices"""
+    if isinstance(data, bpy.types.Mesh):
+        if data.is_editmode:
+            bm = bmesh.from_edit_mesh(data)
+            return np.fromiter((face.material_index for face in bm.faces), dtype=np.int32, count=len(bm.faces))
+
+        indices = np.empty(len(data.polygons), dtype=np.int32)
+        data.polygons.foreach_get("material_index", indices)
+        return indices
+
+    elements = get_material_index_elements(data)
+    if elements is None:
+        return None
+
+    indices = np.empty(len(elements), dtype=np.int32)
+    elements.foreach_get("material_index", indices)
+    return indices
+
+
+def set_material_indices(data, indices, changed):
+    """Writes back material indices, edit meshes only touch the faces flagged in changed"""
+    if isinstance(data, bpy.types.Mesh):
+        if data.is_editmode:
+            bm = bmesh.from_edit_mesh(data)
+            bm.faces.ensure_lookup_table()
+            faces = bm.faces
+            for i in np.flatnonzero(changed).tolist():
+                faces[i].material_index = int(indices[i])
+            bmesh.update_edit_mesh(data, loop_triangles=False, destructive=False)
+        else:
+            data.polygons.foreach_set("material_index", indices)
+            data.update()
+        return
+
+    get_material_index_elements(data).foreach_set("material_index", indices)
+    data.update_tag()
+
+
+def get_material_index_elements(data):
+    if isinstance(data, bpy.types.TextCurve):
+        return data.body_format
+    if isinstance(data, bpy.types.Curve):
+        return data.splines
+    return None
+
+
+# -------------------------------------
+# Slot cleanup
+# -------------------------------------
+
+def cleanup_material_slots(objects):
+    """Removes unused and merges duplicate material slots of the objects data, without any mode switches.
+
+    Returns the number of removed slots."""
+    datas = {object.data for object in objects if object.type in {'MESH', 'CURVE', 'FONT', 'SURFACE'}}
+    return cleanup_data_material_slots(datas)
+
+
+def cleanup_data_material_slots(datas):
+    """Same as cleanup_material_slots for a set of meshes and curves"""
+    if not datas:
+        return 0
+
+    users = bpy.data.user_map(subset=datas, value_types={'OBJECT'})
+    return sum(compact_material_slots(data, users.get(data, ())) for data in datas)
+
+
+def compact_material_slots(data, users):
+    slot_count = len(data.materials)
+    if slot_count == 0:
+        return 0
+
+    indices = get_material_indices(data)
+    if indices is None:
+        return 0
+
+    # out of range indices are drawn with the last slot
+    indices = np.minimum(indices, slot_count - 1)
+    used = np.bincount(indices, minlength=slot_count) > 0
+
+    # object linked slots are part of the slot identity, so only merge slots which are equal for every user
+    users = [object for object in users if any(slot.link == 'OBJECT' for slot in object.material_slots)]
+    user_slots = [[(slot.link, slot.material) for slot in object.material_slots] for object in users]
+
+    keep = []
+    slot_by_key = {}
+    remap = np.zeros(slot_count, dtype=np.int32)
+    for i in np.flatnonzero(used).tolist():
+        key = (data.materials[i],) + tuple(slots[i] for slots in user_slots)
+        if key not in slot_by_key:
+            slot_by_key[key] = len(keep)
+            keep.append(i)
+        remap[i] = slot_by_key[key]
+
+    removed = slot_count - len(keep)
+    if removed == 0:
+        return 0
+
+    remapped = remap[indices]
+    set_material_indices(data, remapped, remapped != indices)
+
+    # no face points beyond the kept slots anymore, so popping from the end leaves the indices alone
+    materials = [data.materials[i] for i in keep]
+    for i, material in enumerate(materials):
+        data.materials[i] = material
+    for _ in range(removed):
+        data.materials.pop()
+
+    for object, slots in zip(users, user_slots):
+        for i, old_index in enumerate(keep):
+            link, material = slots[old_index]
+            slot = object.material_slots[i]
+            slot.link = link
+            if link == 'OBJECT':
+                slot.material = material
+
+    return removed
+
+
+# -------------------------------------
+# Material templates
+# -------------------------------------
+
+class MaterialTemplate():
+    """A hidden, fake user material per shader type which new materials are copied from.
+
+    The template lives in the blend file, so its node setup can also be customized by hand."""
+
+    def __init__(self, identifier, label, build, description=""):
+        self.identifier = identifier
+        self.label = label
+        self.build = build
+        self.description = description
+        # names starting with a dot are hidden in the material lists
+        self.material_name = f".material_template_{identifier}"
+        self.material = None
+        self.generation = -1
+
+    def get_material(self):
+        if self.generation != material_generation or self.material is None:
+            self.material = bpy.data.materials.get(self.material_name)
+            if self.material is None:
+                self.material = self.create()
+            self.generation = material_generation
+        return self.material
+
+    def create(self):
+        material = bpy.data.materials.new(name=self.material_name)
+        material.use_nodes = True
+        material.use_fake_user = True
+
+        # the node taking the color on its first input, patched on every copy
+        color_node = self.build(material)
+        material["template_color_node"] = color_node.name if color_node else ""
+
+        material_names.created(material)
+        return material
+
+
+def set_material_color(material, color):
+    material.diffuse_color = color
+
+    color_node = material.node_tree.nodes.get(material.get("template_color_node", "")) if material.node_tree else None
+    if color_node:
+        color_node.inputs[0].default_value = color
+
+
+def build_principled(material):
+    return material.node_tree.nodes.get('Principled BSDF')
+
+
+def build_shader_node(node_type):
+    def build(material):
+        nodes = material.node_tree.nodes
+        nodes.remove(nodes.get('Principled BSDF'))
+        shader_node = nodes.new(node_type)
+        material.node_tree.links.new(nodes.get('Material Output').inputs[0], shader_node.outputs[0])
+        return shader_node
+    return build
+
+
+def build_emission(material):
+    shader_node = build_shader_node('ShaderNodeEmission')(material)
+    shader_node.inputs[1].default_value = 3.0
+    return shader_node
+
+
+material_templates = {}
+shader_types = []
+
+def register_material_template(identifier, label, build, description=""):
+    """Adds a shader type to the create dialog.
+
+    build(material) receives a new node based material and returns the node whose first input takes the color."""
+    material_templates[identifier] = MaterialTemplate(identifier, label, build, description)
+
+    # enum items returned from a callback have to stay referenced
+    shader_types[:] = [(t.identifier, t.label, t.description, i) for i, t in enumerate(material_templates.values())]
+
+
+def shader_type_items(self, context):
+    return shader_types
+
+
+register_material_template("Principled", "Principled BSDF", build_principled)
+register_material_template("Diffuse", "Diffuse BSDF", build_shader_node('ShaderNodeBsdfDiffuse'))
+register_material_template("Emission", "Emission", build_emission)
+register_material_template("PrincipledVolume", "Principled Volume", build_shader_node('ShaderNodeVolumePrincipled'))
+
+
+material_link_items = [
+    ("DATA", "Data", "Assign to the object data, shared data is written once for all its users"),
+    ("OBJECT", "Object", "Assign to object linked slots, shared data stays untouched"),
+]
+
+
+class MaterialCreateAssignMethods():
+
+    def apply_material_to_object(self, object, material):
+        object.data.materials.clear()
+        object.data.materials.append(material)
+
+    def apply_material_to_objects(self, objects, material, link='DATA'):
+        """Makes material the only material of the objects.
+
+        With link 'DATA' every shared data block is written once, with 'OBJECT' the material goes into object
+        linked slots and shared data stays untouched. Returns the number of objects and of updated ids."""
+        updates = 0
+
+        if link == 'OBJECT':
+            for object in objects:
+                # object slots mirror the data slots, so empty data needs one slot first
+                if len(object.material_slots) == 0:
+                    object.data.materials.append(None)
+                    updates += 1
+
+                changed = False
+                for slot in object.material_slots:
+                    if slot.link != 'OBJECT' or slot.material != material:
+                        slot.link = 'OBJECT'
+                        slot.material = material
+                        changed = True
+                updates += changed
+
+            return len(objects), updates
+
+        users = {}
+        for object in objects:
+            users.setdefault(object.data, []).append(object)
+
+        for data, data_users in users.items():
+            # skip data which already ends up with the same result, every write tags it for re-evaluation
+            object_links = any(slot.link == 'OBJECT' for object in data_users for slot in object.material_slots)
+            if len(data.materials) == 1 and data.materials[0] == material and not object_links:
+                continue
+
+            data.materials.clear()
+            data.materials.append(material)
+            updates += 1
+
+        return len(objects), updates
+
+    def apply_material_to_selection(self, context, material, cleanup_slots=False, link='DATA'):
+        """Returns the number of objects and of updated ids"""
+        if context.mode == "EDIT_MESH":
+            objects = [object for object in context.selected_objects if object.type == 'MESH']
+            return self.apply_material_to_edit_meshes(objects, material, cleanup_slots)
+
+        elif context.mode == "OBJECT":
+            objects = [object for object in context.selected_objects if object.type in {'MESH', 'CURVE', 'FONT', 'SURFACE', 'META'}]
+            return self.apply_material_to_objects(objects, material, link)
+
+        return 0, 0
+
+    def use_chunked(self, context):
+        """True if the selection is above the chunked threshold"""
+        threshold = get_preferences().chunked_threshold
+        return threshold != 0 and len(context.selected_objects) >= threshold and context.mode in {"EDIT_MESH", "OBJECT"}
+
+    def assign_chunked(self, context, material, cleanup_slots=False, link='DATA'):
+        """Hands selections above the chunked threshold over to the chunked assignment, returns True if it did"""
+        if not self.use_chunked(context):
+            return False
+
+        bpy.ops.object.material_assign_chunked('INVOKE_DEFAULT', material_name=material.name,
+                                               cleanup_material_slots=cleanup_slots, link=link)
+        return True
+
+    def use_queue(self, context):
+        return get_preferences().queue_assignments and context.mode in {"EDIT_MESH", "OBJECT"}
+
+    def queue_assignment(self, context, material):
+        """Records the assignment in the assignment queue when queueing is enabled, returns True if it did"""
+        if not self.use_queue(context):
+            return False
+
+        self.report_direct(assignment_queue.record(context, material))
+        remember_material(context, material)
+        return True
+
+    def report_direct(self, direct):
+        if direct:
+            self.report({'INFO'}, f"Assigned directly to {len(direct)} objects without faces or splines to queue")
+
+    def report_assignment(self, stats):
+        objects, updates = stats
+        self.report({'INFO'}, f"Assigned material to {objects} objects, {updates} data updates")
+
+    def get_material_slot(self, mesh, material, all_faces_selected):
+        # check if incomming material is already present
+        for i, mat in enumerate(mesh.materials):
+            if mat == material:
+                return i
+
+        return self.add_material_slot(mesh, material, all_faces_selected)
+
+    def add_material_slot(self, mesh, material, all_faces_selected):
+        # material is not present
+        material_index = len(mesh.materials)
+
+        #no materials assign, but we have a face selection
+        if material_index == 0 and not all_faces_selected:
+            mesh.materials.append(None)
+            material_index += 1
+
+        mesh.materials.append(material)
+        return material_index
+
+    def apply_material_to_edit_meshes(self, objects, material, cleanup_slots=False):
+        """Assigns material to the selected faces of all meshes in edit mode in a single pass.
+
+        Meshes shared by several objects are handled once, slots are resolved through a material to slot dict
+        and only meshes with changed faces get an update. Returns the number of objects and of updated meshes.
+
+        bmesh has no foreach access, so unlike object mode this is a python loop over the faces. Flushing to the
+        mesh for a foreach_set would write and reload the whole edit mesh (and its selection history) per call,
+        which costs more than the loop for the selections edited by hand."""
+        meshes = dict.fromkeys(object.data for object in objects if object.type == 'MESH' and object.data.is_editmode)
+
+        updated = []
+        for mesh in meshes:
+            bm = bmesh.from_edit_mesh(mesh)
+            faces = bm.faces
+            selected_faces = [face for face in faces if face.select]
+            if not selected_faces:
+                continue
+
+            slots = {}
+            for i, slot_material in enumerate(mesh.materials):
+                slots.setdefault(slot_material, i)
+            material_index = slots.get(material)
+            if material_index is None:
+                material_index = self.add_material_slot(mesh, material, len(selected_faces) == len(faces))
+
+            changed_faces = [face for face in selected_faces if face.material_index != material_index]
+            for face in changed_faces:
+                face.material_index = material_index
+            if changed_faces:
+                updated.append(mesh)
+
+        # only face data changed, the tessellation is still valid
+        for mesh in updated:
+            bmesh.update_edit_mesh(mesh, loop_triangles=False, destructive=False)
+
+        if cleanup_slots:
+            cleanup_material_slots(objects)
+
+        return len(objects), len(updated)
+
+    def apply_material_to_polygons(self, object, material, cleanup_slots=False):
+        mesh = object.data
+
+        if mesh.is_editmode:
+            self.apply_material_to_edit_meshes([object], material, cleanup_slots)
+            return
+
+        selection = get_polygon_selection(mesh)
+        material_index = self.get_material_slot(mesh, material, bool(selection.all()))
+        set_polygon_material_index(mesh, selection, material_index)
+
+        if cleanup_slots:
+            cleanup_material_slots([object])
+
+
+    def create_material(self, name, color, shader):
+        template = material_templates.get(shader, material_templates["Principled"])
+
+        # copying the prebuilt node tree is far cheaper than building it node by node
+        material = template.get_material().copy()
+        material.name = name
+        material.use_fake_user = False
+        material_names.created(material)
+
+        set_material_color(material, color)
+        return material
+
+
+def split_name_suffix(name):
+    """Splits 'Metal_12' into ('Metal', 12), names without a numeric suffix get 0"""
+    base, separator, suffix = name.rpartition("_")
+    if separator and suffix.isdecimal():
+        return base, int(suffix)
+    return name, 0
+
+
+class NameAllocator():
+    """Hands out free material names in constant time.
+
+    Every base name maps to its highest numeric suffix, so a taken name resolves to base_(highest + 1)
+    instead of probing one suffix after another."""
+
+    def __init__(self):
+        self.generation = -1
+        self.id_count = -1
+        self.names = set()
+        self.max_suffix = {}
+
+    def ensure(self):
+        materials = bpy.data.materials
+        if self.generation != material_generation or self.id_count != len(materials):
+            self.names.clear()
+            self.max_suffix.clear()
+            for material in materials:
+                self.add(material.name)
+            self.generation = material_generation
+            self.id_count = len(materials)
+        return self
+
+    def add(self, name):
+        self.names.add(name)
+        base, suffix = split_name_suffix(name)
+        if suffix >= self.max_suffix.get(base, -1):
+            self.max_suffix[base] = suffix
+
+    def created(self, material):
+        """Keeps the index in sync with a material created since the last ensure()"""
+        if self.id_count == len(bpy.data.materials) - 1:
+            self.add(material.name)
+            self.id_count += 1
+
+    def unique(self, name):
+        if name not in self.names:
+            return name
+
+        base, _ = split_name_suffix(name)
+        return f"{base}_{self.max_suffix[base] + 1}"
+
+
+material_names = NameAllocator()
+
+def create_unique_name(name):
+    return material_names.ensure().unique(name)
+
+
+# -------------------------------------
+# Snapshots
+# -------------------------------------
+
+def snapshot_materials(objects):
+    """Slot materials, object links and material indices of the objects, enough to take back an assignment"""
+    datas = {}
+    slots = []
+    for object in objects:
+        data = object.data
+        if data not in datas:
+            datas[data] = (list(data.materials), get_material_indices(data))
+        slots.append((object, [(slot.link, slot.material) for slot in object.material_slots]))
+    return datas, slots
+
+
+def restore_materials(snapshot):
+    """Puts back what snapshot_materials took. Returns the data left alone because its faces (splines,
+    characters) were added or removed since, the old indices don't fit those anymore"""
+    datas, slots = snapshot
+    changed = []
+    for data, (materials, indices) in datas.items():
+        current = get_material_indices(data) if indices is not None else None
+        if current is not None and len(current) != len(indices):
+            changed.append(data)
+            continue
+
+        data.materials.clear()
+        for material in materials:
+            data.materials.append(material)
+        if indices is not None:
+            set_material_indices(data, indices, current != indices)
+
+    for object, object_slots in slots:
+        if object.data in changed:
+            continue
+        for slot, (link, material) in zip(object.material_slots, object_slots):
+            slot.link = link
+            if link == 'OBJECT':
+                slot.material = material
+
+    return changed
+
+
+# -------------------------------------
+# Palettes
+# -------------------------------------
+
+def parse_palette_color(value):
+    """Accepts '#rrggbb[aa]' hex (sRGB) or 3-4 linear floats, as sequence or space/comma separated string"""
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith("#"):
+            channels = [int(value[i:i + 2], 16) / 255.0 for i in range(1, len(value), 2)]
+            rgb = [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4 for c in channels[:3]]
+            return tuple(rgb) + (channels[3] if len(channels) > 3 else 1.0,)
+
+        value = value.replace(",", " ").split()
+
+    color = tuple(float(c) for c in value)
+    if len(color) == 3:
+        color += (1.0,)
+    if len(color) != 4:
+        raise ValueError(f"Invalid color: {value}")
+    return color
+
+
+def read_palette(filepath):
+    """Reads palette entries (name, color, shader, pattern) from a .csv file with header row or a .json list"""
+    if os.path.splitext(filepath)[1].lower() == ".json":
+        with open(filepath, encoding="utf-8") as file:
+            rows = json.load(file)
+    else:
+        with open(filepath, newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+
+    entries = []
+    for row in rows:
+        entries.append({
+            "name": row.get("name") or "Material",
+            "color": parse_palette_color(row.get("color") or (0.7, 0.7, 0.7, 1.0)),
+            "shader": row.get("shader") or None,
+            "pattern": row.get("pattern") or None,
+        })
+    return entries
+
+
+def create_materials(entries, shader="Principled"):
+    """Creates one material per palette entry, sharing the name index and the shader templates.
+
+    Entries are dicts with 'name', 'color' and an optional 'shader', which falls back to shader."""
+    methods = MaterialCreateAssignMethods()
+    materials = []
+    for entry in entries:
+        name = create_unique_name(entry["name"])
+        materials.append(methods.create_material(name, entry["color"], entry.get("shader") or shader))
+    return materials
+
+
+# -------------------------------------
+# Material index
+# -------------------------------------
+
+# bumped whenever material datablocks change, caches compare against it to know when to rebuild
+material_generation = 0
+
+def invalidate_material_caches():
+    global material_generation
+    material_generation += 1
+
+
+@bpy.app.handlers.persistent
+def material_depsgraph_update(scene, depsgraph):
+    if depsgraph.id_type_updated('MATERIAL'):
+        invalidate_material_caches()
+
+
+@bpy.app.handlers.persistent
+def material_file_changed(*args):
+    invalidate_material_caches()
+
+
+app_handlers = [
+    (bpy.app.handlers.depsgraph_update_post, material_depsgraph_update),
+    (bpy.app.handlers.load_post, material_file_changed),
+    (bpy.app.handlers.undo_post, material_file_changed),
+    (bpy.app.handlers.redo_post, material_file_changed),
+]
+
+
+class MaterialIndex():
+    """Filtered and sorted list of the materials shown in the menus"""
+
+    def __init__(self):
+        self.generation = -1
+        self.id_count = -1
+        self.names = []
+        self.lookup = {}
+        self.ordered_key = None
+        self.ordered_names = []
+
+    def ensure(self):
+        # the id count catches removals which did not go through the depsgraph
+        materials = bpy.data.materials
+        if self.generation != material_generation or self.id_count != len(materials):
+            self.rebuild(materials)
+        return self
+
+    def rebuild(self, materials):
+        self.names = sorted((m.name for m in materials if not m.is_grease_pencil and not m.name.startswith(".")), key=str.lower)
+        self.lookup = {name: i for i, name in enumerate(self.names)}
+        self.generation = material_generation
+        self.id_count = len(materials)
+
+    def ordered(self, scene):
+        """Names with the recently used materials of the scene first, cached until materials or history change"""
+        self.ensure()
+        key = (self.generation, self.id_count, history_version, scene.name_full)
+        if key != self.ordered_key:
+            recent = [item.name for item in scene.material_history if item.name in self.lookup]
+            recent_names = set(recent)
+            self.ordered_names = recent + [name for name in self.names if name not in recent_names]
+            self.ordered_key = key
+        return self.ordered_names
+
+
+cached_materials = MaterialIndex()
+
+
+# -------------------------------------
+# Recently used materials
+# -------------------------------------
+
+history_size = 100
+
+# bumped whenever an operator records a material, the menu ordering compares against it
+history_version = 0
+
+
+class MaterialHistoryItem(bpy.types.PropertyGroup):
+    # the builtin name property holds the material name
+    pass
+
+
+def remember_material(context, material):
+    """Moves material to the front of the recently used materials of the scene (saved with the file)"""
+    global history_version
+
+    history = context.scene.material_history
+    for i, item in enumerate(history):
+        if item.name == material.name:
+            history.remove(i)
+            break
+
+    item = history.add()
+    item.name = material.name
+    history.move(len(history) - 1, 0)
+
+    while len(history) > history_size:
+        history.remove(len(history) - 1)
+
+    history_version += 1
+    context.window_manager.material_menu_page = 0
+
+
+# -------------------------------------
+# Duplicate materials
+# -------------------------------------
+
+# node placement and ui state do not change the result, mute does
+node_skip = frozenset(bpy.types.Node.bl_rna.properties.keys()) - {"mute"}
+material_skip = frozenset(bpy.types.ID.bl_rna.properties.keys()) | {"node_tree", "preview", "texture_paint_images", "texture_paint_slots", "paint_active_slot"}
+struct_skip = frozenset({"rna_type"})
+
+signature_depth = 4
+struct_properties = {}
+
+
+def freeze_value(value, depth):
+    """Hashable form of an rna value, ids compare by name"""
+    if isinstance(value, bpy.types.ID):
+        return value.name_full
+    if isinstance(value, bpy.types.bpy_struct):
+        return struct_signature(value, struct_skip, depth - 1)
+    if isinstance(value, str):
+        return value
+    if isinstance(value, set):
+        return frozenset(value)
+    if hasattr(value, "__len__"):
+        # property arrays, vectors, colors and collections
+        return tuple(freeze_value(item, depth) for item in value)
+    return value
+
+
+def struct_signature(struct, skip, depth=signature_depth):
+    if depth <= 0:
+        # too deep to describe, the address keeps it from ever comparing equal
+        return ("struct", struct.as_pointer())
+
+    # the editable properties per rna type are looked up once
+    key = (struct.bl_rna.identifier, skip)
+    names = struct_properties.get(key)
+    if names is None:
+        names = struct_properties[key] = [
+            prop.identifier for prop in struct.bl_rna.properties
+            if prop.identifier not in skip and (not prop.is_readonly or prop.type in {'POINTER', 'COLLECTION'})]
+
+    return tuple(freeze_value(getattr(struct, name), depth) for name in names)
+
+
+def socket_values(sockets):
+    return tuple((socket.identifier, freeze_value(socket.default_value, signature_depth))
+                 for socket in sockets if hasattr(socket, "default_value"))
+
+
+def material_signature(material):
+    """Canonical description of a material: its settings, the nodes with their input defaults and the links.
+
+    Nodes are described by type and values, not by name, so trees built separately (e.g. 'Principled BSDF' and
+    'Principled BSDF.001') compare equal. Links refer to the descriptions of the nodes they connect."""
+    node_tree = material.node_tree if material.use_nodes else None
+    if node_tree is None:
+        return (struct_signature(material, material_skip), None)
+
+    node_signatures = {
+        node: (node.bl_idname, struct_signature(node, node_skip), socket_values(node.inputs), socket_values(node.outputs))
+        for node in node_tree.nodes}
+    nodes = tuple(sorted(node_signatures.values(), key=repr))
+    links = tuple(sorted(
+        ((node_signatures[link.from_node], link.from_socket.identifier, node_signatures[link.to_node],
+          link.to_socket.identifier, link.is_muted) for link in node_tree.links), key=repr))
+
+    return (struct_signature(material, material_skip), nodes, links)
+
+
+class MaterialSignatures():
+    """Material signatures cached by pointer until the material or its node tree gets a shading update"""
+
+    def __init__(self):
+        self.signatures = {}
+        # node tree pointer to material pointer, an embedded tree does not tell which material it belongs to
+        self.trees = {}
+
+    def get(self, material):
+        key = material.as_pointer()
+        signature = self.signatures.get(key)
+        if signature is None:
+            signature = self.signatures[key] = material_signature(material)
+            if material.node_tree:
+                self.trees[material.node_tree.as_pointer()] = key
+        return signature
+
+    def forget(self, material):
+        self.signatures.pop(material.as_pointer(), None)
+
+    def clear(self):
+        self.signatures.clear()
+        self.trees.clear()
+
+    def depsgraph_update(self, depsgraph):
+        for update in depsgraph.updates:
+            if not update.is_updated_shading:
+                continue
+            if isinstance(update.id, bpy.types.Material):
+                self.signatures.pop(update.id.original.as_pointer(), None)
+            elif isinstance(update.id, bpy.types.NodeTree):
+                key = self.trees.pop(update.id.original.as_pointer(), None)
+                self.signatures.pop(key, None)
+
+
+material_signatures = MaterialSignatures()
+
+
+@bpy.app.handlers.persistent
+def signature_depsgraph_update(scene, depsgraph):
+    material_signatures.depsgraph_update(depsgraph)
+
+
+@bpy.app.handlers.persistent
+def signature_file_changed(*args):
+    material_signatures.clear()
+
+
+app_handlers += [
+    (bpy.app.handlers.depsgraph_update_post, signature_depsgraph_update),
+    (bpy.app.handlers.load_post, signature_file_changed),
+    (bpy.app.handlers.undo_post, signature_file_changed),
+    (bpy.app.handlers.redo_post, signature_file_changed),
+]
+
+
+def merge_duplicate_materials(materials, remove=True):
+    """Remaps all users of identical materials to one survivor per group and compacts the slots.
+
+    Materials are grouped by signature in a dict, so the cost grows linearly with the number of materials
+    instead of comparing them pairwise. Signatures stay cached until a depsgraph update reports a shading
+    change, scripts editing materials right before a merge update the view layer first. Returns the number of
+    merged materials and of removed slots."""
+    groups = {}
+    for material in materials:
+        groups.setdefault(material_signatures.get(material), []).append(material)
+
+    survivors = {}
+    for group in groups.values():
+        if len(group) > 1:
+            # 'Metal' survives over 'Metal_3' over 'Metal_12'
+            group.sort(key=lambda material: (split_name_suffix(material.name)[1], material.name))
+            for duplicate in group[1:]:
+                survivors[duplicate] = group[0]
+
+    if not survivors:
+        return 0, 0
+
+    # one pass over the file finds every user, instead of an ID.user_remap per duplicate
+    user_map = bpy.data.user_map(subset=set(survivors))
+
+    datas = set()
+    remap_duplicates = set()
+    for duplicate, users in user_map.items():
+        for user in users:
+            if isinstance(user, bpy.types.Object):
+                for slot in user.material_slots:
+                    if slot.link == 'OBJECT' and slot.material in survivors:
+                        slot.material = survivors[slot.material]
+            elif isinstance(user, (bpy.types.Mesh, bpy.types.Curve, bpy.types.MetaBall)):
+                datas.add(user)
+            else:
+                # e.g. set material nodes, left to the generic remapping
+                remap_duplicates.add(duplicate)
+
+    for data in datas:
+        slot_materials = data.materials
+        for i, material in enumerate(slot_materials):
+            if material in survivors:
+                slot_materials[i] = survivors[material]
+
+    for duplicate in remap_duplicates:
+        duplicate.user_remap(survivors[duplicate])
+
+    removed = cleanup_data_material_slots(datas)
+
+    if remove:
+        # a later material may get the address of a removed one
+        for duplicate in survivors:
+            material_signatures.forget(duplicate)
+        bpy.data.batch_remove(list(survivors))
+    invalidate_material_caches()
+
+    return len(survivors), removed
+
+
+# -------------------------------------
+# Assignment queue
+# -------------------------------------
+
+class AssignmentQueue(MaterialCreateAssignMethods):
+    """Assignments kept as compact deltas and committed as a single undo step.
+
+    A delta is the data block, the indices of the faces (splines, characters) it covers and the material.
+    Pending deltas are written on the next timer tick with one read and one write per data block. The slots
+    and indices every data block had before its first delta are kept to discard the queue.
+
+    Written deltas belong to no undo step until the commit pushes one. An undo step another operator pushes in
+    between takes them in, undoing that step reverts them together with its own change and drops the queue."""
+
+    def __init__(self):
+        self.deltas = []
+        self.written = 0
+        self.originals = {}
+        self.mode = None
+        self.timer = self.flush
+
+    def __len__(self):
+        return len(self.deltas)
+
+    def record(self, context, material):
+        """Queues the assignment to the selection.
+
+        Metaballs and data without faces or splines have no elements to hold a delta, those objects get the
+        material right away like an unqueued assignment and discard leaves them as they are. Returns them."""
+        if context.mode == "EDIT_MESH":
+            objects = [object for object in context.selected_objects if object.type == 'MESH']
+        else:
+            objects = [object for object in context.selected_objects if object.type in {'MESH', 'CURVE', 'FONT', 'SURFACE', 'META'}]
+
+        users = {}
+        for object in objects:
+            users.setdefault(object.data, []).append(object)
+
+        direct = []
+        for data, data_users in users.items():
+            if context.mode == "EDIT_MESH":
+                faces = bmesh.from_edit_mesh(data).faces
+                count = len(faces)
+            elif isinstance(data, bpy.types.Mesh):
+                count = len(data.polygons)
+            elif isinstance(data, bpy.types.MetaBall):
+                count = 0
+            else:
+                count = len(get_material_index_elements(data))
+
+            if count == 0 and context.mode != "EDIT_MESH":
+                direct += data_users
+                continue
+
+            original = self.originals.get(data)
+            if original is not None and len(original[1]) != count:
+                # the topology changed since the first delta, the undo step of that edit holds what was written
+                self.commit()
+                original = None
+            if original is None:
+                self.originals[data] = (list(data.materials), get_material_indices(data))
+
+            if context.mode == "EDIT_MESH":
+                elements = np.fromiter((i for i, face in enumerate(faces) if face.select), dtype=np.int32)
+            else:
+                # object mode assignments cover the whole data
+                elements = np.arange(count, dtype=np.int32)
+
+            if len(elements):
+                self.deltas.append((data, elements, material))
+
+        if direct:
+            self.apply_material_to_objects(direct, material)
+
+        self.mode = context.mode
+        if not bpy.app.timers.is_registered(self.timer):
+            bpy.app.timers.register(self.timer, first_interval=0.0)
+        return direct
+
+    def flush(self):
+        """Writes the pending deltas"""
+        pending = self.deltas[self.written:]
+        self.written = len(self.deltas)
+
+        changes = {}
+        for data, elements, material in pending:
+            changes.setdefault(data, []).append((elements, material))
+
+        whole = set()
+        for data, data_changes in changes.items():
+            indices = get_material_indices(data)
+            new_indices = indices.copy()
+            for elements, material in data_changes:
+                covers_all = len(elements) == len(indices)
+                new_indices[elements] = self.get_material_slot(data, material, covers_all)
+                if covers_all:
+                    whole.add(data)
+            set_material_indices(data, new_indices, new_indices != indices)
+
+        # like the regular object mode assignment, whole data assignments drop the slots no longer used
+        cleanup_data_material_slots(whole)
+
+    def memory(self):
+        """Bytes held by the deltas and the original indices"""
+        return (sum(elements.nbytes for _, elements, _ in self.deltas)
+                + sum(indices.nbytes for _, indices in self.originals.values()))
+
+    def commit(self):
+        """Writes what is pending and forgets the deltas, the caller pushes the undo step"""
+        self.flush()
+        count = len(self.deltas)
+        self.clear()
+        return count
+
+    def remap(self, material, new_material):
+        """Points the deltas of material to new_material, e.g. after material.user_remap(new_material)"""
+        self.deltas = [(data, elements, new_material if delta_material == material else delta_material)
+                       for data, elements, delta_material in self.deltas]
+
+    def forget(self, material):
+        """Drops the deltas of material, the caller restores what was written of them"""
+        written = self.deltas[:self.written]
+        self.deltas = [delta for delta in self.deltas if delta[2] != material]
+        self.written = sum(1 for delta in written if delta[2] != material)
+        if not self.deltas:
+            self.clear()
+
+    def discard(self):
+        """Restores every touched data block to its state before the first delta.
+
+        Data whose topology changed since (e.g. extrude, delete or join in edit mode) keeps what was written,
+        as if committed. Returns the number of discarded deltas and of data blocks kept that way."""
+        count = len(self.deltas)
+        kept = restore_materials((self.originals, []))
+        self.clear()
+        return count, len(kept)
+
+    def clear(self):
+        if bpy.app.timers.is_registered(self.timer):
+            bpy.app.timers.unregister(self.timer)
+        self.deltas = []
+        self.written = 0
+        self.originals = {}
+        self.mode = None
+
+
+assignment_queue = AssignmentQueue()
+
+
+@bpy.app.handlers.persistent
+def queue_depsgraph_update(scene, depsgraph):
+    # switching modes pushes an undo step, which then holds the queued assignments
+    if assignment_queue.deltas and bpy.context.mode != assignment_queue.mode:
+        assignment_queue.commit()
+
+
+@bpy.app.handlers.persistent
+def queue_file_changed(*args):
+    # the deltas refer to a state which undo or loading replaced
+    assignment_queue.clear()
+
+
+app_handlers += [
+    (bpy.app.handlers.depsgraph_update_post, queue_depsgraph_update),
+    (bpy.app.handlers.load_post, queue_file_changed),
+    (bpy.app.handlers.undo_post, queue_file_changed),
+    (bpy.app.handlers.redo_post, queue_file_changed),
+]
+
+
+# -------------------------------------
+# Search
+# -------------------------------------
+
+def name_trigrams(text):
+    # the leading spaces make word starts count more than matches in the middle of a word
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MaterialSearchIndex():
+    """Prefix and trigram index over the menu materials, updated incrementally when materials change"""
+
+    max_results = 100
+    min_similarity = 0.5
+
+    def __init__(self):
+        self.generation = None
+        self.names = set()
+        self.keys = []
+        self.lowered = {}
+        self.rank = {}
+        self.ranked = None
+        self.trigrams = {}
+        self.postings = {}
+
+    def ensure(self):
+        material_index = cached_materials.ensure()
+        # keyed like the material index, removals outside the depsgraph only change the id count
+        key = (material_index.generation, material_index.id_count)
+        if self.generation == key:
+            return self
+
+        self.update(material_index.names)
+        self.generation = key
+        return self
+
+    def update(self, names):
+        """Brings the index in line with names, only touching what changed"""
+        names = set(names)
+        removed = self.names - names
+        added = names - self.names
+
+        for name in removed:
+            self.remove(name)
+
+        if len(added) > len(self.keys) // 4:
+            # bulk changes (e.g. loading a file) are cheaper to sort once
+            for name in added:
+                self.add_name(name)
+            self.keys.extend((self.lowered[name], name) for name in added)
+            self.keys.sort()
+            self.names.update(added)
+        else:
+            for name in added:
+                self.add(name)
+
+    def add(self, name):
+        self.names.add(name)
+        self.add_name(name)
+        bisect.insort(self.keys, (self.lowered[name], name))
+
+    def add_name(self, name):
+        lower = name.lower()
+        self.lowered[name] = lower
+        self.ranked = None
+        # substring and fuzzy matches tie break on the shorter name
+        self.rank[name] = (len(name), lower)
+
+        trigrams = name_trigrams(lower)
+        self.trigrams[name] = trigrams
+        for trigram in trigrams:
+            self.postings.setdefault(trigram, set()).add(name)
+
+    def remove(self, name):
+        self.names.discard(name)
+        self.rank.pop(name, None)
+        self.ranked = None
+        key = (self.lowered.pop(name, name.lower()), name)
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+
+        for trigram in self.trigrams.pop(name, ()):
+            posting = self.postings.get(trigram)
+            if posting:
+                posting.discard(name)
+                if not posting:
+                    del self.postings[trigram]
+
+    def query(self, text):
+        """Returns the best matching material names: exact and prefix matches first, then substring and fuzzy matches"""
+        text = text.strip().lower()
+        if not text:
+            return [name for _, name in self.keys[:self.max_results]]
+
+        # prefix matches are a contiguous range of the sorted keys
+        results = []
+        i = bisect.bisect_left(self.keys, (text,))
+        for lower, name in itertools.islice(self.keys, i, i + self.max_results):
+            if not lower.startswith(text):
+                break
+            results.append(name)
+
+        if len(results) < self.max_results:
+            results += self.substring_matches(text, set(results), self.max_results - len(results))
+
+        if len(results) < self.max_results:
+            results += self.fuzzy_matches(text, set(results), self.max_results - len(results))
+
+        return results
+
+    def ranked_names(self):
+        if self.ranked is None:
+            self.ranked = sorted(self.rank, key=self.rank.__getitem__)
+        return self.ranked
+
+    def take_best(self, names, count):
+        # large candidate sets are cheaper to find by walking the precomputed ranking until enough turned up
+        if len(names) > 8 * count:
+            return list(itertools.islice((name for name in self.ranked_names() if name in names), count))
+        return heapq.nsmallest(count, names, key=self.rank.__getitem__)
+
+    def substring_matches(self, text, found, count):
+        lowered = self.lowered
+        if len(text) < 3:
+            # short texts are contained in one of the indexed trigrams
+            candidates = set()
+            for trigram, posting in self.postings.items():
+                if text in trigram:
+                    candidates |= posting
+            return self.take_best(candidates - found, count)
+
+        # every trigram inside the text has to be present, intersect starting with the rarest
+        inner = sorted((text[i:i + 3] for i in range(len(text) - 2)), key=lambda t: len(self.postings.get(t, ())))
+        candidates = self.postings.get(inner[0], set()) - found
+        for trigram in inner[1:]:
+            if not candidates:
+                return []
+            candidates &= self.postings.get(trigram, set())
+
+        # longer texts need the trigrams in a row, checked lazily as the best candidates are taken
+        if len(text) > 3 and len(candidates) > 8 * count:
+            matches = (name for name in self.ranked_names() if name in candidates and text in lowered[name])
+            return list(itertools.islice(matches, count))
+        if len(text) > 3:
+            candidates = {name for name in candidates if text in lowered[name]}
+        return self.take_best(candidates, count)
+
+    def fuzzy_matches(self, text, found, count):
+        query_trigrams = name_trigrams(text)
+        required = max(1, int(len(query_trigrams) * self.min_similarity + 0.5))
+
+        # a name sharing `required` trigrams has to contain one of the rarest (n - required + 1) of them
+        by_rarity = sorted(query_trigrams, key=lambda t: len(self.postings.get(t, ())))
+        split = len(by_rarity) - required + 1
+        counts = collections.Counter()
+        for trigram in by_rarity[:split]:
+            counts.update(self.postings.get(trigram, ()))
+
+        # the remaining trigrams only need to be counted for those candidates
+        candidates = set(counts)
+        for trigram in by_rarity[split:]:
+            counts.update(candidates & self.postings.get(trigram, set()))
+
+        # more shared trigrams first, sorted and sliced into levels without touching every candidate in python
+        ordered = sorted(counts.items(), key=operator.itemgetter(1), reverse=True)
+        end = bisect.bisect_right(ordered, -required, key=lambda item: -item[1])
+
+        matches = []
+        start = 0
+        while start < end and len(matches) < count:
+            shared = ordered[start][1]
+            stop = bisect.bisect_right(ordered, -shared, lo=start, hi=end, key=lambda item: -item[1])
+            level = dict(ordered[start:stop])
+            for name in found:
+                level.pop(name, None)
+            matches += self.take_best(level, count - len(matches))
+            start = stop
+        return matches
+
+
+material_search = MaterialSearchIndex()
+
+
+# -------------------------------------
+# Headless API
+# -------------------------------------
+
+# numpy types to read face attributes with foreach_get
+attribute_dtypes = {
+    'INT': np.int32,
+    'INT8': np.int8,
+    'BOOLEAN': bool,
+    'FLOAT': np.float32,
+}
+
+
+def read_face_attribute(mesh, name):
+    """Returns the values of a face domain attribute as array, or None if the mesh has no such attribute"""
+    attribute = mesh.attributes.get(name)
+    if attribute is None or attribute.domain != 'FACE' or attribute.data_type not in attribute_dtypes:
+        return None
+
+    values = np.empty(len(mesh.polygons), dtype=attribute_dtypes[attribute.data_type])
+    attribute.data.foreach_get("value", values)
+    return values
+
+
+def resolve_material(material):
+    """Accepts a material or a material name, names of missing materials create a new material"""
+    if isinstance(material, bpy.types.Material):
+        return material
+
+    existing = bpy.data.materials.get(material)
+    if existing:
+        return existing
+    return MaterialCreateAssignMethods().create_material(create_unique_name(material), (0.7, 0.7, 0.7, 1.0), "Principled")
+
+
+class ObjectNameRule():
+    """Assigns material to objects whose name matches the fnmatch pattern"""
+
+    def __init__(self, pattern, material):
+        self.pattern = pattern
+        self.material = resolve_material(material)
+
+    def matches(self, object):
+        return fnmatch.fnmatchcase(object.name, self.pattern)
+
+
+class CollectionNameRule():
+    """Assigns material to objects in a collection whose name matches the fnmatch pattern"""
+
+    def __init__(self, pattern, material):
+        self.pattern = pattern
+        self.material = resolve_material(material)
+
+    def matches(self, object):
+        return any(fnmatch.fnmatchcase(collection.name, self.pattern) for collection in object.users_collection)
+
+
+class FaceAttributeRule():
+    """Assigns material to the faces whose face attribute equals value"""
+
+    def __init__(self, attribute, value, material):
+        self.attribute = attribute
+        self.value = value
+        self.material = resolve_material(material)
+
+
+def apply_rules(objects, rules, link='DATA'):
+    """Applies the rules to the objects in bulk, without operators, selection or mode switches.
+
+    Object and collection rules assign whole objects, the first matching rule wins. Face attribute rules
+    assign faces of meshes in object mode, later rules overwrite earlier ones. Returns throughput stats."""
+    start = time.perf_counter()
+    methods = MaterialCreateAssignMethods()
+    stats = collections.Counter()
+
+    object_rules = [rule for rule in rules if not isinstance(rule, FaceAttributeRule)]
+    face_rules = [rule for rule in rules if isinstance(rule, FaceAttributeRule)]
+
+    by_material = {}
+    meshes = {}
+    for object in objects:
+        if object.type not in {'MESH', 'CURVE', 'FONT', 'SURFACE', 'META'}:
+            continue
+
+        stats["objects"] += 1
+        rule = next((rule for rule in object_rules if rule.matches(object)), None)
+        if rule:
+            by_material.setdefault(rule.material, []).append(object)
+        if face_rules and object.type == 'MESH' and not object.data.is_editmode:
+            meshes[object.data] = object
+
+    for material, material_objects in by_material.items():
+        _, updates = methods.apply_material_to_objects(material_objects, material, link)
+        stats["assigned_objects"] += len(material_objects)
+        stats["data_updates"] += updates
+
+    for mesh in meshes:
+        faces = apply_face_rules(methods, mesh, face_rules)
+        if faces:
+            stats["faces"] += faces
+            stats["data_updates"] += 1
+
+    stats = dict(stats)
+    stats["seconds"] = time.perf_counter() - start
+    stats["objects_per_second"] = stats.get("objects", 0) / max(stats["seconds"], 1e-9)
+    stats["faces_per_second"] = stats.get("faces", 0) / max(stats["seconds"], 1e-9)
+    return stats
+
+
+def apply_face_rules(methods, mesh, rules):
+    """Writes the material indices of all face rules with a single foreach_set, returns the number of assigned faces"""
+    indices = get_material_indices(mesh)
+    assigned = np.zeros(len(indices), dtype=bool)
+    values = {}
+
+    for rule in rules:
+        if rule.attribute not in values:
+            values[rule.attribute] = read_face_attribute(mesh, rule.attribute)
+        if values[rule.attribute] is None:
+            continue
+
+        mask = values[rule.attribute] == rule.value
+        if not mask.any():
+            continue
+
+        indices[mask] = methods.get_material_slot(mesh, rule.material, bool(mask.all()))
+        assigned |= mask
+
+    faces = int(assigned.sum())
+    if faces:
+        mesh.polygons.foreach_set("material_index", indices)
+        mesh.update()
+    return faces
+
+
+def process_files(filepaths, create_rules, save=True):
+    """Opens every .blend file, applies the rules from create_rules() to all its objects and saves it.
+
+    create_rules is called once per file, as rules reference the materials of the open file.
+    Meant for batch runs, e.g. blender -b --python script.py. Returns the accumulated stats.
+    Files which can't be opened or saved (missing, no permission, not a blend file) are counted in
+    failed_files and the run goes on with the next one."""
+    totals = collections.Counter()
+    start = time.perf_counter()
+
+    for filepath in filepaths:
+        try:
+            bpy.ops.wm.open_mainfile(filepath=filepath)
+        except (RuntimeError, OSError):
+            totals["failed_files"] += 1
+            continue
+
+        stats = apply_rules(bpy.data.objects, create_rules())
+        totals.update({key: value for key, value in stats.items() if not key.endswith("_second")})
+
+        if save:
+            try:
+                bpy.ops.wm.save_mainfile()
+            except (RuntimeError, OSError):
+                totals["failed_files"] += 1
+                continue
+        totals["files"] += 1
+
+    totals = dict(totals)
+    totals["total_seconds"] = time.perf_counter() - start
+    totals["files_per_second"] = totals.get("files", 0) / max(totals["total_seconds"], 1e-9)
+    return totals
+
+
+# -------------------------------------
+# Materials from face data
+# -------------------------------------
+
+def unique_values(values):
+    """np.unique(values, return_inverse=True), in linear time for integers with a compact range"""
+    if len(values) and values.dtype.kind in "iub":
+        values = values.astype(np.int64)
+        low = int(values.min())
+        span = int(values.max()) - low + 1
+        if span <= 2 * len(values):
+            offsets = values - low
+            present = np.bincount(offsets, minlength=span) > 0
+            inverse = (np.cumsum(present) - 1)[offsets]
+            return np.flatnonzero(present) + low, inverse
+
+    return np.unique(values, return_inverse=True)
+
+
+def assign_materials_from_values(mesh, values, material_for_value, skip_value=None):
+    """Assigns one material per distinct face value in a single vectorized pass, returns the number of assigned faces.
+
+    material_for_value(value) is called once per distinct value, faces with skip_value keep their material."""
+    mask = values != skip_value if skip_value is not None else np.ones(len(values), dtype=bool)
+    uniques, inverse = unique_values(values[mask])
+    if len(uniques) == 0:
+        return 0
+
+    # no materials yet, the untouched faces keep an empty first slot
+    if len(mesh.materials) == 0 and not mask.all():
+        mesh.materials.append(None)
+
+    slot_by_material = {}
+    for i, material in enumerate(mesh.materials):
+        slot_by_material.setdefault(material, i)
+
+    table = np.empty(len(uniques), dtype=np.int32)
+    for i, value in enumerate(uniques.tolist()):
+        material = material_for_value(value)
+        if material not in slot_by_material:
+            slot_by_material[material] = len(mesh.materials)
+            mesh.materials.append(material)
+        table[i] = slot_by_material[material]
+
+    indices = get_material_indices(mesh)
+    indices[mask] = table[inverse]
+    mesh.polygons.foreach_set("material_index", indices)
+    mesh.update()
+    return int(np.count_nonzero(mask))
+
+
+def read_vertex_group_faces(object):
+    """Returns per face the index of the last vertex group containing all of its vertices, or -1"""
+    mesh = object.data
+    values = np.full(len(mesh.polygons), -1, dtype=np.int32)
+    if not object.vertex_groups or not len(mesh.polygons):
+        return values
+
+    # vertex group membership has no foreach access, this is the only per vertex python loop. It only
+    # collects the (vertex, group) pairs, memory grows with the memberships instead of groups times vertices
+    pair_vertices = array.array("i")
+    pair_groups = array.array("i")
+    for vertex in mesh.vertices:
+        for element in vertex.groups:
+            if element.weight > 0.0:
+                pair_vertices.append(vertex.index)
+                pair_groups.append(element.group)
+    if not pair_vertices:
+        return values
+
+    pair_vertices = np.frombuffer(pair_vertices, dtype=np.int32)
+    pair_groups = np.frombuffer(pair_groups, dtype=np.int32)
+    order = np.argsort(pair_vertices, kind="stable")
+    pair_groups = pair_groups[order]
+    # the groups of vertex v are pair_groups[vertex_starts[v]:vertex_starts[v] + group_counts[v]]
+    group_counts = np.bincount(pair_vertices, minlength=len(mesh.vertices))
+    vertex_starts = np.cumsum(group_counts) - group_counts
+
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    loop_faces = np.repeat(np.arange(len(mesh.polygons)), loop_totals)
+
+    # one (face, group) pair per face corner and group of its vertex
+    corner_counts = group_counts[loop_vertices]
+    corner_faces = np.repeat(loop_faces, corner_counts)
+    offsets = np.arange(corner_counts.sum()) - np.repeat(np.cumsum(corner_counts) - corner_counts, corner_counts)
+    corner_groups = pair_groups[np.repeat(vertex_starts[loop_vertices], corner_counts) + offsets]
+
+    # a face is in a group when every one of its corners is
+    pairs, counts = np.unique(np.stack((corner_faces, corner_groups), axis=1), axis=0, return_counts=True)
+    inside = pairs[counts == loop_totals[pairs[:, 0]]]
+    np.maximum.at(values, inside[:, 0], inside[:, 1])
+    return values
+
+
+def read_face_map_faces(object):
+    """Returns per face its face map index, or -1 (face maps exist before blender 4.0 only)"""
+    mesh = object.data
+    if not getattr(mesh, "face_maps", None):
+        return None
+
+    values = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.face_maps[0].data.foreach_get("value", values)
+    return values
+
+
+def value_color(index):
+    # golden ratio hue steps keep neighbouring values apart
+    return colorsys.hsv_to_rgb((index * 0.618034) % 1.0, 0.55, 0.85) + (1.0,)
+
+
+face_data_sources = [
+    ("ATTRIBUTE", "Face Attribute", "One material per value of an integer or boolean face attribute"),
+    ("VERTEX_GROUP", "Vertex Groups", "One material per vertex group, for faces with all vertices in the group"),
+]
+
+# face maps were removed in blender 4.0
+if bpy.app.version < (4, 0, 0):
+    face_data_sources.append(("FACE_MAP", "Face Maps", "One material per face map"))
+
+
+def assign_materials_from_face_data(objects, source, attribute="", materials=None, shader="Principled"):
+    """Assigns materials to mesh faces based on face attribute values, vertex groups or face maps.
+
+    materials maps values (or the material names that would be created, e.g. 'part_id_3' or a vertex group name)
+    to materials. Missing materials are looked up by name and otherwise created. Works on meshes in object mode,
+    every mesh is written once with a single foreach_set. Returns the number of assigned faces."""
+    methods = MaterialCreateAssignMethods()
+    materials = dict(materials or {})
+
+    def get_material(value, name):
+        material = materials.get(value) or materials.get(name)
+        if material is None:
+            material = bpy.data.materials.get(name)
+            if material is None:
+                material = methods.create_material(create_unique_name(name), value_color(len(materials)), shader)
+            materials[name] = material
+        return resolve_material(material)
+
+    faces = 0
+    meshes = set()
+    for object in objects:
+        if object.type != 'MESH' or object.data.is_editmode or object.data in meshes:
+            continue
+        meshes.add(object.data)
+
+        if source == 'ATTRIBUTE':
+            values = read_face_attribute(object.data, attribute)
+            names = lambda value: f"{attribute}_{value}"
+            skip_value = None
+        elif source == 'VERTEX_GROUP':
+            values = read_vertex_group_faces(object)
+            names = lambda value, groups=object.vertex_groups: groups[value].name
+            skip_value = -1
+        else:
+            values = read_face_map_faces(object)
+            names = lambda value, face_maps=getattr(object, "face_maps", ()): face_maps[value].name
+            skip_value = -1
+
+        if values is None:
+            continue
+
+        faces += assign_materials_from_values(object.data, values, lambda value: get_material(value, names(value)), skip_value)
+
+    return faces
+
+
+# -------------------------------------
+# Material libraries
+# -------------------------------------
+
+class MaterialLibrary():
+    """Material names of the .blend files in the library directories, cached on disk.
+
+    Only files whose modification time changed are opened again. Blender reads the names of the datablocks
+    in a file without loading them, shader types and previews would need a full load and are not indexed."""
+
+    version = 1
+
+    def __init__(self):
+        self.files = None
+        self.entries = {}
+        self.search = MaterialSearchIndex()
+        # file path and error of the files the last refresh could not read
+        self.failed = {}
+
+    def cache_path(self):
+        directory = bpy.utils.user_resource('CONFIG', path="create_assign_material", create=True)
+        return os.path.join(directory, "material_library.json")
+
+    def load_cache(self):
+        try:
+            with open(self.cache_path()) as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return cache.get("files", {}) if cache.get("version") == self.version else {}
+
+    def write_cache(self):
+        with open(self.cache_path(), "w") as file:
+            json.dump({"version": self.version, "files": self.files}, file, separators=(",", ":"))
+
+    def refresh(self, directories):
+        """Rescans changed files of the directories, returns the number of files read.
+
+        Files which can't be read (removed while scanning, no permission, not a blend file) are skipped and
+        listed in failed, the next refresh tries them again."""
+        if self.files is None:
+            self.files = self.load_cache()
+
+        self.failed = {}
+        found = {}
+        for directory in directories:
+            for root, _, filenames in os.walk(directory):
+                for filename in fnmatch.filter(filenames, "*.blend"):
+                    filepath = os.path.join(root, filename)
+                    try:
+                        found[filepath] = (directory, os.path.getmtime(filepath))
+                    except OSError as error:
+                        self.failed[filepath] = str(error)
+
+        read = 0
+        for filepath, (directory, mtime) in list(found.items()):
+            cached = self.files.get(filepath)
+            if cached is None or cached["mtime"] != mtime:
+                try:
+                    with bpy.data.libraries.load(filepath) as (data_from, data_to):
+                        names = list(data_from.materials)
+                except OSError as error:
+                    self.failed[filepath] = str(error)
+                    del found[filepath]
+                    continue
+                self.files[filepath] = {"mtime": mtime, "directory": directory, "materials": names}
+                read += 1
+
+        removed = self.files.keys() - found.keys()
+        for filepath in removed:
+            del self.files[filepath]
+
+        if read or removed:
+            self.write_cache()
+
+        self.entries = {}
+        for filepath, cached in self.files.items():
+            relative = os.path.relpath(filepath, cached["directory"])
+            for name in cached["materials"]:
+                self.entries.setdefault(f"{name} ({relative})", (filepath, name))
+        self.search.update(self.entries)
+        return read
+
+    def material(self, entry, link=False):
+        """Appends or links the material of a library entry, appended materials are reused on later calls"""
+        filepath, name = self.entries[entry]
+        source = f"{filepath}:{name}"
+
+        if link:
+            filepath = os.path.normpath(filepath)
+            material = next((m for m in bpy.data.materials if m.library and m.name == name
+                             and os.path.normpath(bpy.path.abspath(m.library.filepath)) == filepath), None)
+        else:
+            material = next((m for m in bpy.data.materials if m.get("library_source") == source), None)
+        if material is not None:
+            return material
+
+        with bpy.data.libraries.load(filepath, link=link) as (data_from, data_to):
+            data_to.materials = [name]
+        material = data_to.materials[0]
+
+        if not link:
+            material["library_source"] = source
+        invalidate_material_caches()
+        return material
+
+
+material_library = MaterialLibrary()
+
+
+def library_directories():
+    return [bpy.path.abspath(directory.strip()) for directory in get_preferences().library_directories.split(";")
+            if directory.strip() and os.path.isdir(bpy.path.abspath(directory.strip()))]
+
+
+# -------------------------------------
+# Preferences
+# -------------------------------------
+
+def get_preferences():
+    preferences = bpy.context.preferences
+    addon_prefs = preferences.addons[__package__].preferences
+    return addon_prefs
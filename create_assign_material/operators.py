@@ -0,0 +1,641 @@
+"""Operators for creating, assigning and cleaning up materials"""
+
+import fnmatch
+import itertools
+import time
+
+import bpy
+
+from bpy_extras.io_utils import ImportHelper
+
+from .core import (
+    MaterialCreateAssignMethods,
+    assign_materials_from_face_data,
+    assignment_queue,
+    cleanup_material_slots,
+    create_materials,
+    create_unique_name,
+    face_data_sources,
+    get_preferences,
+    invalidate_material_caches,
+    library_directories,
+    material_library,
+    material_link_items,
+    material_search,
+    merge_duplicate_materials,
+    read_palette,
+    remember_material,
+    restore_materials,
+    set_material_color,
+    shader_type_items,
+    snapshot_materials,
+)
+
+
+# -------------------------------------
+# Operators
+# -------------------------------------
+
+class MaterialSlotCleanup(bpy.types.Operator):
+    """Remove unused material slots from selected object"""
+    bl_idname = "object.material_slot_cleanup"
+    bl_label = "Material slot cleanup"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.selected_objects) > 0
+    
+    def invoke(self, context, event):
+        return self.execute(context)
+
+    def execute(self, context):
+        removed = cleanup_material_slots(context.selected_objects)
+        self.report({'INFO'}, f"Removed {removed} material slots")
+        return {'FINISHED'}
+
+
+class MaterialMergeDuplicates(bpy.types.Operator):
+    """Merge materials with identical settings and node trees into one"""
+    bl_idname = "object.material_merge_duplicates"
+    bl_label = "Merge duplicate materials"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    remove_duplicates: bpy.props.BoolProperty(name="Remove duplicates", description="Delete the merged materials instead of leaving them without users", default=True)
+
+    def execute(self, context):
+        materials = [material for material in bpy.data.materials
+                     if not material.library and not material.is_grease_pencil and not material.name.startswith(".")]
+        merged, removed = merge_duplicate_materials(materials, self.remove_duplicates)
+        self.report({'INFO'}, f"Merged {merged} duplicate materials, removed {removed} material slots")
+        return {'FINISHED'}
+
+
+# -------------------------------------
+# Live tweaking
+# -------------------------------------
+
+class LiveMaterial(MaterialCreateAssignMethods):
+    """A material which is created and assigned once, then patched in place while the create dialog is open.
+
+    Color and name changes only touch the material. A shader change copies the new template and remaps the
+    users of the old material, so no face is written again while tweaking. With queueing enabled the
+    assignment goes into the assignment queue like any other, stats is None and direct lists the objects
+    assigned right away."""
+
+    def __init__(self, context, name, color, shader, cleanup_slots=False, link='DATA'):
+        if context.mode == "EDIT_MESH":
+            objects = [object for object in context.selected_objects if object.type == 'MESH']
+        else:
+            objects = [object for object in context.selected_objects if object.type in {'MESH', 'CURVE', 'FONT', 'SURFACE', 'META'}]
+
+        queued = self.use_queue(context)
+        if queued:
+            # reverting restores the snapshot, which has to hold the assignments queued before
+            assignment_queue.flush()
+        self.snapshot = snapshot_materials(objects)
+        self.shader = shader
+        self.material = self.create_material(name, color, shader)
+        self.stats = None
+        self.direct = []
+        if queued:
+            self.direct = assignment_queue.record(context, self.material)
+        else:
+            self.stats = self.apply_material_to_selection(context, self.material, cleanup_slots, link)
+
+    def set_color(self, color):
+        set_material_color(self.material, color)
+
+    def set_shader(self, shader, color):
+        if shader == self.shader:
+            return
+
+        name = self.material.name
+        material = self.create_material(name, color, shader)
+        self.material.user_remap(material)
+        assignment_queue.remap(self.material, material)
+        bpy.data.materials.remove(self.material)
+
+        material.name = name
+        self.material = material
+        self.shader = shader
+        invalidate_material_caches()
+
+    def rename(self, name):
+        """Renames the material, returns the name it got (a taken name gets a suffix like new materials)"""
+        if name != self.material.name:
+            self.material.name = create_unique_name(name)
+            invalidate_material_caches()
+        return self.material.name
+
+    def revert(self):
+        assignment_queue.forget(self.material)
+        restore_materials(self.snapshot)
+        bpy.data.materials.remove(self.material)
+        invalidate_material_caches()
+
+
+# the material of the open create dialog, property updates of the dialog patch it
+live_material = None
+
+
+class MaterialCreateAssign(bpy.types.Operator, MaterialCreateAssignMethods):
+    """Creates and assigns a material to the selected objects/faces"""
+    bl_idname = "object.material_create_assign"
+    bl_label = "Create / Assign Material"
+    bl_options = {'REGISTER', 'UNDO'}
+         
+    def name_update(self, context):
+        if live_material is not None:
+            name = live_material.rename(self.name)
+        else:
+            name = create_unique_name(self.name)
+        if name != self.name:
+            self.name = name
+
+    def shader_update(self, context):
+        if live_material is not None:
+            live_material.set_shader(self.shader, self.color)
+
+    def color_update(self, context):
+        if live_material is not None:
+            live_material.set_color(self.color)
+         
+    name: bpy.props.StringProperty(name="Name", default="Material", update=name_update)
+    shader: bpy.props.EnumProperty(name="Shader", items=shader_type_items, update=shader_update)
+    color: bpy.props.FloatVectorProperty(name="Color", subtype='COLOR', min=0, soft_max=1.0, size=4, default=(0.7,0.7,0.7, 1.0), update=color_update)
+    cleanup_material_slots: bpy.props.BoolProperty(name="Cleanup material slots", default=False)
+    link: bpy.props.EnumProperty(name="Link", items=material_link_items)
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.selected_objects) > 0
+
+    def invoke(self, context, event):
+        global live_material
+
+        self.init = False
+        live_material = None
+
+        # chunked selections are too large to assign before confirming, they go through execute
+        if get_preferences().live_tweak and context.mode in {"EDIT_MESH", "OBJECT"} and not self.use_chunked(context):
+            # the geometry is written (or queued) once here, the dialog then only patches the material
+            self.name = create_unique_name(self.name)
+            self.init = True
+            live_material = LiveMaterial(context, self.name, self.color, self.shader, self.cleanup_material_slots, self.link)
+
+        return context.window_manager.invoke_props_dialog(self)
+
+    def cancel(self, context):
+        global live_material
+
+        if live_material is not None:
+            live_material.revert()
+            live_material = None
+
+    def draw(self, context):
+        #this is a bit ugly, but circumvents the _restricted context somehow..
+        if not self.init:
+            self.name = create_unique_name(self.name)
+            self.init = True
+
+        layout = self.layout
+        layout.use_property_split = True
+        layout.use_property_decorate = False  # No animation.
+        
+        flow = layout.grid_flow(row_major=True, columns=0, even_columns=False, even_rows=False, align=True)
+        col = flow.column()
+   
+        col.prop(self, "name")
+        col.prop(self, "shader")
+        col.prop(self, "color")
+       
+        # slot cleanup and linking are decided when the live material is assigned
+        if live_material is not None:
+            return
+
+        if context.mode == "EDIT_MESH":        
+            col.prop(self, "cleanup_material_slots")
+        elif context.mode == "OBJECT":
+            col.prop(self, "link")
+         
+        
+    def execute(self, context):
+        global live_material
+
+        if live_material is not None:
+            # confirming the live dialog, everything is in place already
+            queued = live_material.stats is None
+            if queued:
+                self.report_direct(live_material.direct)
+            else:
+                self.report_assignment(live_material.stats)
+            remember_material(context, live_material.material)
+            live_material = None
+            # the queue commits the undo step
+            return {'CANCELLED'} if queued else {'FINISHED'}
+
+        if context.mode in {"EDIT_MESH", "OBJECT"}:
+            material = self.create_material(self.name, self.color, self.shader)
+            if self.queue_assignment(context, material):
+                # the queue commits the undo step
+                return {'CANCELLED'}
+            if self.assign_chunked(context, material, self.cleanup_material_slots, self.link):
+                # the chunked assignment pushes the undo step for the material creation as well
+                return {'CANCELLED'}
+            self.report_assignment(self.apply_material_to_selection(context, material, self.cleanup_material_slots, self.link))
+            remember_material(context, material)
+
+        return {'FINISHED'}
+    
+    
+
+
+# -------------------------------------
+# Palettes
+# -------------------------------------
+
+class MaterialPaletteCreate(bpy.types.Operator, ImportHelper, MaterialCreateAssignMethods):
+    """Creates materials from a palette file (.csv/.json with name, color, shader, pattern) and optionally assigns them"""
+    bl_idname = "object.material_palette_create"
+    bl_label = "Create Materials from Palette"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filter_glob: bpy.props.StringProperty(default="*.csv;*.json", options={'HIDDEN'})
+    shader: bpy.props.EnumProperty(name="Shader", description="Shader for entries without one", items=shader_type_items)
+    assign: bpy.props.EnumProperty(name="Assign", items=[
+        ("NONE", "None", "Only create the materials"),
+        ("ROUND_ROBIN", "Round Robin", "Assign the materials in turn to the selected objects"),
+        ("PATTERN", "By Pattern", "Assign each material to the selected objects matching its pattern column (e.g. 'Wall*')"),
+    ])
+
+    def execute(self, context):
+        try:
+            entries = read_palette(self.filepath)
+        except (OSError, ValueError, KeyError, AttributeError) as error:
+            self.report({'ERROR'}, f"Could not read palette: {error}")
+            return {'CANCELLED'}
+
+        if self.assign != 'NONE' and context.mode != 'OBJECT':
+            self.report({'WARNING'}, "Palette materials are only assigned in object mode")
+            return {'CANCELLED'}
+
+        start = time.perf_counter()
+        materials = create_materials(entries, self.shader)
+
+        objects = sorted((o for o in context.selected_objects if o.type in {'MESH', 'CURVE', 'FONT', 'SURFACE', 'META'}), key=lambda o: o.name)
+        if self.assign == 'ROUND_ROBIN' and materials:
+            for object, material in zip(objects, itertools.cycle(materials)):
+                self.apply_material_to_object(object, material)
+
+        elif self.assign == 'PATTERN':
+            for entry, material in zip(entries, materials):
+                if entry["pattern"]:
+                    matches = [object for object in objects if fnmatch.fnmatchcase(object.name, entry["pattern"])]
+                    self.apply_material_to_objects(matches, material)
+
+        duration = max(time.perf_counter() - start, 1e-9)
+        self.report({'INFO'}, f"Created {len(materials)} materials in {duration:.2f}s ({len(materials) / duration:,.0f} per second)")
+        return {'FINISHED'}
+
+
+# -------------------------------------
+# Assign
+# -------------------------------------
+
+def search_material_names(self, context, edit_text):
+    return material_search.ensure().query(edit_text)
+
+
+# string properties accept a search callback since blender 3.3, older versions fall back to prop_search
+if bpy.app.version >= (3, 3, 0):
+    material_name_search = {"search": search_material_names, "search_options": set()}
+else:
+    material_name_search = {}
+
+
+class MaterialAssign(bpy.types.Operator, MaterialCreateAssignMethods):    
+    '''Assigns a material to current selection'''
+    bl_idname = "object.material_assign"
+    bl_label = "Assign Material"    
+    bl_options = {'REGISTER', 'UNDO', 'INTERNAL'}
+        
+    material_name: bpy.props.StringProperty(name='Material Name', maxlen=63, **material_name_search)
+    show_list_dialog: bpy.props.BoolProperty(name="Pick from List", default=False)
+    link: bpy.props.EnumProperty(name="Link", items=material_link_items)
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.selected_objects) > 0
+
+    def invoke(self, context, event):
+        if self.show_list_dialog:
+            return context.window_manager.invoke_props_dialog(self, width = 400)
+        else:
+            return self.execute(context)
+        
+    def execute(self, context):
+        if not self.material_name:
+            return {'FINISHED'}
+
+        material = bpy.data.materials.get(self.material_name)
+        if material is None:
+            self.report({'WARNING'}, f"Material '{self.material_name}' not found")
+            return {'CANCELLED'}
+
+        if self.queue_assignment(context, material):
+            return {'CANCELLED'}
+        if self.assign_chunked(context, material, link=self.link):
+            return {'CANCELLED'}
+
+        self.report_assignment(self.apply_material_to_selection(context, material, link=self.link))
+        remember_material(context, material)
+
+        return {'FINISHED'}
+
+    def draw(self, context):
+        layout = self.layout
+        col = layout.column()
+
+        if material_name_search:
+            col.prop(self, "material_name", icon='VIEWZOOM')
+        else:
+            col.prop_search(self, "material_name", bpy.data, "materials")
+
+        if context.mode == "OBJECT":
+            col.prop(self, "link")
+
+
+# -------------------------------------
+# Chunked execution
+# -------------------------------------
+
+class ChunkedTask():
+    """Calls function for every item, in chunks limited by a time budget"""
+
+    def __init__(self, items, function):
+        self.items = items
+        self.function = function
+        self.done = 0
+
+    def step(self, budget):
+        """Processes items until budget (seconds) is used up, returns True once all items are done"""
+        end = time.perf_counter() + budget
+        while self.done < len(self.items):
+            self.function(self.items[self.done])
+            self.done += 1
+            if time.perf_counter() >= end:
+                break
+        return self.done >= len(self.items)
+
+
+class MaterialAssignChunked(bpy.types.Operator, MaterialCreateAssignMethods):
+    """Assigns a material to a large selection in small chunks with progress, ESC cancels"""
+    bl_idname = "object.material_assign_chunked"
+    bl_label = "Assign Material (Chunked)"
+    bl_options = {'REGISTER', 'UNDO', 'INTERNAL'}
+
+    material_name: bpy.props.StringProperty(name='Material Name', maxlen=63)
+    cleanup_material_slots: bpy.props.BoolProperty(name="Cleanup material slots", default=False)
+    link: bpy.props.EnumProperty(name="Link", items=material_link_items)
+
+    def setup(self, context):
+        self.material = bpy.data.materials.get(self.material_name)
+        if self.material is None:
+            self.report({'WARNING'}, f"Material '{self.material_name}' not found")
+            return False
+
+        self.edit_mode = context.mode == "EDIT_MESH"
+        if self.edit_mode:
+            self.objects = [object for object in context.selected_objects if object.type == 'MESH']
+            items = self.objects
+        else:
+            # every chunk item is a data block with all its users, so shared data is still written once
+            users = {}
+            for object in context.selected_objects:
+                if object.type in {'MESH', 'CURVE', 'FONT', 'SURFACE', 'META'}:
+                    users.setdefault(object.data, []).append(object)
+            items = list(users.values())
+
+        self.task = ChunkedTask(items, self.process)
+        self.stats = [0, 0]
+        return True
+
+    def process(self, item):
+        if self.edit_mode:
+            self.apply_material_to_polygons(item, self.material)
+            objects, updates = 1, 1
+        else:
+            objects, updates = self.apply_material_to_objects(item, self.material, self.link)
+
+        self.stats[0] += objects
+        self.stats[1] += updates
+
+    def finish(self, context):
+        if self.edit_mode and self.cleanup_material_slots:
+            cleanup_material_slots(self.objects[:self.task.done])
+
+        self.report_assignment(self.stats)
+        remember_material(context, self.material)
+
+    def execute(self, context):
+        if not self.setup(context):
+            return {'CANCELLED'}
+
+        self.task.step(float("inf"))
+        self.finish(context)
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not self.setup(context):
+            return {'CANCELLED'}
+
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(0.001, window=context.window)
+        wm.progress_begin(0, max(1, len(self.task.items)))
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        # allow navigation
+        if event.type in {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}:
+            return {'PASS_THROUGH'}
+
+        done = False
+        if event.type == 'ESC':
+            # the chunks done so far stay applied and go into the single undo step
+            self.report({'WARNING'}, f"Cancelled after {self.task.done} of {len(self.task.items)} items")
+            done = True
+        elif event.type == 'TIMER':
+            done = self.task.step(get_preferences().chunk_budget / 1000.0)
+            context.window_manager.progress_update(self.task.done)
+            context.workspace.status_text_set(
+                text=f"Assigning {self.material.name}: {self.task.done} / {len(self.task.items)} (ESC to cancel)")
+
+        if not done:
+            return {'RUNNING_MODAL'}
+
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        context.workspace.status_text_set(text=None)
+
+        self.finish(context)
+        return {'FINISHED'}
+
+
+# -------------------------------------
+# Assignment queue
+# -------------------------------------
+
+class MaterialQueueCommit(bpy.types.Operator):
+    """Commit the queued material assignments as one undo step"""
+    bl_idname = "object.material_queue_commit"
+    bl_label = "Commit Material Assignments"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return len(assignment_queue) > 0
+
+    def execute(self, context):
+        memory = assignment_queue.memory()
+        count = assignment_queue.commit()
+        self.report({'INFO'}, f"Committed {count} material assignments ({memory / 1024:.1f} KiB of deltas)")
+        return {'FINISHED'}
+
+
+class MaterialQueueDiscard(bpy.types.Operator):
+    """Revert the queued material assignments"""
+    bl_idname = "object.material_queue_discard"
+    bl_label = "Discard Material Assignments"
+    # back to the state of the last undo step, so there is nothing to push
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return len(assignment_queue) > 0
+
+    def execute(self, context):
+        count, kept = assignment_queue.discard()
+        if kept:
+            self.report({'WARNING'}, f"Discarded {count} material assignments, {kept} meshes changed their faces since and keep them")
+        else:
+            self.report({'INFO'}, f"Discarded {count} material assignments")
+        return {'FINISHED'}
+
+
+# -------------------------------------
+# Materials from face data
+# -------------------------------------
+
+class MaterialAssignFromFaceData(bpy.types.Operator):
+    """Assigns one material per face attribute value, vertex group or face map to the selected meshes"""
+    bl_idname = "object.material_assign_from_face_data"
+    bl_label = "Assign Materials from Face Data"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    source: bpy.props.EnumProperty(name="Source", items=face_data_sources)
+    attribute: bpy.props.StringProperty(name="Attribute", description="Name of the face attribute", default="part_id")
+    shader: bpy.props.EnumProperty(name="Shader", description="Shader for newly created materials", items=shader_type_items)
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT' and any(o.type == 'MESH' for o in context.selected_objects)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.use_property_split = True
+        layout.use_property_decorate = False
+
+        layout.prop(self, "source")
+        if self.source == 'ATTRIBUTE':
+            mesh = context.active_object.data if context.active_object and context.active_object.type == 'MESH' else None
+            if mesh:
+                layout.prop_search(self, "attribute", mesh, "attributes")
+            else:
+                layout.prop(self, "attribute")
+        layout.prop(self, "shader")
+
+    def execute(self, context):
+        start = time.perf_counter()
+        faces = assign_materials_from_face_data(context.selected_objects, self.source, self.attribute, shader=self.shader)
+        duration = max(time.perf_counter() - start, 1e-9)
+
+        self.report({'INFO'}, f"Assigned {faces} faces in {duration:.2f}s ({faces / duration:,.0f} per second)")
+        return {'FINISHED'}
+
+
+# -------------------------------------
+# Material libraries
+# -------------------------------------
+
+def search_library_materials(self, context, edit_text):
+    return material_library.search.query(edit_text)
+
+
+if bpy.app.version >= (3, 3, 0):
+    library_material_search = {"search": search_library_materials, "search_options": set()}
+else:
+    library_material_search = {}
+
+
+class MaterialLibraryAssign(bpy.types.Operator, MaterialCreateAssignMethods):
+    """Assigns a material from the material libraries to the current selection"""
+    bl_idname = "object.material_library_assign"
+    bl_label = "Assign Library Material"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    entry: bpy.props.StringProperty(name="Material", **library_material_search)
+    import_method: bpy.props.EnumProperty(name="Import", items=[
+        ("APPEND", "Append", "Copy the material into this file"),
+        ("LINK", "Link", "Reference the material in the library file"),
+    ])
+    link: bpy.props.EnumProperty(name="Link", items=material_link_items)
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.selected_objects) > 0 and bool(get_preferences().library_directories.strip())
+
+    def invoke(self, context, event):
+        # only files changed since the last scan are read again
+        read = material_library.refresh(library_directories())
+        if read:
+            self.report({'INFO'}, f"Indexed {read} library files")
+        if material_library.failed:
+            self.report({'WARNING'}, f"Could not read {len(material_library.failed)} library files: "
+                        + ", ".join(bpy.path.basename(filepath) for filepath in material_library.failed))
+        return context.window_manager.invoke_props_dialog(self, width=400)
+
+    def draw(self, context):
+        col = self.layout.column()
+        if library_material_search:
+            col.prop(self, "entry", icon='VIEWZOOM')
+        else:
+            col.prop(self, "entry")
+        col.prop(self, "import_method")
+        if context.mode == "OBJECT":
+            col.prop(self, "link")
+
+    def execute(self, context):
+        if not material_library.entries:
+            material_library.refresh(library_directories())
+
+        if self.entry not in material_library.entries:
+            self.report({'WARNING'}, f"Library material '{self.entry}' not found")
+            return {'CANCELLED'}
+
+        material = material_library.material(self.entry, link=self.import_method == 'LINK')
+
+        if self.queue_assignment(context, material):
+            return {'CANCELLED'}
+        if self.assign_chunked(context, material, link=self.link):
+            return {'CANCELLED'}
+
+        self.report_assignment(self.apply_material_to_selection(context, material, link=self.link))
+        remember_material(context, material)
+
+        return {'FINISHED'}
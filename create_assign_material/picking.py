@@ -0,0 +1,623 @@
+"""Picking materials from the viewport"""
+
+import math
+import time
+
+import bpy
+import gpu
+import numpy as np
+
+from bpy_extras import view3d_utils
+from gpu_extras.batch import batch_for_shader
+from mathutils.bvhtree import BVHTree
+from mathutils.kdtree import KDTree
+
+from .core import (
+    MaterialCreateAssignMethods,
+    app_handlers,
+    assign_materials_from_values,
+    get_preferences,
+    material_link_items,
+    remember_material,
+)
+from .operators import ChunkedTask
+
+
+# -------------------------------------
+# Picking
+# -------------------------------------
+
+def ray_box_distance(origin, direction, low, high):
+    """Ray parameter where the ray enters the box from low to high (0 when it starts inside), None if it misses"""
+    near, far = 0.0, math.inf
+    for o, d, lo, hi in zip(origin, direction, low, high):
+        if abs(d) < 1e-12:
+            if o < lo or o > hi:
+                return None
+            continue
+        t0, t1 = (lo - o) / d, (hi - o) / d
+        if t0 > t1:
+            t0, t1 = t1, t0
+        near, far = max(near, t0), min(far, t1)
+        if near > far:
+            return None
+    return near
+
+
+class PickEntry():
+    __slots__ = ("bvh", "material_indices", "matrix", "matrix_inverse", "low", "high")
+
+    def __init__(self):
+        self.bvh = None
+        self.material_indices = None
+        self.matrix = None
+        self.matrix_inverse = None
+        self.low = None
+        self.high = None
+
+
+class PickCache():
+    """Matrices, bounds and BVH trees of the evaluated scene objects.
+
+    Trees are only built for objects whose bounding box a ray crosses, and kept until the depsgraph reports a
+    geometry change or the pick ends. Entries are keyed by session_uid, which no other object gets during the
+    session, so renamed, linked and same named objects don't mix up."""
+
+    pickable_types = {'MESH', 'CURVE', 'SURFACE', 'FONT'}
+
+    def __init__(self):
+        self.entries = {}
+
+    def clear(self):
+        self.entries.clear()
+
+    def entry(self, object, depsgraph):
+        """The matrices and the local bounding box of the object, without its tree"""
+        key = object.original.session_uid
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = PickEntry()
+
+        if entry.matrix is None:
+            entry.matrix = object.matrix_world.copy()
+            entry.matrix_inverse = entry.matrix.inverted_safe()
+            corners = np.array(object.evaluated_get(depsgraph).bound_box)
+            entry.low, entry.high = corners.min(axis=0).tolist(), corners.max(axis=0).tolist()
+        return entry
+
+    def tree(self, object, depsgraph):
+        """The entry of the object with its BVH tree and face material indices"""
+        entry = self.entry(object, depsgraph)
+        if entry.bvh is None:
+            object_eval = object.evaluated_get(depsgraph)
+            mesh = object_eval.to_mesh()
+            try:
+                material_indices = np.empty(len(mesh.polygons), dtype=np.int32)
+                mesh.polygons.foreach_get("material_index", material_indices)
+            finally:
+                object_eval.to_mesh_clear()
+
+            # the tree stores polygon indices, which map into the material indices above
+            entry.bvh = BVHTree.FromObject(object_eval, depsgraph)
+            entry.material_indices = material_indices
+        return entry
+
+    def ray_cast(self, context, depsgraph, origin, direction):
+        """Returns the material closest along the ray, or None"""
+        closest = None
+        closest_distance = float("inf")
+
+        # objects whose bounding box the ray crosses, nearest box first
+        candidates = []
+        for object in context.visible_objects:
+            if object.type not in self.pickable_types:
+                continue
+
+            entry = self.entry(object, depsgraph)
+            local_origin = entry.matrix_inverse @ origin
+            local_direction = entry.matrix_inverse.to_3x3() @ direction
+            near = ray_box_distance(local_origin, local_direction, entry.low, entry.high)
+            if near is not None:
+                box_distance = (entry.matrix @ (local_origin + local_direction * near) - origin).length
+                candidates.append((box_distance, len(candidates), object, local_origin, local_direction))
+
+        for box_distance, _, object, local_origin, local_direction in sorted(candidates):
+            if box_distance > closest_distance:
+                # every later box starts behind the closest hit
+                break
+
+            entry = self.tree(object, depsgraph)
+            location, normal, index, distance = entry.bvh.ray_cast(local_origin, local_direction)
+            if location is None:
+                continue
+
+            distance = (entry.matrix @ location - origin).length
+            if distance < closest_distance:
+                closest_distance = distance
+                closest = (object, entry, index)
+
+        if closest is None:
+            return None
+
+        object, entry, index = closest
+        slots = object.evaluated_get(depsgraph).material_slots
+        material_index = int(entry.material_indices[index])
+        if not slots or material_index >= len(slots):
+            return None
+
+        material = slots[material_index].material
+        # do NOT reference an evaulated ID
+        return material.original if material else None
+
+    def depsgraph_update(self, depsgraph):
+        for update in depsgraph.updates:
+            if not isinstance(update.id, bpy.types.Object):
+                continue
+
+            key = update.id.original.session_uid
+            if update.is_updated_geometry:
+                self.entries.pop(key, None)
+            elif update.is_updated_transform:
+                entry = self.entries.get(key)
+                if entry:
+                    entry.matrix = None
+
+
+pick_cache = PickCache()
+
+
+@bpy.app.handlers.persistent
+def pick_depsgraph_update(scene, depsgraph):
+    pick_cache.depsgraph_update(depsgraph)
+
+
+@bpy.app.handlers.persistent
+def pick_file_changed(*args):
+    pick_cache.clear()
+
+
+app_handlers += [
+    (bpy.app.handlers.depsgraph_update_post, pick_depsgraph_update),
+    (bpy.app.handlers.load_post, pick_file_changed),
+    (bpy.app.handlers.undo_post, pick_file_changed),
+    (bpy.app.handlers.redo_post, pick_file_changed),
+]
+
+
+# -------------------------------------
+# Region picking
+# -------------------------------------
+
+def region_samples(points, lasso, stride, max_samples):
+    """Region coordinates of a sample grid over a box (two corners) or inside a lasso path.
+
+    The stride grows until at most max_samples fit, so big regions stay quick to cast."""
+    points = np.asarray(points, dtype=np.float64)
+    low, high = points.min(axis=0), points.max(axis=0)
+    width, height = high - low
+    stride = max(stride, math.ceil(math.sqrt(width * height / max_samples)))
+
+    xs = np.arange(low[0] + stride / 2, high[0], stride)
+    ys = np.arange(low[1] + stride / 2, high[1], stride)
+    samples = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+    if lasso:
+        samples = samples[inside_polygon(samples, points)]
+    return samples
+
+
+def inside_polygon(points, polygon):
+    """Even-odd test of many points against a polygon, vectorized over the points"""
+    inside = np.zeros(len(points), dtype=bool)
+    x, y = points[:, 0], points[:, 1]
+    for (x0, y0), (x1, y1) in zip(polygon.tolist(), np.roll(polygon, 1, axis=0).tolist()):
+        crosses = (y0 > y) != (y1 > y)
+        inside[crosses] ^= x[crosses] < x0 + (y[crosses] - y0) * (x1 - x0) / (y1 - y0)
+    return inside
+
+
+def region_rays(region, rv3d, coords):
+    """Ray origins and directions for many region coordinates.
+
+    view3d_utils works on one coordinate at a time. Origins and points on a plane facing the view are affine in the
+    region coordinates, so three corners are enough to get all rays with numpy."""
+    corners = [(0.0, 0.0), (region.width, 0.0), (0.0, region.height)]
+    origins = np.array([view3d_utils.region_2d_to_origin_3d(region, rv3d, corner) for corner in corners])
+    targets = np.array([view3d_utils.region_2d_to_location_3d(region, rv3d, corner, rv3d.view_location)
+                        for corner in corners])
+
+    u = coords[:, :1] / region.width
+    v = coords[:, 1:] / region.height
+    origins = origins[0] + u * (origins[1] - origins[0]) + v * (origins[2] - origins[0])
+    targets = targets[0] + u * (targets[1] - targets[0]) + v * (targets[2] - targets[0])
+
+    directions = targets - origins
+    directions /= np.linalg.norm(directions, axis=1)[:, None]
+    return origins, directions
+
+
+def transform_points(matrix, points):
+    matrix = np.array(matrix)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+class RegionCast():
+    """Casts a batch of rays against the pick cache, one object per step so the viewport stays responsive.
+
+    view is the perspective matrix and size of the region. With it, each object only gets the rays inside its
+    projected bounding box."""
+
+    def __init__(self, depsgraph, objects, coords, origins, directions, view=None):
+        self.depsgraph = depsgraph
+        self.coords = coords
+        self.origins = origins
+        self.directions = directions
+        self.view = view
+
+        self.distances = np.full(len(coords), np.inf)
+        self.hit_objects = np.full(len(coords), -1, dtype=np.int32)
+        self.faces = np.zeros(len(coords), dtype=np.int32)
+        self.locations = np.zeros((len(coords), 3))
+
+        self.objects = [object for object in objects if object.type in PickCache.pickable_types]
+        self.task = ChunkedTask(list(enumerate(self.objects)), self.cast_object)
+
+    def candidate_rays(self, object, entry):
+        """Indices of the rays that can hit the object"""
+        if self.view is None:
+            return np.arange(len(self.coords))
+
+        perspective_matrix, width, height = self.view
+        corners = transform_points(entry.matrix, np.array(object.evaluated_get(self.depsgraph).bound_box))
+        clip = np.hstack((corners, np.ones((8, 1)))) @ np.array(perspective_matrix).T
+        # corners behind the view do not project, every ray is a candidate then
+        if (clip[:, 3] <= 1e-6).any():
+            return np.arange(len(self.coords))
+
+        screen = (clip[:, :2] / clip[:, 3:] + 1.0) / 2.0 * (width, height)
+        low, high = screen.min(axis=0) - 1.0, screen.max(axis=0) + 1.0
+        inside = ((self.coords >= low) & (self.coords <= high)).all(axis=1)
+        return np.flatnonzero(inside)
+
+    def cast_object(self, item):
+        object_index, object = item
+        rays = self.candidate_rays(object, pick_cache.entry(object, self.depsgraph))
+        if len(rays) == 0:
+            return
+
+        entry = pick_cache.tree(object, self.depsgraph)
+        local_origins = transform_points(entry.matrix_inverse, self.origins[rays])
+        local_directions = self.directions[rays] @ np.array(entry.matrix_inverse.to_3x3()).T
+
+        ray_cast = entry.bvh.ray_cast
+        hits = [(i, location, index) for i, (location, normal, index, distance)
+                in enumerate(map(ray_cast, local_origins.tolist(), local_directions.tolist())) if location is not None]
+        if not hits:
+            return
+
+        indices, locations, faces = zip(*hits)
+        rays = rays[list(indices)]
+        locations = transform_points(entry.matrix, np.array(locations))
+        distances = np.linalg.norm(locations - self.origins[rays], axis=1)
+
+        closer = distances < self.distances[rays]
+        rays = rays[closer]
+        self.distances[rays] = distances[closer]
+        self.hit_objects[rays] = object_index
+        self.faces[rays] = np.array(faces, dtype=np.int32)[closer]
+        self.locations[rays] = locations[closer]
+
+    def materials(self):
+        """Returns the hit materials and per ray an index into them, -1 for misses and faces without a material"""
+        materials = []
+        material_ids = {}
+        ray_materials = np.full(len(self.coords), -1, dtype=np.int32)
+
+        for object_index in np.unique(self.hit_objects[self.hit_objects >= 0]).tolist():
+            object = self.objects[object_index]
+            entry = pick_cache.tree(object, self.depsgraph)
+            slots = object.evaluated_get(self.depsgraph).material_slots
+
+            # slot index to material id, faces pointing past the slots have no material
+            table = np.full(max(len(slots), int(entry.material_indices.max(initial=0)) + 1), -1, dtype=np.int32)
+            for i, slot in enumerate(slots):
+                if slot.material:
+                    # do NOT reference an evaulated ID
+                    material = slot.material.original
+                    if material not in material_ids:
+                        material_ids[material] = len(materials)
+                        materials.append(material)
+                    table[i] = material_ids[material]
+
+            rays = self.hit_objects == object_index
+            ray_materials[rays] = table[entry.material_indices[self.faces[rays]]]
+
+        return materials, ray_materials
+
+
+def transfer_nearest_materials(objects, locations, materials, material_ids):
+    """Assigns every face of the mesh objects the material of the nearest hit location, returns the number of faces.
+
+    Works on meshes in object mode, every mesh is written once with a single foreach_set."""
+    tree = KDTree(len(locations))
+    for i, location in enumerate(locations.tolist()):
+        tree.insert(location, i)
+    tree.balance()
+
+    faces = 0
+    meshes = set()
+    for object in objects:
+        if object.type != 'MESH' or object.data.is_editmode or object.data in meshes:
+            continue
+        meshes.add(object.data)
+
+        mesh = object.data
+        centers = np.empty(len(mesh.polygons) * 3, dtype=np.float32)
+        mesh.polygons.foreach_get("center", centers)
+        centers = transform_points(object.matrix_world, centers.reshape(-1, 3))
+
+        find = tree.find
+        nearest = np.fromiter((find(center)[1] for center in centers.tolist()), dtype=np.int32, count=len(centers))
+        faces += assign_materials_from_values(mesh, material_ids[nearest], materials.__getitem__)
+
+    return faces
+
+
+def region_shader():
+    # the 2D_ prefixed builtin shaders are gone in blender 4.0
+    return gpu.shader.from_builtin('UNIFORM_COLOR' if bpy.app.version >= (3, 4, 0) else '2D_UNIFORM_COLOR')
+
+
+region_pick_modes = [
+    ('DOMINANT', "Dominant", "Assign the material hit most often in the region to the selection"),
+    ('NEAREST', "Nearest", "Give every face of the selected meshes the material of the nearest hit in the region"),
+]
+
+
+# -------------------------------------
+# Pick operator
+# -------------------------------------
+
+class MaterialPick(bpy.types.Operator, MaterialCreateAssignMethods):
+    """Assign a material to your selection by picking from the scene, drag a box (ctrl: lasso) to pick from a region"""
+    bl_idname = "object.material_pick"
+    bl_label = "Pick Material"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    cleanup_material_slots: bpy.props.BoolProperty(name="Cleanup material slots", default=False)
+
+    link: bpy.props.EnumProperty(name="Link", items=material_link_items)
+
+    live_preview: bpy.props.BoolProperty(name="Show material under cursor", default=True)
+
+    region_mode: bpy.props.EnumProperty(name="Region", items=region_pick_modes,
+                                        description="What to do with the materials hit inside a dragged box or lasso")
+    sample_spacing: bpy.props.IntProperty(name="Sample spacing", description="Pixels between the region samples",
+                                          default=4, min=1, subtype='PIXEL')
+    max_samples: bpy.props.IntProperty(name="Max samples", description="Larger regions are sampled more sparsely",
+                                       default=50_000, min=1)
+
+    # upper bound for hover picks, mouse moves in between are skipped
+    hover_interval = 1.0 / 30.0
+
+    def material_pick(self, context, event, fallback=True):
+        region = context.region
+        rv3d = context.region_data
+        
+        # get the ray from the viewport and mouse
+        coord = event.mouse_region_x, event.mouse_region_y
+        view_vector = view3d_utils.region_2d_to_vector_3d(region, rv3d, coord)
+        ray_origin = view3d_utils.region_2d_to_origin_3d(region, rv3d, coord)
+
+        depsgraph = context.evaluated_depsgraph_get()
+        material = pick_cache.ray_cast(context, depsgraph, ray_origin, view_vector)
+        if material or not fallback:
+            return material
+
+        # instances are not part of the cache, the scene ray cast sees them
+        result, location, normal, index, object, matrix = context.scene.ray_cast(depsgraph, ray_origin, view_vector)
+
+        if result and index >= 0:
+            eval_obj = object.evaluated_get(depsgraph)
+            material_index = eval_obj.data.polygons[index].material_index
+            material_eval = eval_obj.data.materials[material_index]
+            # do NOT reference an evaulated ID
+            material = bpy.data.materials.get(material_eval.name)
+            return material
+
+        return None
+
+    def hover(self, context, event):
+        now = time.perf_counter()
+        if now - self.last_hover < self.hover_interval:
+            return
+        self.last_hover = now
+
+        material = self.material_pick(context, event, fallback=False)
+        name = material.name if material else None
+        if name != self.hovered:
+            self.hovered = name
+            self.status_text_set(context)
+
+    def status_text_set(self, context):
+        if self.region_cast:
+            task = self.region_cast.task
+            text = f"Sampling region: {task.done} / {len(task.items)} objects (ESC to cancel)"
+        elif self.dragging:
+            text = f"Pick {'lasso' if self.lasso else 'box'}: release to sample the region"
+        elif self.hovered:
+            text = f"Pick material from scene: {self.hovered}"
+        else:
+            text = "Pick material from scene"
+        context.workspace.status_text_set(text=text)
+
+    def drag(self, context, event):
+        point = (event.mouse_region_x, event.mouse_region_y)
+        if not self.dragging:
+            threshold = context.preferences.inputs.drag_threshold_mouse
+            if math.dist(point, self.drag_points[0]) < threshold:
+                return
+            self.dragging = True
+            self.status_text_set(context)
+
+        if not self.lasso:
+            self.drag_points[1:] = [point]
+        elif math.dist(point, self.drag_points[-1]) >= 2.0:
+            self.drag_points.append(point)
+        context.area.tag_redraw()
+
+    def draw_region(self):
+        if not self.dragging:
+            return
+
+        if self.lasso:
+            points = self.drag_points
+        else:
+            (x0, y0), (x1, y1) = self.drag_points[0], self.drag_points[-1]
+            points = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+
+        shader = region_shader()
+        batch = batch_for_shader(shader, 'LINE_LOOP', {"pos": points})
+        shader.bind()
+        shader.uniform_float("color", (1.0, 1.0, 1.0, 0.8))
+        batch.draw(shader)
+
+    def start_region_cast(self, context):
+        if self.region_mode == 'NEAREST' and context.mode != 'OBJECT':
+            self.report({'WARNING'}, "Transferring by nearest hit works in object mode")
+            return False
+
+        coords = region_samples(self.drag_points, self.lasso, self.sample_spacing, self.max_samples)
+        if len(coords) == 0:
+            return False
+
+        # the selection receives the materials in nearest mode, so it is not sampled
+        objects = context.visible_objects
+        if self.region_mode == 'NEAREST':
+            objects = [object for object in objects if not object.select_get()]
+
+        region = context.region
+        rv3d = context.region_data
+        origins, directions = region_rays(region, rv3d, coords)
+        view = (rv3d.perspective_matrix, region.width, region.height)
+        self.region_cast = RegionCast(context.evaluated_depsgraph_get(), objects, coords, origins, directions, view)
+
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(0.001, window=context.window)
+        return True
+
+    def finish_region_cast(self, context):
+        materials, material_ids = self.region_cast.materials()
+        hit = material_ids >= 0
+        if not hit.any():
+            self.report({'WARNING'}, "No materials in the region")
+            return None
+
+        counts = np.bincount(material_ids[hit], minlength=len(materials))
+        order = np.argsort(counts)[::-1].tolist()
+        total = int(counts.sum())
+        summary = ", ".join(f"{materials[i].name} {counts[i] / total:.0%}" for i in order[:3])
+        self.report({'INFO'}, f"{total} samples hit {len(materials)} materials: {summary}")
+
+        if self.region_mode == 'DOMINANT':
+            return self.assign(context, materials[order[0]])
+
+        targets = [object for object in context.selected_objects if object.type == 'MESH']
+        faces = transfer_nearest_materials(targets, self.region_cast.locations[hit], materials, material_ids[hit])
+        self.report({'INFO'}, f"Transferred {len(materials)} materials to {faces} faces")
+        # most frequent last, so it ends up first in the recently used materials
+        for i in reversed(order):
+            remember_material(context, materials[i])
+        return {'FINISHED'}
+
+    def assign(self, context, material):
+        if self.queue_assignment(context, material):
+            return {'CANCELLED'}
+        if self.assign_chunked(context, material, self.cleanup_material_slots, self.link):
+            return {'CANCELLED'}
+
+        self.report_assignment(self.apply_material_to_selection(context, material, self.cleanup_material_slots, self.link))
+        remember_material(context, material)
+        return {'FINISHED'}
+
+    def reset_region(self, context):
+        if self.timer:
+            context.window_manager.event_timer_remove(self.timer)
+            self.timer = None
+        self.region_cast = None
+        self.drag_points = []
+        self.dragging = False
+        context.area.tag_redraw()
+
+    def end(self, context, result):
+        self.reset_region(context)
+        bpy.types.SpaceView3D.draw_handler_remove(self.draw_handle, 'WINDOW')
+        # the trees of a big scene take a lot of memory, the next pick builds what it needs again
+        pick_cache.clear()
+        context.workspace.status_text_set(text=None)
+        return result
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.selected_objects) > 0
+
+    def modal(self, context, event):
+        if self.region_cast:
+            if event.type == 'ESC':
+                return self.end(context, {'CANCELLED'})
+            if event.type != 'TIMER':
+                return {'RUNNING_MODAL'}
+
+            if self.region_cast.task.step(get_preferences().chunk_budget / 1000.0):
+                result = self.finish_region_cast(context)
+                if result:
+                    return self.end(context, result)
+                self.reset_region(context)
+            self.status_text_set(context)
+            return {'RUNNING_MODAL'}
+
+        # allow navigation
+        if event.type in {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}:
+            return {'PASS_THROUGH'}
+        elif event.type == 'MOUSEMOVE':
+            if self.drag_points:
+                self.drag(context, event)
+            elif self.live_preview:
+                self.hover(context, event)
+        elif event.type == 'LEFTMOUSE' and event.value == 'PRESS':
+            self.drag_points = [(event.mouse_region_x, event.mouse_region_y)]
+            self.lasso = event.ctrl
+        elif event.type == 'LEFTMOUSE' and event.value == 'RELEASE' and self.drag_points:
+            if self.dragging:
+                if not self.start_region_cast(context):
+                    self.reset_region(context)
+                self.status_text_set(context)
+                return {'RUNNING_MODAL'}
+
+            self.drag_points = []
+            material = self.material_pick(context, event)
+            if material:
+                return self.end(context, self.assign(context, material))
+
+            return {'RUNNING_MODAL'}
+        elif event.type in {'RIGHTMOUSE', 'ESC'}:
+            return self.end(context, {'CANCELLED'})
+
+        return {'RUNNING_MODAL'}
+
+    def invoke(self, context, event):
+        if context.space_data.type == 'VIEW_3D':
+            self.hovered = None
+            self.last_hover = 0.0
+            self.drag_points = []
+            self.dragging = False
+            self.lasso = False
+            self.region_cast = None
+            self.timer = None
+            self.draw_handle = bpy.types.SpaceView3D.draw_handler_add(self.draw_region, (), 'WINDOW', 'POST_PIXEL')
+            self.status_text_set(context)
+
+            context.window_manager.modal_handler_add(self)
+            return {'RUNNING_MODAL'}
+        else:
+            self.report({'WARNING'}, "Active space must be a View3d")
+            return {'CANCELLED'}
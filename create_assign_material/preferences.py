@@ -0,0 +1,79 @@
+"""Addon preferences"""
+
+import bpy
+
+
+# -------------------------------------
+# Preferences
+# -------------------------------------
+
+class AddonPrefs (bpy.types.AddonPreferences):
+    bl_idname = __package__
+
+    def update_menu_state(self, context):
+        # background sessions never import the interface modules, so they are imported on demand
+        from .ui import VIEW3D_MT_Material
+
+        if self.menu_visible:
+            bpy.types.VIEW3D_MT_editor_menus.append(VIEW3D_MT_Material.menu_draw)
+        else:
+            bpy.types.VIEW3D_MT_editor_menus.remove(VIEW3D_MT_Material.menu_draw) 
+      
+    menu_visible: bpy.props.BoolProperty(name="Add 'Material' menu to the 3d view menus", default=False, update=update_menu_state)    
+    show_material_selection: bpy.props.BoolProperty(name="Show the material selection", default=True)
+    max_materials_in_menu: bpy.props.IntProperty(name="Materials per page", default=50, min=1)
+    chunked_threshold: bpy.props.IntProperty(name="Chunked above", description="Selections with at least this many objects are processed in chunks with progress, 0 disables it", default=5000, min=0)
+    chunk_budget: bpy.props.IntProperty(name="Chunk budget (ms)", description="Time spent per chunk before the UI gets a chance to redraw", default=50, min=1)
+
+    def update_profiling(self, context):
+        from .profiling import profiler
+
+        if self.profiling:
+            profiler.enable()
+        else:
+            profiler.disable()
+
+    library_directories: bpy.props.StringProperty(name="Material libraries", description="Directories searched for .blend files with materials, separate several with ';'", default="")
+
+    queue_assignments: bpy.props.BoolProperty(name="Queue assignments", description="Assignments from the menus, pick and create skip their own undo step and are committed together from the menu or when switching modes", default=False)
+
+    live_tweak: bpy.props.BoolProperty(name="Live tweak", description="Create and assign the material when the create dialog opens, then update it in place while tweaking name, shader and color", default=False)
+
+    warm_up: bpy.props.BoolProperty(name="Warm up caches", description="Build the material lists and search index while blender is idle after startup and loading files, so the first menu opens without delay", default=True)
+
+    previews_per_tick: bpy.props.IntProperty(name="Previews per tick", description="Material previews rendered per timer tick, menus show a placeholder until theirs is ready", default=4, min=1)
+
+    profiling: bpy.props.BoolProperty(name="Profiling", description="Time the operators, menus and assignment functions and show the results in the sidebar (Material tab)", default=False, update=update_profiling)
+   
+    def draw(self, context):
+        layout = self.layout
+        layout.label(text='The addon creates keymap items to open a regular menu or a pie menu.')
+        layout.label(text='Choose whatever you prefer - by default no hotkeys are assigned.')
+        layout.label(text='Check the keymap editor in 3D View > 3D View (Global)')
+        layout.separator()
+        layout.prop(self, "menu_visible")
+        layout.separator()
+        layout.label(text="Adds a list of materials to the pie or menu. This allows to directly choose an existing material.")
+        
+        row = layout.row()
+        row.prop(self, "show_material_selection")
+        row.prop(self, "max_materials_in_menu")
+        row.prop(self, "previews_per_tick")
+        layout.prop(self, "warm_up")
+        layout.separator()
+        layout.label(text="Large selections are processed in chunks, showing progress and allowing to cancel with ESC.")
+
+        row = layout.row()
+        row.prop(self, "chunked_threshold")
+        row.prop(self, "chunk_budget")
+        layout.separator()
+        layout.label(text="Queued assignments share one undo step, which keeps undo memory low when assigning many times in a row.")
+        layout.prop(self, "queue_assignments")
+        layout.separator()
+        layout.label(text="Materials of the .blend files in these directories can be assigned from the menu.")
+        layout.prop(self, "library_directories")
+        layout.separator()
+        layout.label(text="Live tweak assigns the new material when the create dialog opens and updates it in place while tweaking.")
+        layout.prop(self, "live_tweak")
+        layout.separator()
+        layout.prop(self, "profiling")
@@ -0,0 +1,192 @@
+"""Opt-in timing of the hot paths"""
+
+import collections
+import functools
+import json
+import sys
+import time
+
+import bpy
+import numpy as np
+
+from bpy_extras.io_utils import ExportHelper
+
+from .core import get_preferences
+
+
+# -------------------------------------
+# Profiling
+# -------------------------------------
+
+class Profiler():
+    """Rolling timings and call counts of the hot paths.
+
+    The timing wrappers are only installed while profiling is enabled, disabled profiling costs nothing."""
+
+    window = 512
+
+    def __init__(self):
+        self.samples = {}
+        self.counts = collections.Counter()
+        self.originals = []
+
+    def targets(self):
+        from . import core, operators, picking, ui
+
+        targets = [
+            (core, "cleanup_material_slots"),
+            (core, "merge_duplicate_materials"),
+            (core.MaterialCreateAssignMethods, "create_material"),
+            (core.MaterialCreateAssignMethods, "apply_material_to_object"),
+            (core.MaterialCreateAssignMethods, "apply_material_to_objects"),
+            (core.MaterialCreateAssignMethods, "apply_material_to_polygons"),
+            (core.MaterialCreateAssignMethods, "apply_material_to_edit_meshes"),
+            (core.MaterialIndex, "rebuild"),
+            (core.MaterialSearchIndex, "query"),
+            (picking.PickCache, "entry"),
+            (picking.PickCache, "ray_cast"),
+            (ui.VIEW3D_MT_MaterialList, "draw"),
+            (ui.VIEW3D_MT_Material, "draw"),
+            (ui.VIEW3D_MT_Material_PIE, "draw"),
+        ]
+        for operator_class in (operators.MaterialSlotCleanup, operators.MaterialMergeDuplicates, operators.MaterialCreateAssign,
+                               operators.MaterialPaletteCreate, picking.MaterialPick, operators.MaterialAssign,
+                               operators.MaterialAssignChunked, operators.MaterialLibraryAssign):
+            for attribute in ("invoke", "execute", "modal"):
+                if attribute in operator_class.__dict__:
+                    targets.append((operator_class, attribute))
+        return targets
+
+    def enable(self):
+        if self.originals:
+            return
+
+        # functions are also imported by the other modules of the package, those names get the same wrapper
+        package = [module for name, module in sys.modules.items() if name == __package__ or name.startswith(__package__ + ".")]
+
+        for owner, attribute in self.targets():
+            if isinstance(owner, type):
+                function = owner.__dict__[attribute]
+                wrapper = self.wrap(function, f"{owner.__name__}.{attribute}")
+                owners = [owner]
+            else:
+                function = getattr(owner, attribute)
+                wrapper = self.wrap(function, attribute)
+                owners = [module for module in package if getattr(module, attribute, None) is function]
+
+            for owner in owners:
+                setattr(owner, attribute, wrapper)
+                self.originals.append((owner, attribute, function))
+
+    def disable(self):
+        for owner, attribute, function in reversed(self.originals):
+            setattr(owner, attribute, function)
+        self.originals.clear()
+
+    def wrap(self, function, label):
+        samples = self.samples.setdefault(label, collections.deque(maxlen=self.window))
+        counts = self.counts
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+                counts[label] += 1
+
+        return wrapper
+
+    def reset(self):
+        for samples in self.samples.values():
+            samples.clear()
+        self.counts.clear()
+
+    def statistics(self):
+        """Returns label -> dict with the call count and p50/p90/p99/max of the recent calls in milliseconds"""
+        statistics = {}
+        for label, samples in self.samples.items():
+            if not samples:
+                continue
+
+            timings = np.fromiter(samples, dtype=np.float64, count=len(samples)) * 1000.0
+            p50, p90, p99 = np.percentile(timings, (50, 90, 99))
+            statistics[label] = {
+                "calls": self.counts[label],
+                "p50": p50,
+                "p90": p90,
+                "p99": p99,
+                "max": timings.max(),
+            }
+        return statistics
+
+
+profiler = Profiler()
+
+
+class MaterialProfileReset(bpy.types.Operator):
+    """Clears the recorded timings"""
+    bl_idname = "object.material_profile_reset"
+    bl_label = "Reset Profiling"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        profiler.reset()
+        return {'FINISHED'}
+
+
+class MaterialProfileExport(bpy.types.Operator, ExportHelper):
+    """Writes the recorded timings to a json file"""
+    bl_idname = "object.material_profile_export"
+    bl_label = "Export Profiling"
+    bl_options = {'INTERNAL'}
+
+    filename_ext = ".json"
+    filter_glob: bpy.props.StringProperty(default="*.json", options={'HIDDEN'})
+
+    def execute(self, context):
+        data = {
+            "blender": bpy.app.version_string,
+            "timings_ms": profiler.statistics(),
+            "samples_ms": {label: [t * 1000.0 for t in samples] for label, samples in profiler.samples.items() if samples},
+        }
+        with open(self.filepath, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+
+        self.report({'INFO'}, f"Profiling written to {self.filepath}")
+        return {'FINISHED'}
+
+
+class VIEW3D_PT_MaterialProfiling(bpy.types.Panel):
+    bl_label = "Material Profiling"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Material"
+
+    @classmethod
+    def poll(cls, context):
+        return get_preferences().profiling
+
+    def draw(self, context):
+        layout = self.layout
+
+        row = layout.row(align=True)
+        row.operator("object.material_profile_reset", icon='X')
+        row.operator("object.material_profile_export", icon='EXPORT')
+
+        statistics = profiler.statistics()
+        if not statistics:
+            layout.label(text="No calls recorded yet")
+            return
+
+        grid = layout.grid_flow(row_major=True, columns=5, even_columns=False, align=True)
+        for text in ("Call", "Count", "p50 ms", "p90 ms", "p99 ms"):
+            grid.label(text=text)
+
+        for label, stats in sorted(statistics.items(), key=lambda item: -item[1]["p90"]):
+            grid.label(text=label)
+            grid.label(text=str(stats["calls"]))
+            grid.label(text=f"{stats['p50']:.2f}")
+            grid.label(text=f"{stats['p90']:.2f}")
+            grid.label(text=f"{stats['p99']:.2f}")
@@ -0,0 +1,268 @@
+"""Menus, the pie and material previews"""
+
+import collections
+import math
+
+import bpy
+
+from .core import app_handlers, assignment_queue, cached_materials, get_preferences, material_names, material_search
+
+
+# -------------------------------------
+# Previews
+# -------------------------------------
+
+class PreviewLoader():
+    """Serves cached preview icons and renders missing ones a few per timer tick
+
+    Reading the icon id of a preview starts rendering it, so the menus never touch material.preview
+    themselves. They get 0 for uncached materials and draw a placeholder until the timer caught up.
+    """
+
+    tick_interval = 0.1
+
+    def __init__(self):
+        self.generation = None
+        self.icons = {}
+        self.queue = collections.deque()
+        self.queued = set()
+        # timers are matched by identity, a new bound method on every access would never match
+        self.timer = self.tick
+
+    def icon(self, name):
+        """Preview icon id of a material, or 0 (draw a placeholder) while it is still queued"""
+        material_index = cached_materials.ensure()
+        if self.generation != (material_index.generation, material_index.id_count):
+            self.evict(material_index)
+
+        icon_id = self.icons.get(name)
+        if icon_id is not None:
+            return icon_id
+
+        if name not in self.queued:
+            self.queued.add(name)
+            self.queue.append(name)
+            if not bpy.app.timers.is_registered(self.timer):
+                bpy.app.timers.register(self.timer, first_interval=0.0)
+        return 0
+
+    def evict(self, material_index):
+        # removed or renamed materials, their queued names are skipped by tick
+        lookup = material_index.lookup
+        for name in [name for name in self.icons if name not in lookup]:
+            del self.icons[name]
+        self.generation = (material_index.generation, material_index.id_count)
+
+    def tick(self):
+        budget = get_preferences().previews_per_tick
+        while self.queue and budget > 0:
+            name = self.queue.popleft()
+            self.queued.discard(name)
+            material = bpy.data.materials.get(name)
+            if material is None:
+                continue
+            self.icons[name] = material.preview_ensure().icon_id
+            budget -= 1
+
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'VIEW_3D':
+                    area.tag_redraw()
+
+        return self.tick_interval if self.queue else None
+
+    def clear(self):
+        if bpy.app.timers.is_registered(self.timer):
+            bpy.app.timers.unregister(self.timer)
+        self.icons.clear()
+        self.queue.clear()
+        self.queued.clear()
+        self.generation = None
+
+
+material_previews = PreviewLoader()
+
+
+# -------------------------------------
+# Warm-up
+# -------------------------------------
+
+warm_up_delay = 1.0
+
+
+def warm_up_caches():
+    """Builds the material lists and the search index, so the first menu does not pay for it"""
+    cached_materials.ensure()
+    material_search.ensure()
+    material_names.ensure()
+
+
+def schedule_warm_up():
+    if get_preferences().warm_up and not bpy.app.timers.is_registered(warm_up_caches):
+        # timers only run once blender is idle, after startup or loading has finished
+        bpy.app.timers.register(warm_up_caches, first_interval=warm_up_delay)
+
+
+@bpy.app.handlers.persistent
+def warm_up_file_loaded(*args):
+    schedule_warm_up()
+
+
+app_handlers += [
+    (bpy.app.handlers.load_post, warm_up_file_loaded),
+]
+
+
+# -------------------------------------
+# UI code
+# -------------------------------------
+
+def draw_material_grid(column, columns, page_size, menu, pie=False):
+    """Draws one page of the materials, recently used first, with page up/down buttons below"""
+    names = cached_materials.ordered(bpy.context.scene)
+    page_count = max(1, math.ceil(len(names) / page_size))
+    page = min(bpy.context.window_manager.material_menu_page, page_count - 1)
+
+    grid = column.grid_flow(columns=columns)
+
+    # only the visible page is drawn, no matter how many materials exist
+    for material_name in names[page * page_size:(page + 1) * page_size]:
+        icon_id = material_previews.icon(material_name)
+        if icon_id:
+            op = grid.operator("object.material_assign", text=material_name, icon_value=icon_id)
+        else:
+            op = grid.operator("object.material_assign", text=material_name, icon='MATERIAL_DATA')
+
+        op.material_name = material_name
+        op.show_list_dialog = False
+
+    if page_count > 1:
+        row = column.row(align=True)
+        for delta, icon in ((-1, 'TRIA_LEFT'), (1, 'TRIA_RIGHT')):
+            sub = row.row(align=True)
+            sub.enabled = 0 <= page + delta < page_count
+            op = sub.operator("object.material_menu_page", text="", icon=icon)
+            op.delta = delta
+            op.menu = menu
+            op.pie = pie
+            if delta < 0:
+                row.label(text=f"{page + 1} / {page_count}")
+
+
+class MaterialMenuPage(bpy.types.Operator):
+    """Shows the previous or next page of materials"""
+    bl_idname = "object.material_menu_page"
+    bl_label = "Material Page"
+    bl_options = {'INTERNAL'}
+
+    delta: bpy.props.IntProperty(name="Delta", default=1)
+    menu: bpy.props.StringProperty(name="Menu")
+    pie: bpy.props.BoolProperty(name="Pie", default=False)
+
+    def execute(self, context):
+        wm = context.window_manager
+        wm.material_menu_page = max(0, wm.material_menu_page + self.delta)
+
+        # clicking closed the menu, open it again on the new page
+        if self.pie:
+            bpy.ops.wm.call_menu_pie(name=self.menu)
+        else:
+            bpy.ops.wm.call_menu(name=self.menu)
+        return {'FINISHED'}
+
+
+class VIEW3D_MT_MaterialList(bpy.types.Menu):
+    bl_idname = "VIEW3D_MT_MaterialList"
+    bl_label = "Assign Material"
+
+    def draw(self, context):
+        layout = self.layout
+
+        addon_prefs = get_preferences()
+
+        box = layout.split()
+        column = box.column(align=True)
+
+        op = column.operator("object.material_assign", text="Search", icon = "VIEWZOOM")
+        op.show_list_dialog = True
+
+        grid_flow_columns = 3
+        draw_material_grid(column, grid_flow_columns, addon_prefs.max_materials_in_menu, self.bl_idname)
+
+
+
+class VIEW3D_MT_Material(bpy.types.Menu):
+    bl_label = "Material"
+
+    def draw(self, context):
+        layout = self.layout
+
+        layout.operator("object.material_create_assign", text="Create material", icon = "MATERIAL_DATA")
+        layout.operator("object.material_palette_create", text="Create from palette", icon = "COLOR")
+        layout.separator()
+        layout.operator("object.material_slot_cleanup", text="Cleanup material slots", icon = "SHADERFX")
+        layout.operator("object.material_merge_duplicates", text="Merge duplicate materials", icon = "DUPLICATE")
+        layout.separator()
+        layout.operator("object.material_pick", text="Pick material",  icon = "EYEDROPPER")
+        layout.operator("object.material_pick", text="Transfer materials from region", icon = "SELECT_SET").region_mode = 'NEAREST'
+        layout.operator("object.material_assign_from_face_data", text="Materials from face data", icon = "GROUP_VERTEX")
+        layout.operator("object.material_library_assign", text="Library material", icon = "ASSET_MANAGER")
+
+        if len(assignment_queue):
+            layout.separator()
+            layout.operator("object.material_queue_commit", icon = "CHECKMARK",
+                            text=f"Commit {len(assignment_queue)} assignments ({assignment_queue.memory() / 1024:.0f} KiB)")
+            layout.operator("object.material_queue_discard", text="Discard assignments", icon = "LOOP_BACK")
+
+
+        addon_prefs = get_preferences()
+        if addon_prefs.show_material_selection:
+            layout.menu(VIEW3D_MT_MaterialList.bl_idname)
+
+    def menu_draw(self, context):
+        self.layout.menu("VIEW3D_MT_Material")
+
+
+class VIEW3D_MT_Material_PIE(bpy.types.Menu):
+    bl_label = 'Material'
+    bl_idname = 'VIEW3D_MT_create_assign_pie' 
+    
+    def draw(self, context):
+        layout = self.layout
+        pie = layout.menu_pie()   
+    
+        addon_prefs = get_preferences()
+
+        # left
+        pie.operator("object.material_create_assign", text="Create material", icon = "MATERIAL_DATA")
+        # right
+        pie.operator("object.material_pick", text="Pick material", icon = "EYEDROPPER")
+       
+        # bottom
+        if addon_prefs.show_material_selection:
+            box = pie.split()
+            column = box.column(align=False)
+            
+            row = column.split()
+                       
+            row.separator(factor=0.2)
+
+            row.scale_y = 1.5
+            row.scale_x = 5.0
+            op = row.operator("object.material_assign", text="Search material", icon = "VIEWZOOM")
+            op.show_list_dialog = True
+            
+            row.separator(factor=0.2)
+            row.scale_x = 1.0
+
+            column.separator()
+            grid_flow_columns = 6
+            draw_material_grid(column, grid_flow_columns, addon_prefs.max_materials_in_menu, self.bl_idname, pie=True)
+        else:
+            op = pie.operator("object.material_assign", text="Search material", icon = "VIEWZOOM")
+            op.show_list_dialog = True
+        
+        # top
+        pie.operator("object.material_slot_cleanup", text="Cleanup material slots", icon = "SHADERFX")
+       
+ 
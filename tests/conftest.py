@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+tests = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(tests, "standin"))
+sys.path.insert(0, os.path.dirname(tests))
+
+import bpy
+import standin
+
+
+@pytest.fixture
+def addon():
+    """The registered addon (with interface) in an empty file"""
+    standin.reset()
+    import create_assign_material as addon
+
+    addon.register(headless=False)
+    standin.load_post()
+    yield addon
+    addon.unregister()
+
+
+@pytest.fixture
+def context(addon):
+    return bpy.context
+
+
+@pytest.fixture
+def preferences(addon):
+    return addon.core.get_preferences()
@@ -0,0 +1,55 @@
+"""Stand-in bmesh: edit mode meshes as lists of faces, written back to the mesh when leaving edit mode"""
+
+import numpy as np
+
+
+class BMFace():
+    __slots__ = ("index", "select", "hide", "material_index")
+
+    def __init__(self, index, select, hide, material_index):
+        self.index = index
+        self.select = select
+        self.hide = hide
+        self.material_index = material_index
+
+
+class BMFaceSeq(list):
+    def ensure_lookup_table(self):
+        pass
+
+    def index_update(self):
+        for i, face in enumerate(self):
+            face.index = i
+
+
+class BMesh():
+    def __init__(self):
+        self.faces = BMFaceSeq()
+
+    def from_mesh(self, mesh):
+        polygons = mesh.polygons._arrays
+        self.faces = BMFaceSeq(BMFace(i, select, hide, material_index) for i, (select, hide, material_index)
+                               in enumerate(zip(polygons["select"].tolist(), polygons["hide"].tolist(),
+                                                polygons["material_index"].tolist())))
+
+    def to_mesh(self, mesh):
+        faces = self.faces
+        mesh.polygons.foreach_set("material_index", np.fromiter((f.material_index for f in faces), np.int32, len(faces)))
+        mesh.polygons.foreach_set("select", np.fromiter((f.select for f in faces), bool, len(faces)))
+
+    def free(self):
+        self.faces = BMFaceSeq()
+
+
+def new():
+    return BMesh()
+
+
+def from_edit_mesh(mesh):
+    if mesh.edit_bmesh is None:
+        raise ValueError(f"The mesh '{mesh.name}' is not in editmode")
+    return mesh.edit_bmesh
+
+
+def update_edit_mesh(mesh, loop_triangles=True, destructive=True):
+    mesh.edit_updates += 1
@@ -0,0 +1,13 @@
+"""A small stand-in for blender's bpy module, to run the addon's data paths under plain CPython.
+
+It models ID collections with blender's unique names, materials with node trees, meshes with foreach access to
+their polygons, material slots with data and object links, objects, the context, handlers and timers. Nothing is
+drawn, evaluated or saved. tests/standin/standin.py has the helpers tests and benchmarks use to drive it."""
+
+from . import app, ops, path, props, types, utils
+
+data = types.BlendData()
+context = types.Context(data)
+
+# lets code running on either tell the stand-in from blender
+standin = True
@@ -0,0 +1,56 @@
+"""Stand-in bpy.app: version info, handler lists and timers"""
+
+version = (4, 1, 0)
+version_string = "4.1.0"
+background = True
+binary_path = ""
+
+
+class _Handlers():
+    def __init__(self):
+        for name in ("depsgraph_update_pre", "depsgraph_update_post", "load_pre", "load_post", "save_pre",
+                     "save_post", "undo_pre", "undo_post", "redo_pre", "redo_post"):
+            setattr(self, name, [])
+
+    @staticmethod
+    def persistent(function):
+        return function
+
+    def clear(self):
+        for handlers in vars(self).values():
+            handlers.clear()
+
+
+class _Timers():
+    """Registered functions are matched by identity, as in blender"""
+
+    def __init__(self):
+        self.functions = []
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        if self.is_registered(function):
+            raise ValueError("function is already registered")
+        self.functions.append(function)
+
+    def unregister(self, function):
+        for i, registered in enumerate(self.functions):
+            if registered is function:
+                del self.functions[i]
+                return
+        raise ValueError("function is not registered")
+
+    def is_registered(self, function):
+        return any(registered is function for registered in self.functions)
+
+    def run(self):
+        """Calls every registered function once, those returning None are unregistered"""
+        for function in list(self.functions):
+            if function() is None and self.is_registered(function):
+                self.unregister(function)
+
+    def clear(self):
+        self.functions.clear()
+
+
+handlers = _Handlers()
+timers = _Timers()
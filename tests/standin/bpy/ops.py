@@ -0,0 +1,105 @@
+"""Stand-in bpy.ops, calls run the registered operator classes and a few builtin operators"""
+
+import bpy
+
+# (idname, properties, result) of every call
+calls = []
+
+
+def mode_set(mode='OBJECT'):
+    context = bpy.context
+    objects = {object for object in context.selected_objects if object.type == 'MESH'}
+    if context.active_object is not None:
+        objects.add(context.active_object)
+
+    for object in bpy.data.objects:
+        if object.type == 'MESH' and object.data.is_editmode:
+            object.data.leave_edit_mode()
+
+    if mode == 'EDIT':
+        for mesh in {object.data for object in objects if object.type == 'MESH'}:
+            mesh.enter_edit_mode()
+        context.mode = 'EDIT_MESH'
+    else:
+        context.mode = 'OBJECT'
+    return {'FINISHED'}
+
+
+def open_mainfile(filepath=""):
+    """Stand-in blend files are the text files of BlendDataLibraries, their material names become the new data"""
+    try:
+        with open(filepath, "rb") as file:
+            lines = file.read().decode("utf-8", "replace").splitlines()
+    except OSError as error:
+        raise RuntimeError(f"Error: Cannot read file \"{filepath}\": {error.strerror}") from None
+    if not lines or lines[0] != "BLENDER":
+        raise RuntimeError(f"Error: Cannot read file \"{filepath}\": File format is not supported")
+
+    # the preferences and the window manager outlive the file, as in blender
+    preferences, window_manager = bpy.context.preferences, bpy.context.window_manager
+    bpy.data = bpy.types.BlendData()
+    bpy.data.filepath = filepath
+    bpy.context = bpy.types.Context(bpy.data)
+    bpy.context.preferences, bpy.context.window_manager = preferences, window_manager
+    for name in lines[1:]:
+        bpy.data.materials.new(name)
+    for handler in list(bpy.app.handlers.load_post):
+        handler(None)
+    return {'FINISHED'}
+
+
+def save_mainfile(filepath=""):
+    bpy.data.is_dirty = False
+    return {'FINISHED'}
+
+
+builtin_operators = {
+    "object.mode_set": mode_set,
+    "wm.open_mainfile": open_mainfile,
+    "wm.save_mainfile": save_mainfile,
+}
+
+
+class _OperatorCall():
+    def __init__(self, idname):
+        self.idname = idname
+
+    def __call__(self, execution_context='EXEC_DEFAULT', **properties):
+        builtin = builtin_operators.get(self.idname)
+        if builtin is not None:
+            result = builtin(**properties)
+            calls.append((self.idname, properties, result))
+            return result
+
+        cls = bpy.utils.registered_operators.get(self.idname)
+        if cls is None:
+            raise AttributeError(f"Calling operator \"bpy.ops.{self.idname}\" error, could not be found")
+
+        context = bpy.context
+        if hasattr(cls, "poll") and not cls.poll(context):
+            raise RuntimeError(f"Operator bpy.ops.{self.idname}.poll() failed, context is incorrect")
+
+        operator = cls()
+        for name, value in properties.items():
+            setattr(operator, name, value)
+
+        if execution_context.startswith('INVOKE') and hasattr(operator, "invoke"):
+            result = operator.invoke(context, bpy.types.Event('NONE'))
+        else:
+            result = operator.execute(context)
+        if 'FINISHED' in result and 'UNDO' in cls.bl_options:
+            context.window_manager.undo_steps.append(self.idname)
+        calls.append((self.idname, properties, result))
+        return result
+
+
+class _OperatorModule():
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, name):
+        return _OperatorCall(f"{self.name}.{name}")
+
+
+def __getattr__(name):
+    return _OperatorModule(name)
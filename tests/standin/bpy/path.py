@@ -0,0 +1,16 @@
+"""Stand-in bpy.path"""
+
+import os
+
+import bpy
+
+
+def abspath(path, start=None):
+    if path.startswith("//"):
+        start = start or os.path.dirname(bpy.data.filepath) or os.getcwd()
+        return os.path.join(start, path[2:])
+    return path
+
+
+def basename(path):
+    return os.path.basename(path[2:] if path.startswith("//") else path)
@@ -0,0 +1,111 @@
+"""Stand-in property definitions.
+
+Like blender, the definitions are deferred: class annotations only describe the property. Operators, property
+groups and preferences read their defaults from them when instanced, and definitions assigned to a type
+(e.g. Scene.material_history) act as descriptors holding one value per instance."""
+
+
+class _PropertyDeferred():
+    def __init__(self, function, keywords):
+        self.function = function
+        self.keywords = keywords
+
+    def default(self):
+        keywords = self.keywords
+        if self.function is CollectionProperty:
+            return PropertyCollection(keywords["type"])
+        if self.function is PointerProperty:
+            return None
+        if "default" in keywords:
+            default = keywords["default"]
+            return set(default) if isinstance(default, (set, frozenset)) else default
+        if self.function is EnumProperty:
+            items = keywords.get("items")
+            if "ENUM_FLAG" in keywords.get("options", ()):
+                return set()
+            return items[0][0] if isinstance(items, (list, tuple)) and items else ""
+        if self.function is FloatVectorProperty:
+            return (0.0,) * keywords.get("size", 3)
+        return {BoolProperty: False, IntProperty: 0, FloatProperty: 0.0, StringProperty: ""}[self.function]
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        key = ("property", id(self))
+        if key not in instance.__dict__:
+            instance.__dict__[key] = self.default()
+        return instance.__dict__[key]
+
+    def __set__(self, instance, value):
+        instance.__dict__[("property", id(self))] = value
+
+
+def init_properties(instance):
+    """Sets the annotated properties of instance to their defaults"""
+    for cls in reversed(type(instance).__mro__):
+        for name, annotation in vars(cls).get("__annotations__", {}).items():
+            if isinstance(annotation, _PropertyDeferred):
+                setattr(instance, name, annotation.default())
+
+
+class PropertyCollection():
+    """A CollectionProperty value"""
+
+    def __init__(self, type):
+        self._type = type
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def add(self):
+        item = self._type()
+        self._items.append(item)
+        return item
+
+    def remove(self, index):
+        del self._items[index]
+
+    def move(self, from_index, to_index):
+        self._items.insert(to_index, self._items.pop(from_index))
+
+    def clear(self):
+        self._items.clear()
+
+
+def BoolProperty(**keywords):
+    return _PropertyDeferred(BoolProperty, keywords)
+
+
+def IntProperty(**keywords):
+    return _PropertyDeferred(IntProperty, keywords)
+
+
+def FloatProperty(**keywords):
+    return _PropertyDeferred(FloatProperty, keywords)
+
+
+def FloatVectorProperty(**keywords):
+    return _PropertyDeferred(FloatVectorProperty, keywords)
+
+
+def StringProperty(**keywords):
+    return _PropertyDeferred(StringProperty, keywords)
+
+
+def EnumProperty(**keywords):
+    return _PropertyDeferred(EnumProperty, keywords)
+
+
+def PointerProperty(**keywords):
+    return _PropertyDeferred(PointerProperty, keywords)
+
+
+def CollectionProperty(**keywords):
+    return _PropertyDeferred(CollectionProperty, keywords)
@@ -0,0 +1,1101 @@
+"""Stand-in data model: ID collections, materials with node trees, meshes, curves, objects and the context"""
+
+import contextlib
+
+import itertools
+
+import numpy as np
+
+from mathutils import Matrix
+
+from .props import init_properties
+
+
+class bpy_struct():
+    pass
+
+
+class _RNAProperty():
+    def __init__(self, identifier, type='FLOAT', is_readonly=False):
+        self.identifier = identifier
+        self.type = type
+        self.is_readonly = is_readonly
+
+
+class _RNAProperties(dict):
+    """bl_rna.properties, iterating over the property descriptions like a bpy_prop_collection"""
+
+    def __iter__(self):
+        return iter(self.values())
+
+
+class _RNA():
+    def __init__(self, identifier, names, editable=()):
+        """names are the read only properties of the base type, editable the ones signatures describe"""
+        self.identifier = identifier
+        self.properties = _RNAProperties(
+            [(name, _RNAProperty(name, is_readonly=True)) for name in names]
+            + [(name, _RNAProperty(name)) for name in editable])
+
+
+# -------------------------------------
+# Interface base classes
+# -------------------------------------
+
+class Operator(bpy_struct):
+    bl_options = set()
+
+    def __init__(self):
+        init_properties(self)
+        self.reports = []
+        self.layout = None
+
+    def report(self, type, message):
+        self.reports.append((frozenset(type), message))
+
+
+class Menu(bpy_struct):
+    def __init__(self, layout=None):
+        self.layout = layout
+
+
+class Panel(bpy_struct):
+    def __init__(self, layout=None):
+        self.layout = layout
+
+
+class UIList(bpy_struct):
+    pass
+
+
+class PropertyGroup(bpy_struct):
+    def __init__(self):
+        self.name = ""
+        init_properties(self)
+
+
+class AddonPreferences(bpy_struct):
+    def __init__(self):
+        init_properties(self)
+
+
+class _MenuType():
+    """Header menus other addons append draw functions to"""
+
+    def __init__(self):
+        self.draw_functions = []
+
+    def append(self, function):
+        self.draw_functions.append(function)
+
+    def remove(self, function):
+        self.draw_functions.remove(function)
+
+
+VIEW3D_MT_editor_menus = _MenuType()
+
+
+class SpaceView3D(bpy_struct):
+    draw_handlers = []
+
+    @classmethod
+    def draw_handler_add(cls, function, args, region_type, draw_type):
+        handle = (function, args)
+        cls.draw_handlers.append(handle)
+        return handle
+
+    @classmethod
+    def draw_handler_remove(cls, handle, region_type):
+        cls.draw_handlers.remove(handle)
+
+
+class OperatorProperties(bpy_struct):
+    """Returned by layout.operator, the drawn button's properties"""
+
+    def __init__(self, idname):
+        self.bl_idname = idname
+
+
+class UILayout(bpy_struct):
+    """Records what is drawn. Every sub layout appends to the list of its root, in drawing order"""
+
+    def __init__(self, drawn=None):
+        self.drawn = [] if drawn is None else drawn
+        self.enabled = True
+        self.active = True
+        self.alert = False
+        self.scale_x = 1.0
+        self.scale_y = 1.0
+        self.operator_context = 'INVOKE_DEFAULT'
+
+    def row(self, align=False, heading=""):
+        return UILayout(self.drawn)
+
+    def column(self, align=False, heading=""):
+        return UILayout(self.drawn)
+
+    def split(self, factor=0.0, align=False):
+        return UILayout(self.drawn)
+
+    def box(self):
+        return UILayout(self.drawn)
+
+    def grid_flow(self, row_major=False, columns=0, even_columns=False, even_rows=False, align=False):
+        return UILayout(self.drawn)
+
+    def menu_pie(self):
+        return UILayout(self.drawn)
+
+    def operator(self, operator, text="", icon='NONE', icon_value=0, **keywords):
+        properties = OperatorProperties(operator)
+        self.drawn.append(("operator", operator, text, icon_value or icon, properties))
+        return properties
+
+    def prop(self, data, property, text="", icon='NONE', icon_value=0, **keywords):
+        self.drawn.append(("prop", property, text, icon_value or icon, data))
+
+    def label(self, text="", icon='NONE', icon_value=0):
+        self.drawn.append(("label", None, text, icon_value or icon, None))
+
+    def menu(self, menu, text="", icon='NONE', icon_value=0):
+        self.drawn.append(("menu", menu, text, icon_value or icon, None))
+
+    def separator(self, factor=1.0):
+        self.drawn.append(("separator", None, "", 'NONE', None))
+
+    def icon(self, data):
+        return 0
+
+    def operators(self, idname=None):
+        """The properties of the drawn operator buttons, optionally only those of one operator"""
+        return [item[4] for item in self.drawn if item[0] == "operator" and idname in (None, item[1])]
+
+
+# -------------------------------------
+# IDs
+# -------------------------------------
+
+_session_uids = itertools.count(1)
+
+
+class ID(bpy_struct):
+    bl_rna = _RNA("ID", ["rna_type", "name", "name_full", "id_type", "session_uid", "is_evaluated", "original", "users",
+                   "use_fake_user", "use_extra_user", "is_embedded_data", "is_missing", "is_runtime_data", "tag",
+                   "is_library_indirect", "library", "library_weak_reference", "asset_data", "override_library",
+                   "preview"])
+
+    def __init__(self, name):
+        self._name = name
+        self._collection = None
+        self._properties = {}
+        self.use_fake_user = False
+        self.library = None
+        self.preview = None
+        self.session_uid = next(_session_uids)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self._name!r}>"
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        collection = self._collection
+        if collection is None:
+            self._name = value
+        elif value != self._name:
+            collection._rename(self, value)
+
+    @property
+    def name_full(self):
+        return self._name
+
+    @property
+    def original(self):
+        return self
+
+    @property
+    def is_evaluated(self):
+        return False
+
+    def evaluated_get(self, depsgraph):
+        return self
+
+    def __getitem__(self, key):
+        return self._properties[key]
+
+    def __setitem__(self, key, value):
+        self._properties[key] = value
+
+    def __contains__(self, key):
+        return key in self._properties
+
+    def get(self, key, default=None):
+        return self._properties.get(key, default)
+
+    def as_pointer(self):
+        return id(self)
+
+    def user_remap(self, new_id):
+        """Only materials are remapped, their users are the data and object slots"""
+        if self._collection is not None:
+            self._collection._blend_data._remap(self, new_id)
+
+
+class ImagePreview(bpy_struct):
+    icon_ids = 0
+
+    def __init__(self):
+        ImagePreview.icon_ids += 1
+        self.icon_id = ImagePreview.icon_ids
+
+
+# -------------------------------------
+# Node trees
+# -------------------------------------
+
+class NodeSocket(bpy_struct):
+    def __init__(self, node, name, default_value=None):
+        self.node = node
+        self.name = name
+        self.identifier = name
+        self.default_value = default_value
+        self.is_linked = False
+
+
+# name, inputs (name, default) and outputs of the nodes templates are built from
+node_types = {
+    'ShaderNodeBsdfPrincipled': ("Principled BSDF", [("Base Color", (0.8, 0.8, 0.8, 1.0)), ("Metallic", 0.0), ("Roughness", 0.5)], ["BSDF"]),
+    'ShaderNodeBsdfDiffuse': ("Diffuse BSDF", [("Color", (0.8, 0.8, 0.8, 1.0)), ("Roughness", 0.0)], ["BSDF"]),
+    'ShaderNodeEmission': ("Emission", [("Color", (1.0, 1.0, 1.0, 1.0)), ("Strength", 1.0)], ["Emission"]),
+    'ShaderNodeVolumePrincipled': ("Principled Volume", [("Color", (0.5, 0.5, 0.5, 1.0)), ("Density", 1.0)], ["Volume"]),
+    'ShaderNodeOutputMaterial': ("Material Output", [("Surface", None), ("Volume", None), ("Displacement", None)], []),
+}
+
+
+class Node(bpy_struct):
+    bl_rna = _RNA("Node", ["rna_type", "type", "location", "width", "height", "dimensions", "name", "label", "inputs",
+                   "outputs", "internal_links", "parent", "use_custom_color", "color", "select", "show_options",
+                   "show_preview", "hide", "mute", "show_texture", "bl_idname", "bl_label", "bl_description",
+                   "bl_icon", "bl_static_type", "bl_width_default", "bl_width_min", "bl_width_max",
+                   "bl_height_default", "bl_height_min", "bl_height_max"], ["mute"])
+
+    def __init__(self, bl_idname, name):
+        label, inputs, outputs = node_types[bl_idname]
+        self.bl_idname = bl_idname
+        self.name = name
+        self.label = ""
+        self.mute = False
+        self.location = (0.0, 0.0)
+        self.inputs = [NodeSocket(self, n, default) for n, default in inputs]
+        self.outputs = [NodeSocket(self, n) for n in outputs]
+
+
+class Nodes():
+    def __init__(self, tree):
+        self._tree = tree
+        self._nodes = []
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return next(node for node in self._nodes if node.name == key)
+        return self._nodes[key]
+
+    def get(self, name, default=None):
+        return next((node for node in self._nodes if node.name == name), default)
+
+    def new(self, type):
+        name = node_types[type][0]
+        names = {node.name for node in self._nodes}
+        unique, i = name, 0
+        while unique in names:
+            i += 1
+            unique = f"{name}.{i:03}"
+        node = Node(type, unique)
+        self._nodes.append(node)
+        return node
+
+    def remove(self, node):
+        self._nodes.remove(node)
+        links = self._tree.links
+        links._links = [link for link in links if link.from_node is not node and link.to_node is not node]
+
+
+class NodeLink(bpy_struct):
+    def __init__(self, from_socket, to_socket):
+        self.from_socket = from_socket
+        self.to_socket = to_socket
+        self.from_node = from_socket.node
+        self.to_node = to_socket.node
+        self.is_muted = False
+
+
+class NodeLinks():
+    def __init__(self):
+        self._links = []
+
+    def __len__(self):
+        return len(self._links)
+
+    def __iter__(self):
+        return iter(self._links)
+
+    def new(self, input, output):
+        # blender takes the sockets in either order
+        from_socket, to_socket = (output, input) if input in input.node.inputs else (input, output)
+        self._links = [link for link in self._links if link.to_socket is not to_socket]
+        link = NodeLink(from_socket, to_socket)
+        to_socket.is_linked = from_socket.is_linked = True
+        self._links.append(link)
+        return link
+
+
+class NodeTree(bpy_struct):
+    # only the embedded trees of materials are modelled
+    is_embedded_data = True
+
+    def __init__(self):
+        self.nodes = Nodes(self)
+        self.links = NodeLinks()
+
+    @property
+    def original(self):
+        return self
+
+    def as_pointer(self):
+        return id(self)
+
+    @classmethod
+    def default_material_tree(cls):
+        tree = cls()
+        shader = tree.nodes.new('ShaderNodeBsdfPrincipled')
+        output = tree.nodes.new('ShaderNodeOutputMaterial')
+        tree.links.new(shader.outputs[0], output.inputs[0])
+        return tree
+
+    def copy(self):
+        tree = NodeTree()
+        nodes = {}
+        for node in self.nodes:
+            new = tree.nodes.new(node.bl_idname)
+            new.name, new.label, new.mute, new.location = node.name, node.label, node.mute, node.location
+            for socket, source in zip(new.inputs, node.inputs):
+                socket.default_value = source.default_value
+            nodes[node.name] = new
+        for link in self.links:
+            from_node, to_node = nodes[link.from_node.name], nodes[link.to_node.name]
+            tree.links.new(from_node.outputs[link.from_node.outputs.index(link.from_socket)],
+                           to_node.inputs[link.to_node.inputs.index(link.to_socket)])
+        return tree
+
+
+# -------------------------------------
+# Materials
+# -------------------------------------
+
+class Material(ID):
+    bl_rna = _RNA("Material", ID.bl_rna.properties.keys(), ["diffuse_color", "use_nodes", "is_grease_pencil"])
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.diffuse_color = (0.8, 0.8, 0.8, 1.0)
+        self.is_grease_pencil = False
+        self.node_tree = None
+        self._use_nodes = False
+
+    @property
+    def use_nodes(self):
+        return self._use_nodes
+
+    @use_nodes.setter
+    def use_nodes(self, value):
+        if value and self.node_tree is None:
+            self.node_tree = NodeTree.default_material_tree()
+        self._use_nodes = bool(value)
+
+    def preview_ensure(self):
+        if self.preview is None:
+            self.preview = ImagePreview()
+        return self.preview
+
+    def copy(self):
+        material = self._collection.new(self._name)
+        material.diffuse_color = self.diffuse_color
+        material.use_fake_user = self.use_fake_user
+        material._use_nodes = self._use_nodes
+        material.node_tree = self.node_tree.copy() if self.node_tree else None
+        material._properties = dict(self._properties)
+        return material
+
+
+# -------------------------------------
+# Geometry
+# -------------------------------------
+
+class ElementProxy():
+    """One element of an ElementSequence, e.g. mesh.polygons[3].material_index"""
+
+    __slots__ = ("_sequence", "index")
+
+    def __init__(self, sequence, index):
+        object.__setattr__(self, "_sequence", sequence)
+        object.__setattr__(self, "index", index)
+
+    def __getattr__(self, name):
+        value = self._sequence._arrays[name][self.index]
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        # object attributes like vertex.groups are stored as they are
+        return value.item() if isinstance(value, np.generic) else value
+
+    def __setattr__(self, name, value):
+        self._sequence._arrays[name][self.index] = value
+
+
+class ElementSequence():
+    """Per element attributes stored as numpy arrays, with blender's foreach_get/foreach_set access"""
+
+    def __init__(self, attributes):
+        # name: (dtype, width)
+        self._attributes = attributes
+        self._arrays = {name: np.zeros((0, width) if width > 1 else 0, dtype=dtype)
+                        for name, (dtype, width) in attributes.items()}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return (ElementProxy(self, i) for i in range(self._count))
+
+    def __getitem__(self, index):
+        if not -self._count <= index < self._count:
+            raise IndexError(index)
+        return ElementProxy(self, index % self._count)
+
+    def add(self, count):
+        for name, array in self._arrays.items():
+            added = np.zeros((count,) + array.shape[1:], dtype=array.dtype)
+            if array.dtype == object:
+                added[:] = [()] * count
+            self._arrays[name] = np.concatenate((array, added))
+        self._count += count
+
+    def _array(self, name, seq):
+        array = self._arrays[name]
+        if len(seq) != array.size:
+            raise TypeError(f"foreach: sequence of {len(seq)} items, expected {array.size} for '{name}'")
+        return array
+
+    def foreach_get(self, name, seq):
+        array = self._array(name, seq)
+        seq[:] = array.ravel() if isinstance(seq, np.ndarray) else array.ravel().tolist()
+
+    def foreach_set(self, name, seq):
+        array = self._array(name, seq)
+        array.ravel()[:] = np.asarray(seq, dtype=array.dtype).ravel()
+
+
+class IDMaterials():
+    """The material slots of a mesh, curve or metaball"""
+
+    def __init__(self, data):
+        self._data = data
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __setitem__(self, index, material):
+        self._items[index] = material
+
+    def __contains__(self, material):
+        return material in self._items
+
+    def append(self, material):
+        self._items.append(material)
+
+    def pop(self, index=-1):
+        return self._items.pop(index)
+
+    def clear(self):
+        self._items.clear()
+
+    def find(self, name):
+        return next((i for i, m in enumerate(self._items) if m and m.name == name), -1)
+
+
+class Mesh(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.materials = IDMaterials(self)
+        self.vertices = ElementSequence({
+            "co": (np.float32, 3), "select": (bool, 1), "hide": (bool, 1), "groups": (object, 1),
+        })
+        self.loops = ElementSequence({"vertex_index": (np.int32, 1)})
+        self.polygons = ElementSequence({
+            "material_index": (np.int32, 1), "select": (bool, 1), "hide": (bool, 1), "use_smooth": (bool, 1),
+            "loop_start": (np.int32, 1), "loop_total": (np.int32, 1), "center": (np.float32, 3),
+        })
+        self.edit_bmesh = None
+        self.updates = 0
+        self.edit_updates = 0
+
+    @property
+    def is_editmode(self):
+        return self.edit_bmesh is not None
+
+    def update(self, calc_edges=False, calc_edges_loose=False):
+        self.updates += 1
+
+    def update_tag(self):
+        self.updates += 1
+
+    def from_pydata(self, vertices, edges, faces):
+        self.vertices.add(len(vertices))
+        self.vertices.foreach_set("co", np.asarray(vertices, dtype=np.float32).ravel())
+        totals = np.array([len(face) for face in faces], dtype=np.int32)
+        self.loops.add(int(totals.sum()))
+        self.loops.foreach_set("vertex_index", [i for face in faces for i in face])
+        self.polygons.add(len(faces))
+        self.polygons.foreach_set("loop_total", totals)
+        self.polygons.foreach_set("loop_start", np.concatenate(([0], np.cumsum(totals)[:-1])).astype(np.int32))
+
+    def enter_edit_mode(self):
+        import bmesh
+        self.edit_bmesh = bmesh.new()
+        self.edit_bmesh.from_mesh(self)
+
+    def leave_edit_mode(self):
+        self.edit_bmesh.to_mesh(self)
+        self.edit_bmesh = None
+
+
+class Curve(ID):
+    def __init__(self, name, type='CURVE'):
+        super().__init__(name)
+        self.type = type
+        self.materials = IDMaterials(self)
+        self.splines = ElementSequence({"material_index": (np.int32, 1)})
+        self.updates = 0
+
+    def update_tag(self):
+        self.updates += 1
+
+
+class TextCurve(Curve):
+    def __init__(self, name, type='FONT'):
+        super().__init__(name, type)
+        self.body_format = ElementSequence({"material_index": (np.int32, 1)})
+
+
+class MetaBall(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.materials = IDMaterials(self)
+
+
+# -------------------------------------
+# Objects
+# -------------------------------------
+
+class MaterialSlot(bpy_struct):
+    """Slot i of an object, the material comes from the data or the object depending on link"""
+
+    def __init__(self, object, index):
+        self._object = object
+        self._index = index
+
+    @property
+    def link(self):
+        return self._object._slot_links.get(self._index, 'DATA')
+
+    @link.setter
+    def link(self, value):
+        self._object._slot_links[self._index] = value
+
+    @property
+    def material(self):
+        if self.link == 'OBJECT':
+            return self._object._slot_materials.get(self._index)
+        return self._object.data.materials[self._index]
+
+    @material.setter
+    def material(self, material):
+        if self.link == 'OBJECT':
+            self._object._slot_materials[self._index] = material
+        else:
+            self._object.data.materials[self._index] = material
+
+    @property
+    def name(self):
+        return self.material.name if self.material else ""
+
+
+class VertexGroupElement(bpy_struct):
+    def __init__(self, group, weight):
+        self.group = group
+        self.weight = weight
+
+
+class VertexGroup(bpy_struct):
+    def __init__(self, object, index, name):
+        self._object = object
+        self.index = index
+        self.name = name
+
+    def add(self, index, weight, type):
+        vertices = self._object.data.vertices
+        for vertex in index:
+            groups = [element for element in vertices[vertex].groups if element.group != self.index]
+            if type != 'SUBTRACT':
+                groups.append(VertexGroupElement(self.index, weight))
+            vertices[vertex].groups = tuple(groups)
+
+
+class VertexGroups():
+    def __init__(self, object):
+        self._object = object
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def new(self, name="Group"):
+        group = VertexGroup(self._object, len(self._items), name)
+        self._items.append(group)
+        return group
+
+
+object_types = {Mesh: 'MESH', TextCurve: 'FONT', MetaBall: 'META'}
+
+
+class Object(ID):
+    def __init__(self, name, data):
+        super().__init__(name)
+        self.data = data
+        self._select = False
+        self._slot_links = {}
+        self._slot_materials = {}
+        self.location = (0.0, 0.0, 0.0)
+        self.scale = (1.0, 1.0, 1.0)
+        self.matrix_world = Matrix.Identity(4)
+        self.vertex_groups = VertexGroups(self)
+
+    @property
+    def type(self):
+        if self.data is None:
+            return 'EMPTY'
+        if isinstance(self.data, Curve) and not isinstance(self.data, TextCurve):
+            return self.data.type
+        return object_types[type(self.data)]
+
+    @property
+    def material_slots(self):
+        materials = getattr(self.data, "materials", ())
+        return [MaterialSlot(self, i) for i in range(len(materials))]
+
+    @property
+    def bound_box(self):
+        """Corners of the local bounding box of the mesh vertices, all at the origin without vertices"""
+        vertices = getattr(self.data, "vertices", ())
+        if len(vertices) == 0:
+            return [(0.0, 0.0, 0.0)] * 8
+        co = np.empty(len(vertices) * 3, dtype=np.float32)
+        vertices.foreach_get("co", co)
+        co = co.reshape(-1, 3)
+        (x0, y0, z0), (x1, y1, z1) = co.min(axis=0).tolist(), co.max(axis=0).tolist()
+        return [(x0, y0, z0), (x0, y0, z1), (x0, y1, z1), (x0, y1, z0),
+                (x1, y0, z0), (x1, y0, z1), (x1, y1, z1), (x1, y1, z0)]
+
+    def to_mesh(self):
+        return self.data
+
+    def to_mesh_clear(self):
+        pass
+
+    def select_get(self):
+        return self._select
+
+    def select_set(self, state):
+        self._select = bool(state)
+
+
+# -------------------------------------
+# Blend data
+# -------------------------------------
+
+class IDCollection():
+    """bpy.data.materials and friends, names are unique like in blender (Material, Material.001, ...)"""
+
+    def __init__(self, blend_data, id_type):
+        self._blend_data = blend_data
+        self._id_type = id_type
+        self._ids = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(list(self._ids.values()))
+
+    def __contains__(self, key):
+        return (key in self._ids) if isinstance(key, str) else any(key is id for id in self._ids.values())
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._ids[key]
+        return list(self._ids.values())[key]
+
+    def get(self, name, default=None):
+        return self._ids.get(name, default)
+
+    def keys(self):
+        return list(self._ids.keys())
+
+    def values(self):
+        return list(self._ids.values())
+
+    def items(self):
+        return list(self._ids.items())
+
+    def _unique(self, name):
+        name = name[:63]
+        if name not in self._ids:
+            return name
+        base = name.rsplit(".", 1)[0] if name[-4:-3] == "." and name[-3:].isdigit() else name
+        i = 1
+        while f"{base}.{i:03}" in self._ids:
+            i += 1
+        return f"{base}.{i:03}"
+
+    def _add(self, id):
+        id._name = self._unique(id._name)
+        id._collection = self
+        self._ids[id._name] = id
+        return id
+
+    def _rename(self, id, name):
+        del self._ids[id._name]
+        id._name = self._unique(name)
+        self._ids[id._name] = id
+
+    def new(self, name, *args):
+        return self._add(self._id_type(name, *args))
+
+    def remove(self, id, do_unlink=True):
+        if self._ids.get(id.name) is not id:
+            raise ReferenceError(f"{id!r} is not in this collection")
+        del self._ids[id.name]
+        id._collection = None
+        if do_unlink:
+            self._blend_data._unlink(id)
+
+
+class SceneObjects():
+    def __init__(self):
+        self._objects = []
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def link(self, object):
+        self._objects.append(object)
+
+    def unlink(self, object):
+        self._objects.remove(object)
+
+
+class SceneCollection():
+    def __init__(self):
+        self.objects = SceneObjects()
+
+
+class Scene(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.collection = SceneCollection()
+
+
+class _LibraryData():
+    def __init__(self, materials):
+        self.materials = materials
+
+
+class BlendDataLibraries():
+    """Stand-in blend files are text files, 'BLENDER' on the first line and then one material name per line"""
+
+    def __init__(self, blend_data):
+        self._blend_data = blend_data
+
+    @contextlib.contextmanager
+    def load(self, filepath, link=False, relative=False):
+        with open(filepath, "rb") as file:
+            lines = file.read().decode("utf-8", "replace").splitlines()
+        if not lines or lines[0] != "BLENDER":
+            raise OSError(f"Cannot read file '{filepath}': File format is not supported")
+
+        data_from, data_to = _LibraryData(lines[1:]), _LibraryData([])
+        yield data_from, data_to
+        data_to.materials = [self._blend_data.materials.new(name) for name in data_to.materials]
+
+
+class BlendData():
+    def __init__(self):
+        self.filepath = ""
+        self.is_dirty = False
+        self.materials = IDCollection(self, Material)
+        self.meshes = IDCollection(self, Mesh)
+        self.curves = IDCollection(self, Curve)
+        self.metaballs = IDCollection(self, MetaBall)
+        self.objects = IDCollection(self, Object)
+        self.scenes = IDCollection(self, Scene)
+        self.scenes.new("Scene")
+        self.libraries = BlendDataLibraries(self)
+
+    def _remap(self, id, new):
+        for collection in (self.meshes, self.curves, self.metaballs):
+            for data in collection:
+                data.materials._items = [new if m is id else m for m in data.materials._items]
+        for object in self.objects:
+            for index, material in list(object._slot_materials.items()):
+                if material is id:
+                    object._slot_materials[index] = new
+
+    def _unlink(self, id):
+        if isinstance(id, Material):
+            self._remap(id, None)
+        elif isinstance(id, Object):
+            for scene in self.scenes:
+                if id in scene.collection.objects._objects:
+                    scene.collection.objects.unlink(id)
+        else:
+            for object in self.objects:
+                if object.data is id:
+                    object.data = None
+
+    def _users(self):
+        users = {}
+        for object in self.objects:
+            if object.data is not None:
+                users.setdefault(object.data, set()).add(object)
+            for material in object._slot_materials.values():
+                if material is not None:
+                    users.setdefault(material, set()).add(object)
+        for collection in (self.meshes, self.curves, self.metaballs):
+            for data in collection:
+                for material in data.materials:
+                    if material is not None:
+                        users.setdefault(material, set()).add(data)
+        return users
+
+    def user_map(self, subset=None, key_types=None, value_types=None):
+        users = self._users()
+        if subset is None:
+            subset = [id for collection in (self.materials, self.meshes, self.curves, self.metaballs, self.objects)
+                      for id in collection]
+        value_classes = tuple(c for c, name in ((Object, 'OBJECT'), (Mesh, 'MESH'), (Curve, 'CURVE'),
+                                                (MetaBall, 'METABALL'), (Material, 'MATERIAL'))
+                              if value_types is None or name in value_types)
+        return {id: {user for user in users.get(id, ()) if isinstance(user, value_classes)} for id in subset}
+
+    def batch_remove(self, ids):
+        for id in list(ids):
+            id._collection.remove(id)
+
+
+# -------------------------------------
+# Context
+# -------------------------------------
+
+class Timer(bpy_struct):
+    def __init__(self, time_step, window):
+        self.time_step = time_step
+        self.window = window
+
+
+class WindowManager(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.windows = []
+        self.keyconfigs = _KeyConfigs()
+        self.modal_handlers = []
+        self.event_timers = []
+        self.progress = None
+        # bl_idname of every operator that pushed an undo step
+        self.undo_steps = []
+
+    def modal_handler_add(self, operator):
+        self.modal_handlers.append(operator)
+        return True
+
+    def event_timer_add(self, time_step, window=None):
+        timer = Timer(time_step, window)
+        self.event_timers.append(timer)
+        return timer
+
+    def event_timer_remove(self, timer):
+        self.event_timers.remove(timer)
+
+    def progress_begin(self, min, max):
+        self.progress = [min, max, min]
+
+    def progress_update(self, value):
+        self.progress[2] = value
+
+    def progress_end(self):
+        self.progress = None
+
+    def fileselect_add(self, operator):
+        self.modal_handlers.append(operator)
+
+    def invoke_props_dialog(self, operator, width=300):
+        return {'RUNNING_MODAL'}
+
+    def invoke_search_popup(self, operator):
+        return {'RUNNING_MODAL'}
+
+
+class _KeyConfigs():
+    addon = None
+
+
+class WorkSpace(bpy_struct):
+    def __init__(self):
+        self.status_text = None
+
+    def status_text_set(self, text=None):
+        self.status_text = text
+
+
+class _LayerObjects():
+    def __init__(self):
+        self.active = None
+
+
+class ViewLayer(bpy_struct):
+    def __init__(self):
+        self.objects = _LayerObjects()
+
+    def update(self):
+        pass
+
+
+class _Addon():
+    def __init__(self, preferences):
+        self.preferences = preferences
+
+
+class Preferences(bpy_struct):
+    def __init__(self):
+        self.addons = {}
+        self.inputs = _Inputs()
+
+
+class _Inputs():
+    drag_threshold_mouse = 3
+
+
+class Depsgraph(bpy_struct):
+    """Reports the given ids as updated, like the depsgraph passed to depsgraph_update_post handlers"""
+
+    def __init__(self, updates=(), **flags):
+        self.updates = [DepsgraphUpdate(id, **flags) for id in updates]
+
+    def id_type_updated(self, id_type):
+        types = {'MATERIAL': Material, 'MESH': Mesh, 'OBJECT': Object, 'CURVE': Curve}
+        return any(isinstance(update.id, types[id_type]) for update in self.updates)
+
+
+class DepsgraphUpdate(bpy_struct):
+    def __init__(self, id, geometry=True, transform=True, shading=True):
+        self.id = id
+        self.is_updated_geometry = geometry
+        self.is_updated_transform = transform
+        self.is_updated_shading = shading
+
+
+class Event(bpy_struct):
+    def __init__(self, type, value='PRESS', ctrl=False, shift=False, alt=False, mouse_region_x=0, mouse_region_y=0):
+        self.type = type
+        self.value = value
+        self.ctrl = ctrl
+        self.shift = shift
+        self.alt = alt
+        self.mouse_region_x = mouse_region_x
+        self.mouse_region_y = mouse_region_y
+
+
+class Area(bpy_struct):
+    """A 3D viewport area, redraws are counted"""
+
+    def __init__(self, type='VIEW_3D'):
+        self.type = type
+        self.redraws = 0
+
+    def tag_redraw(self):
+        self.redraws += 1
+
+
+class Space(bpy_struct):
+    def __init__(self, type='VIEW_3D'):
+        self.type = type
+
+
+class Context(bpy_struct):
+    def __init__(self, blend_data):
+        self.blend_data = blend_data
+        self.mode = 'OBJECT'
+        self.scene = blend_data.scenes["Scene"]
+        self.window_manager = WindowManager("WinMan")
+        self.workspace = WorkSpace()
+        self.preferences = Preferences()
+        self.view_layer = ViewLayer()
+        self.window = None
+        self.area = Area()
+        self.region = None
+        self.region_data = None
+        self.space_data = Space()
+
+    @property
+    def selected_objects(self):
+        return [object for object in self.blend_data.objects if object.select_get()]
+
+    @property
+    def visible_objects(self):
+        return list(self.blend_data.objects)
+
+    @property
+    def active_object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def object(self):
+        return self.view_layer.objects.active
+
+    def evaluated_depsgraph_get(self):
+        return Depsgraph()
+
@@ -0,0 +1,41 @@
+"""Stand-in bpy.utils: class registration and resource paths"""
+
+import os
+import tempfile
+
+import bpy
+
+registered_classes = []
+registered_operators = {}
+
+_resource_root = None
+
+
+def register_class(cls):
+    if cls in registered_classes:
+        raise ValueError(f"register_class(...): already registered as a subclass '{cls.__name__}'")
+    registered_classes.append(cls)
+
+    if issubclass(cls, bpy.types.AddonPreferences):
+        bpy.context.preferences.addons[cls.bl_idname] = bpy.types._Addon(cls())
+    elif issubclass(cls, bpy.types.Operator):
+        registered_operators[cls.bl_idname] = cls
+
+
+def unregister_class(cls):
+    registered_classes.remove(cls)
+
+    if issubclass(cls, bpy.types.AddonPreferences):
+        del bpy.context.preferences.addons[cls.bl_idname]
+    elif issubclass(cls, bpy.types.Operator):
+        del registered_operators[cls.bl_idname]
+
+
+def user_resource(resource_type, path="", create=False):
+    global _resource_root
+    if _resource_root is None:
+        _resource_root = tempfile.mkdtemp(prefix="bpy_standin_")
+    directory = os.path.join(_resource_root, resource_type.lower(), path)
+    if create:
+        os.makedirs(directory, exist_ok=True)
+    return directory
@@ -0,0 +1,19 @@
+"""Stand-in file browser helpers"""
+
+import bpy
+
+
+class ImportHelper():
+    filepath: bpy.props.StringProperty(name="File Path", subtype='FILE_PATH')
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+class ExportHelper():
+    filepath: bpy.props.StringProperty(name="File Path", subtype='FILE_PATH')
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
@@ -0,0 +1,13 @@
+"""Stand-in viewport projection helpers, there is no viewport to project from"""
+
+
+def region_2d_to_vector_3d(region, rv3d, coord):
+    raise NotImplementedError("the stand-in has no viewport")
+
+
+def region_2d_to_origin_3d(region, rv3d, coord, clamp=None):
+    raise NotImplementedError("the stand-in has no viewport")
+
+
+def region_2d_to_location_3d(region, rv3d, coord, depth_location):
+    raise NotImplementedError("the stand-in has no viewport")
@@ -0,0 +1,58 @@
+"""Stand-in mathutils, only what the addon imports"""
+
+import numpy as np
+
+
+class Vector(tuple):
+    def __new__(cls, seq=(0.0, 0.0, 0.0)):
+        return super().__new__(cls, (float(value) for value in seq))
+
+    @property
+    def length(self):
+        return sum(value * value for value in self) ** 0.5
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self, other))
+
+    def __sub__(self, other):
+        return Vector(a - b for a, b in zip(self, other))
+
+    def __mul__(self, factor):
+        return Vector(value * factor for value in self)
+
+
+class Matrix():
+    """Square matrices backed by numpy, vectors are columns and 4x4 matrices transform 3D points"""
+
+    def __init__(self, rows=None):
+        self._rows = np.array(np.identity(4) if rows is None else rows, dtype=np.float64)
+
+    @classmethod
+    def Identity(cls, size):
+        return cls(np.identity(size))
+
+    @classmethod
+    def Translation(cls, vector):
+        matrix = np.identity(4)
+        matrix[:3, 3] = vector
+        return cls(matrix)
+
+    def __array__(self, dtype=None, copy=None):
+        return self._rows if dtype is None else self._rows.astype(dtype)
+
+    def copy(self):
+        return Matrix(self._rows)
+
+    def inverted_safe(self):
+        return Matrix(np.linalg.pinv(self._rows))
+
+    def to_3x3(self):
+        return Matrix(self._rows[:3, :3])
+
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            return Matrix(self._rows @ other._rows)
+        vector = np.asarray(other, dtype=np.float64)
+        if len(vector) == 3 and len(self._rows) == 4:
+            return Vector((self._rows @ np.append(vector, 1.0))[:3])
+        return Vector(self._rows @ vector)
@@ -0,0 +1,7 @@
+"""Stand-in BVH trees, there is no evaluated geometry to build them from"""
+
+
+class BVHTree():
+    @classmethod
+    def FromObject(cls, object, depsgraph):
+        raise NotImplementedError("the stand-in has no evaluated geometry")
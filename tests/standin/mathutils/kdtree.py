@@ -0,0 +1,23 @@
+"""Stand-in KDTree with a brute force nearest search"""
+
+import numpy as np
+
+
+class KDTree():
+    def __init__(self, size):
+        self.points = np.zeros((size, 3))
+        self.indices = np.zeros(size, dtype=np.int64)
+        self.count = 0
+
+    def insert(self, co, index):
+        self.points[self.count] = co
+        self.indices[self.count] = index
+        self.count += 1
+
+    def balance(self):
+        pass
+
+    def find(self, co):
+        distances = np.linalg.norm(self.points[:self.count] - co, axis=1)
+        i = int(distances.argmin())
+        return tuple(self.points[i]), int(self.indices[i]), float(distances[i])
@@ -0,0 +1,72 @@
+"""Helpers to drive the stand-in bpy from tests and benchmarks"""
+
+import numpy as np
+
+import bpy
+import bpy.types
+
+
+def reset():
+    """Starts over with an empty file: new data and context, no handlers, timers or registered classes"""
+    bpy.data = bpy.types.BlendData()
+    bpy.context = bpy.types.Context(bpy.data)
+    bpy.app.handlers.clear()
+    bpy.app.timers.clear()
+    bpy.utils.registered_classes.clear()
+    bpy.utils.registered_operators.clear()
+    bpy.ops.calls.clear()
+    bpy.types.SpaceView3D.draw_handlers.clear()
+    bpy.types.VIEW3D_MT_editor_menus.draw_functions.clear()
+
+
+def load_post():
+    """Runs the load_post handlers, as blender does after opening a file"""
+    for handler in list(bpy.app.handlers.load_post):
+        handler(None)
+
+
+def depsgraph_update(*ids, **flags):
+    """Runs the depsgraph_update_post handlers with a depsgraph reporting ids as updated.
+
+    flags (geometry, transform, shading) turn off the is_updated_* flags of the updates"""
+    depsgraph = bpy.types.Depsgraph(ids, **flags)
+    for handler in list(bpy.app.handlers.depsgraph_update_post):
+        handler(bpy.context.scene, depsgraph)
+
+
+def make_mesh_object(name, face_count, selected=None, link=True):
+    """A mesh object with face_count quads, selected is a boolean mask (or True) of the selected faces"""
+    mesh = bpy.data.meshes.new(name)
+    mesh.polygons.add(face_count)
+    mesh.polygons.foreach_set("loop_total", np.full(face_count, 4, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, face_count * 4, 4, dtype=np.int32))
+    if selected is not None:
+        mesh.polygons.foreach_set("select", np.broadcast_to(np.asarray(selected, dtype=bool), face_count))
+
+    object = bpy.data.objects.new(name, mesh)
+    if link:
+        bpy.context.scene.collection.objects.link(object)
+    return object
+
+
+def material_indices(mesh):
+    indices = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", indices)
+    return indices
+
+
+def send_event(type, value='PRESS', **keywords):
+    """Passes an event to the running modal operators like the window manager does, returns their results.
+
+    Operators which finish are removed, finished operators with 'UNDO' push an undo step."""
+    wm = bpy.context.window_manager
+    event = bpy.types.Event(type, value, **keywords)
+    results = []
+    for operator in list(wm.modal_handlers):
+        result = operator.modal(bpy.context, event)
+        if not result & {'RUNNING_MODAL', 'PASS_THROUGH'}:
+            wm.modal_handlers.remove(operator)
+            if 'FINISHED' in result and 'UNDO' in operator.bl_options:
+                wm.undo_steps.append(operator.bl_idname)
+        results.append(result)
+    return results
@@ -0,0 +1,148 @@
+import numpy as np
+
+import bpy
+import standin
+
+from create_assign_material import core
+
+
+def test_polygons_keep_an_empty_first_slot_for_unselected_faces(context):
+    object = standin.make_mesh_object("Grid", 8, selected=np.arange(8) < 4)
+    material = bpy.data.materials.new("Red")
+
+    core.MaterialCreateAssignMethods().apply_material_to_polygons(object, material)
+
+    assert list(object.data.materials) == [None, material]
+    assert standin.material_indices(object.data).tolist() == [1, 1, 1, 1, 0, 0, 0, 0]
+
+
+def test_polygons_all_selected_use_the_first_slot(context):
+    object = standin.make_mesh_object("Grid", 6, selected=True)
+    material = bpy.data.materials.new("Red")
+
+    core.MaterialCreateAssignMethods().apply_material_to_polygons(object, material)
+
+    assert list(object.data.materials) == [material]
+    assert not standin.material_indices(object.data).any()
+
+
+def test_polygons_reuse_an_existing_slot(context):
+    object = standin.make_mesh_object("Grid", 4, selected=[True, False, True, False])
+    red, blue = bpy.data.materials.new("Red"), bpy.data.materials.new("Blue")
+    object.data.materials.append(red)
+    object.data.materials.append(blue)
+
+    core.MaterialCreateAssignMethods().apply_material_to_polygons(object, blue)
+
+    assert list(object.data.materials) == [red, blue]
+    assert standin.material_indices(object.data).tolist() == [1, 0, 1, 0]
+
+
+def test_edit_mode_assigns_selected_faces(context):
+    object = standin.make_mesh_object("Grid", 6, selected=[True, True, False, False, True, False])
+    object.select_set(True)
+    material = bpy.data.materials.new("Red")
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    core.MaterialCreateAssignMethods().apply_material_to_polygons(object, material)
+    assert object.data.edit_updates == 1
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    assert standin.material_indices(object.data).tolist() == [1, 1, 0, 0, 1, 0]
+
+
+def test_edit_meshes_are_written_once_and_skipped_when_unchanged(context):
+    shared = standin.make_mesh_object("Shared", 10, selected=True)
+    instance = bpy.data.objects.new("Instance", shared.data)
+    other = standin.make_mesh_object("Other", 10, selected=np.arange(10) % 2 == 0)
+    objects = [shared, instance, other]
+    for object in objects:
+        object.select_set(True)
+    shared.data.materials.append(bpy.data.materials.new("Blue"))
+    material = bpy.data.materials.new("Red")
+    methods = core.MaterialCreateAssignMethods()
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    assert methods.apply_material_to_edit_meshes(objects, material) == (3, 2)
+    assert methods.apply_material_to_edit_meshes(objects, material) == (3, 0)
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    assert shared.data.edit_updates == 1
+    assert standin.material_indices(other.data).tolist() == [1, 0] * 5
+
+
+def test_objects_write_shared_data_once(context):
+    mesh = bpy.data.meshes.new("Shared")
+    objects = [bpy.data.objects.new(f"Instance_{i}", mesh) for i in range(3)]
+    material = bpy.data.materials.new("Red")
+    methods = core.MaterialCreateAssignMethods()
+
+    assert methods.apply_material_to_objects(objects, material) == (3, 1)
+    assert methods.apply_material_to_objects(objects, material) == (3, 0)
+    assert list(mesh.materials) == [material]
+
+
+def test_object_link_leaves_shared_data_untouched(context):
+    mesh = bpy.data.meshes.new("Shared")
+    red, blue = bpy.data.materials.new("Red"), bpy.data.materials.new("Blue")
+    mesh.materials.append(red)
+    first, second = bpy.data.objects.new("First", mesh), bpy.data.objects.new("Second", mesh)
+
+    core.MaterialCreateAssignMethods().apply_material_to_objects([first], blue, 'OBJECT')
+
+    assert list(mesh.materials) == [red]
+    assert [(slot.link, slot.material) for slot in first.material_slots] == [('OBJECT', blue)]
+    assert second.material_slots[0].material is red
+
+
+def test_selection_in_object_mode_skips_other_types(context):
+    mesh_object = standin.make_mesh_object("Grid", 4)
+    empty = bpy.data.objects.new("Empty", None)
+    for object in (mesh_object, empty):
+        object.select_set(True)
+    material = bpy.data.materials.new("Red")
+
+    stats = core.MaterialCreateAssignMethods().apply_material_to_selection(context, material)
+
+    assert stats == (1, 1)
+    assert list(mesh_object.data.materials) == [material]
+
+
+def test_face_maps_are_skipped_where_blender_has_none(context):
+    object = standin.make_mesh_object("Grid", 4)
+
+    assert 'FACE_MAP' not in {identifier for identifier, _, _ in core.face_data_sources}
+    assert core.assign_materials_from_face_data([object], 'FACE_MAP') == 0
+    assert list(object.data.materials) == []
+
+
+def make_strip():
+    """Three quads in a row over two rows of four vertices"""
+    mesh = bpy.data.meshes.new("Strip")
+    mesh.from_pydata([(x, y, 0.0) for y in (0.0, 1.0) for x in range(4)], [],
+                     [(0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6)])
+    object = bpy.data.objects.new("Strip", mesh)
+    bpy.context.scene.collection.objects.link(object)
+    return object
+
+
+def test_vertex_groups_need_all_vertices_of_a_face(context):
+    object = make_strip()
+    object.vertex_groups.new("Left").add([0, 1, 2, 4, 5, 6], 1.0, 'REPLACE')
+    object.vertex_groups.new("Middle").add([1, 2, 5, 6], 0.5, 'REPLACE')
+    object.vertex_groups.new("Right").add([3, 7], 1.0, 'REPLACE')
+    object.vertex_groups.new("Unweighted").add([2, 3, 6, 7], 0.0, 'REPLACE')
+
+    # the last group containing a face wins, partial and zero weight memberships don't count
+    assert core.read_vertex_group_faces(object).tolist() == [0, 1, -1]
+
+    assert core.assign_materials_from_face_data([object], 'VERTEX_GROUP') == 2
+    assert [getattr(material, "name", None) for material in object.data.materials] == [None, "Left", "Middle"]
+    assert standin.material_indices(object.data).tolist() == [1, 2, 0]
+
+
+def test_vertex_groups_without_members(context):
+    object = make_strip()
+    object.vertex_groups.new("Empty")
+
+    assert core.read_vertex_group_faces(object).tolist() == [-1, -1, -1]
@@ -0,0 +1,19 @@
+import json
+
+import benchmark
+import create_assign_material
+
+
+def test_benchmarks_run_on_the_standin(tmp_path):
+    filepath = tmp_path / "timings.json"
+    try:
+        benchmark.main(["--faces", "100", "--objects", "10", "--edit-objects", "2", "--materials", "10",
+                        "--create", "5", "--json", str(filepath)])
+    finally:
+        create_assign_material.unregister()
+
+    data = json.loads(filepath.read_text(encoding="utf-8"))
+    assert data["standin"]
+    benchmarks = {entry["benchmark"] for entry in data["results"]}
+    assert benchmarks == {"assign polygons", "assign objects", "assign multi edit", "cleanup slots", "unique names",
+                          "merge duplicates", "menu draw", "search", "create material"}
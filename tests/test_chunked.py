@@ -0,0 +1,135 @@
+import types
+
+import bpy
+import pytest
+import standin
+
+from create_assign_material import operators
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the operators' perf_counter with a clock advancing by clock.tick per call"""
+    clock = types.SimpleNamespace(now=0.0, tick=0.0)
+
+    def perf_counter():
+        clock.now += clock.tick
+        return clock.now
+
+    monkeypatch.setattr(operators, "time", types.SimpleNamespace(perf_counter=perf_counter))
+    return clock
+
+
+def test_step_stops_when_the_budget_is_used_up(clock):
+    done = []
+    task = operators.ChunkedTask(list(range(10)), done.append)
+    clock.tick = 1.0
+
+    assert not task.step(2.5)
+    assert done == [0, 1, 2]
+
+    # resumes with the next item
+    assert not task.step(2.5)
+    assert done == list(range(6))
+
+
+def test_step_processes_one_item_per_exhausted_budget(clock):
+    done = []
+    task = operators.ChunkedTask(["a", "b", "c"], done.append)
+    clock.tick = 1.0
+
+    assert [task.step(0.0) for _ in range(3)] == [False, False, True]
+    assert done == ["a", "b", "c"]
+
+
+def test_step_completes(clock):
+    done = []
+    task = operators.ChunkedTask(list(range(4)), done.append)
+
+    assert task.step(float("inf"))
+    assert done == list(range(4)) and task.done == 4
+    # nothing left to do
+    assert task.step(0.0)
+    assert done == list(range(4))
+
+
+def test_step_with_no_items():
+    assert operators.ChunkedTask([], None).step(0.0)
+
+
+def make_selection(count):
+    objects = [standin.make_mesh_object(f"Grid_{i}", 4) for i in range(count)]
+    for object in objects:
+        object.select_set(True)
+    return objects
+
+
+def assigned(objects, material):
+    return [material in list(object.data.materials) for object in objects]
+
+
+def test_modal_assignment_runs_in_timer_chunks(context, preferences, clock):
+    objects = make_selection(5)
+    material = bpy.data.materials.new("Red")
+    wm = context.window_manager
+    preferences.chunk_budget = 1
+    clock.tick = 0.0006
+
+    assert bpy.ops.object.material_assign_chunked('INVOKE_DEFAULT', material_name="Red") == {'RUNNING_MODAL'}
+    operator = wm.modal_handlers[0]
+    assert wm.progress == [0, 5, 0]
+    assert len(wm.event_timers) == 1
+    assert not any(assigned(objects, material))
+
+    # navigation passes through, other events are blocked without doing work
+    assert standin.send_event('WHEELUPMOUSE') == [{'PASS_THROUGH'}]
+    assert standin.send_event('MOUSEMOVE') == [{'RUNNING_MODAL'}]
+    assert not any(assigned(objects, material))
+
+    assert standin.send_event('TIMER') == [{'RUNNING_MODAL'}]
+    assert assigned(objects, material) == [True, True, False, False, False]
+    assert wm.progress[2] == 2
+    assert context.workspace.status_text == "Assigning Red: 2 / 5 (ESC to cancel)"
+
+    assert standin.send_event('TIMER') == [{'RUNNING_MODAL'}]
+    assert standin.send_event('TIMER') == [{'FINISHED'}]
+    assert all(assigned(objects, material))
+
+    assert wm.modal_handlers == [] and wm.event_timers == []
+    assert wm.progress is None
+    assert context.workspace.status_text is None
+    assert wm.undo_steps == ["object.material_assign_chunked"]
+    assert operator.reports == [({'INFO'}, "Assigned material to 5 objects, 5 data updates")]
+    assert context.scene.material_history[0].name == "Red"
+
+
+def test_modal_assignment_cancels_on_escape(context, preferences, clock):
+    objects = make_selection(5)
+    material = bpy.data.materials.new("Red")
+    wm = context.window_manager
+    preferences.chunk_budget = 1
+    clock.tick = 0.0012
+
+    bpy.ops.object.material_assign_chunked('INVOKE_DEFAULT', material_name="Red")
+    operator = wm.modal_handlers[0]
+    standin.send_event('TIMER')
+    standin.send_event('TIMER')
+
+    assert standin.send_event('ESC') == [{'FINISHED'}]
+
+    # the chunks done so far stay applied, in a single undo step
+    assert assigned(objects, material) == [True, True, False, False, False]
+    assert wm.modal_handlers == [] and wm.event_timers == []
+    assert wm.progress is None and context.workspace.status_text is None
+    assert wm.undo_steps == ["object.material_assign_chunked"]
+    assert ({'WARNING'}, "Cancelled after 2 of 5 items") in operator.reports
+
+
+def test_modal_assignment_of_a_missing_material(context):
+    make_selection(2)
+
+    assert bpy.ops.object.material_assign_chunked('INVOKE_DEFAULT', material_name="Missing") == {'CANCELLED'}
+
+    wm = context.window_manager
+    assert wm.modal_handlers == [] and wm.event_timers == [] and wm.progress is None
+    assert wm.undo_steps == []
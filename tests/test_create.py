@@ -0,0 +1,80 @@
+import bpy
+import pytest
+import standin
+
+from create_assign_material import core, operators
+
+
+@pytest.fixture
+def dialog(context, preferences):
+    """The create operator with live tweaking enabled, invoke opens its dialog"""
+    preferences.live_tweak = True
+    operator = bpy.utils.registered_operators["object.material_create_assign"]()
+    operator.shader = "Principled"
+    yield operator
+    operators.live_material = None
+
+
+def test_live_renames_use_numbered_suffixes(context, dialog):
+    standin.make_mesh_object("Grid", 4).select_set(True)
+    bpy.data.materials.new("Red")
+    dialog.invoke(context, bpy.types.Event('NONE'))
+
+    dialog.name = "Red"
+    dialog.name_update(context)
+
+    assert dialog.name == "Red_1"
+    assert operators.live_material.material.name == "Red_1"
+    assert "Red.001" not in bpy.data.materials
+
+
+def test_live_dialog_goes_through_the_queue(context, preferences, dialog):
+    object = standin.make_mesh_object("Grid", 4)
+    object.select_set(True)
+    preferences.queue_assignments = True
+
+    dialog.invoke(context, bpy.types.Event('NONE'))
+    assert len(core.assignment_queue) == 1
+    assert list(object.data.materials) == []
+
+    bpy.app.timers.run()
+    created = operators.live_material.material
+    assert list(object.data.materials) == [created]
+
+    # the queued delta follows the material a shader change replaces
+    dialog.shader = "Emission"
+    dialog.shader_update(context)
+    assert core.assignment_queue.deltas[0][2] is operators.live_material.material
+
+    # the queue commits the undo step
+    assert dialog.execute(context) == {'CANCELLED'}
+    assert len(core.assignment_queue) == 1
+    assert context.scene.material_history[0].name == dialog.name
+
+
+def test_cancelling_the_live_dialog_forgets_its_queued_assignment(context, preferences, dialog):
+    object = standin.make_mesh_object("Grid", 4)
+    object.select_set(True)
+    preferences.queue_assignments = True
+    earlier = bpy.data.materials.new("Earlier")
+    core.assignment_queue.record(context, earlier)
+
+    dialog.invoke(context, bpy.types.Event('NONE'))
+    bpy.app.timers.run()
+    dialog.cancel(context)
+
+    assert [delta[2] for delta in core.assignment_queue.deltas] == [earlier]
+    assert list(object.data.materials) == [earlier]
+    assert dialog.name not in bpy.data.materials
+
+
+def test_chunked_selections_are_not_assigned_live(context, preferences, dialog):
+    for i in range(3):
+        standin.make_mesh_object(f"Grid_{i}", 4).select_set(True)
+    preferences.chunked_threshold = 2
+    count = len(bpy.data.materials)
+
+    dialog.invoke(context, bpy.types.Event('NONE'))
+
+    assert operators.live_material is None
+    assert len(bpy.data.materials) == count
@@ -0,0 +1,80 @@
+import os
+
+import bpy
+import pytest
+import standin
+
+from create_assign_material import core
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """The addon's material library with an empty cache in tmp_path, and a directory of library files"""
+    directory = tmp_path / "library"
+    directory.mkdir()
+    monkeypatch.setattr(core.material_library, "files", None)
+    monkeypatch.setattr(core.material_library, "cache_path", lambda: str(tmp_path / "material_library.json"))
+    return directory
+
+
+def write_blend(filepath, materials):
+    filepath.write_text("\n".join(["BLENDER"] + materials), encoding="utf-8")
+
+
+def test_refresh_skips_unreadable_files(addon, library):
+    write_blend(library / "metals.blend", ["Steel", "Copper"])
+    (library / "broken.blend").write_bytes(b"\x00\x01 not a blend file")
+
+    assert core.material_library.refresh([str(library)]) == 1
+    assert list(core.material_library.failed) == [str(library / "broken.blend")]
+    assert sorted(core.material_library.entries) == ["Copper (metals.blend)", "Steel (metals.blend)"]
+
+    # fixed files are read on the next refresh
+    write_blend(library / "broken.blend", ["Oak"])
+    assert core.material_library.refresh([str(library)]) == 1
+    assert core.material_library.failed == {}
+    assert "Oak (broken.blend)" in core.material_library.entries
+
+
+def test_refresh_skips_files_removed_while_scanning(addon, library, monkeypatch):
+    write_blend(library / "metals.blend", ["Steel"])
+    write_blend(library / "woods.blend", ["Oak"])
+    getmtime = os.path.getmtime
+
+    def removed_woods(filepath):
+        if filepath.endswith("woods.blend"):
+            raise FileNotFoundError(2, "No such file or directory", filepath)
+        return getmtime(filepath)
+
+    monkeypatch.setattr(os.path, "getmtime", removed_woods)
+
+    assert core.material_library.refresh([str(library)]) == 1
+    assert list(core.material_library.failed) == [str(library / "woods.blend")]
+    assert list(core.material_library.entries) == ["Steel (metals.blend)"]
+
+
+def test_library_assign_reports_unreadable_files(context, preferences, library):
+    write_blend(library / "metals.blend", ["Steel"])
+    (library / "broken.blend").write_bytes(b"")
+    preferences.library_directories = str(library)
+    standin.make_mesh_object("Grid", 4).select_set(True)
+
+    operator = bpy.utils.registered_operators["object.material_library_assign"]()
+    assert operator.invoke(context, bpy.types.Event('NONE')) == {'RUNNING_MODAL'}
+
+    assert operator.reports == [({'INFO'}, "Indexed 1 library files"),
+                                ({'WARNING'}, "Could not read 1 library files: broken.blend")]
+
+
+def test_batch_processing_goes_on_after_unreadable_files(addon, tmp_path):
+    write_blend(tmp_path / "first.blend", ["Steel"])
+    (tmp_path / "broken.blend").write_bytes(b"\x00\x01 not a blend file")
+    write_blend(tmp_path / "last.blend", ["Oak"])
+    filepaths = [str(tmp_path / name) for name in ("first.blend", "missing.blend", "broken.blend", "last.blend")]
+    opened = []
+
+    totals = core.process_files(filepaths, lambda: opened.append(bpy.data.filepath) or [])
+
+    assert opened == [filepaths[0], filepaths[3]]
+    assert totals["files"] == 2 and totals["failed_files"] == 2
+    assert [call[0] for call in bpy.ops.calls].count("wm.save_mainfile") == 2
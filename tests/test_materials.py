@@ -0,0 +1,168 @@
+import numpy as np
+
+import bpy
+import standin
+
+from create_assign_material import core
+
+
+def test_create_copies_the_hidden_template(context):
+    color = (1.0, 0.5, 0.0, 1.0)
+    material = core.MaterialCreateAssignMethods().create_material("Orange", color, "Principled")
+
+    template = bpy.data.materials[".material_template_Principled"]
+    assert template.use_fake_user and not material.use_fake_user
+    assert material.name == "Orange"
+    assert material.diffuse_color == color
+    assert material.node_tree.nodes["Principled BSDF"].inputs[0].default_value == color
+    # the copy has its own node tree
+    assert template.node_tree.nodes["Principled BSDF"].inputs[0].default_value != color
+
+
+def test_create_other_shader_types(context):
+    methods = core.MaterialCreateAssignMethods()
+    color = (0.0, 1.0, 0.0, 1.0)
+
+    emission = methods.create_material("Glow", color, "Emission")
+    nodes = emission.node_tree.nodes
+    assert nodes.get("Principled BSDF") is None
+    assert nodes["Emission"].inputs[0].default_value == color
+    assert nodes["Emission"].inputs[1].default_value == 3.0
+    assert [(l.from_node.name, l.to_node.name) for l in emission.node_tree.links] == [("Emission", "Material Output")]
+
+    # unknown shader types fall back to principled
+    fallback = methods.create_material("Fallback", color, "Unknown")
+    assert fallback.node_tree.nodes.get("Principled BSDF") is not None
+
+
+def test_templates_are_created_once(context):
+    methods = core.MaterialCreateAssignMethods()
+    for i in range(5):
+        methods.create_material(f"Red_{i}", (1.0, 0.0, 0.0, 1.0), "Diffuse")
+
+    assert len([m for m in bpy.data.materials if m.name.startswith(".material_template_")]) == 1
+    assert len(bpy.data.materials) == 6
+
+
+def test_unique_names_continue_after_the_highest_suffix(context):
+    assert core.create_unique_name("Metal") == "Metal"
+
+    for name in ("Metal", "Metal_3", "Metal_7", "Wood_2"):
+        bpy.data.materials.new(name)
+    core.invalidate_material_caches()
+
+    assert core.create_unique_name("Metal") == "Metal_8"
+    assert core.create_unique_name("Metal_3") == "Metal_8"
+    assert core.create_unique_name("Wood") == "Wood"
+    assert core.create_unique_name("Wood_2") == "Wood_3"
+
+
+def test_unique_names_follow_created_materials(context):
+    methods = core.MaterialCreateAssignMethods()
+    names = []
+    for _ in range(3):
+        material = methods.create_material(core.create_unique_name("Metal"), (1.0, 1.0, 1.0, 1.0), "Principled")
+        names.append(material.name)
+
+    assert names == ["Metal", "Metal_1", "Metal_2"]
+
+
+def test_unique_names_notice_removed_materials(context):
+    material = bpy.data.materials.new("Metal")
+    assert core.create_unique_name("Metal") == "Metal_1"
+
+    # removals outside the depsgraph only change the number of materials
+    bpy.data.materials.remove(material)
+    assert core.create_unique_name("Metal") == "Metal"
+
+
+def test_cleanup_removes_unused_and_merges_duplicate_slots(context):
+    object = standin.make_mesh_object("Grid", 6)
+    red, blue, green = (bpy.data.materials.new(name) for name in ("Red", "Blue", "Green"))
+    for material in (red, green, blue, red):
+        object.data.materials.append(material)
+    object.data.polygons.foreach_set("material_index", np.array([0, 2, 3, 2, 0, 3], dtype=np.int32))
+
+    assert core.cleanup_material_slots([object]) == 2
+
+    assert list(object.data.materials) == [red, blue]
+    assert standin.material_indices(object.data).tolist() == [0, 1, 0, 1, 0, 0]
+
+
+def test_cleanup_keeps_slots_that_differ_by_object_link(context):
+    object = standin.make_mesh_object("Grid", 2)
+    red, blue = bpy.data.materials.new("Red"), bpy.data.materials.new("Blue")
+    object.data.materials.append(red)
+    object.data.materials.append(red)
+    object.material_slots[1].link = 'OBJECT'
+    object.material_slots[1].material = blue
+    object.data.polygons.foreach_set("material_index", np.array([0, 1], dtype=np.int32))
+
+    assert core.cleanup_material_slots([object]) == 0
+    assert [slot.material for slot in object.material_slots] == [red, blue]
+
+
+def test_cleanup_in_edit_mode(context):
+    object = standin.make_mesh_object("Grid", 4)
+    object.select_set(True)
+    red, blue = bpy.data.materials.new("Red"), bpy.data.materials.new("Blue")
+    for material in (red, blue, red):
+        object.data.materials.append(material)
+    object.data.polygons.foreach_set("material_index", np.array([2, 2, 0, 2], dtype=np.int32))
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    assert core.cleanup_material_slots([object]) == 2
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    assert list(object.data.materials) == [red]
+    assert not standin.material_indices(object.data).any()
+
+
+def make_duplicates(names, colors):
+    methods = core.MaterialCreateAssignMethods()
+    materials = [methods.create_material(name, color, "Principled") for name, color in zip(names, colors)]
+    object = standin.make_mesh_object("Grid", len(materials))
+    for material in materials:
+        object.data.materials.append(material)
+    object.data.polygons.foreach_set("material_index", np.arange(len(materials), dtype=np.int32))
+    return object, materials
+
+
+def test_merge_follows_shading_updates(context):
+    object, (red, other) = make_duplicates(["Red", "Red_1"], [(1.0, 0.0, 0.0, 1.0), (0.0, 0.0, 1.0, 1.0)])
+
+    assert core.merge_duplicate_materials([red, other]) == (0, 0)
+
+    other.diffuse_color = red.diffuse_color
+    other.node_tree.nodes["Principled BSDF"].inputs[0].default_value = red.diffuse_color
+    standin.depsgraph_update(other.node_tree)
+
+    assert core.merge_duplicate_materials([red, other]) == (1, 1)
+    assert list(object.data.materials) == [red]
+    assert bpy.data.materials.get("Red_1") is None
+
+
+def test_merge_reuses_signatures_until_the_shading_changes(context, monkeypatch):
+    object, materials = make_duplicates(["Red", "Blue"], [(1.0, 0.0, 0.0, 1.0), (0.0, 0.0, 1.0, 1.0)])
+    signatures = []
+    monkeypatch.setattr(core, "material_signature", lambda material: signatures.append(material) or material.name)
+
+    core.merge_duplicate_materials(materials)
+    # e.g. moving the object
+    standin.depsgraph_update(*materials, object, shading=False)
+    core.merge_duplicate_materials(materials)
+    assert signatures == materials
+
+    standin.depsgraph_update(materials[1])
+    core.merge_duplicate_materials(materials)
+    assert signatures == materials + [materials[1]]
+
+
+def test_merge_ignores_node_names(context):
+    object, (red, other) = make_duplicates(["Red", "Red_1"], [(1.0, 0.0, 0.0, 1.0)] * 2)
+    nodes = other.node_tree.nodes
+    nodes["Principled BSDF"].name = "Principled BSDF.001"
+    nodes["Material Output"].name = "Output"
+
+    assert core.merge_duplicate_materials([red, other]) == (1, 1)
+    assert list(object.data.materials) == [red]
@@ -0,0 +1,123 @@
+import bpy
+import standin
+
+from create_assign_material import core, ui
+
+
+def draw_list(context):
+    menu = ui.VIEW3D_MT_MaterialList(bpy.types.UILayout())
+    menu.draw(context)
+    return menu.layout
+
+
+def listed_names(layout):
+    return [item[2] for item in layout.drawn
+            if item[0] == "operator" and item[1] == "object.material_assign" and not item[4].show_list_dialog]
+
+
+def test_menu_lists_one_page_without_hidden_materials(context, preferences):
+    for i in range(120):
+        bpy.data.materials.new(f"Material_{i:03}")
+    core.MaterialCreateAssignMethods().create_material("Created", (1.0, 1.0, 1.0, 1.0), "Principled")
+
+    layout = draw_list(context)
+
+    names = listed_names(layout)
+    assert len(names) == preferences.max_materials_in_menu
+    assert names == sorted(names, key=str.lower)
+    assert not any(name.startswith(".") for name in names)
+    assert ("label", None, "1 / 3", 'NONE', None) in layout.drawn
+
+
+def test_menu_pages(context, preferences):
+    preferences.max_materials_in_menu = 10
+    for i in range(25):
+        bpy.data.materials.new(f"Material_{i:02}")
+
+    context.window_manager.material_menu_page = 2
+    assert listed_names(draw_list(context)) == [f"Material_{i:02}" for i in range(20, 25)]
+
+    # pages past the end show the last page
+    context.window_manager.material_menu_page = 7
+    assert listed_names(draw_list(context))[0] == "Material_20"
+
+
+def test_recently_used_materials_come_first(context):
+    materials = [bpy.data.materials.new(name) for name in ("Alpha", "Beta", "Gamma", "Delta")]
+    context.window_manager.material_menu_page = 1
+
+    core.remember_material(context, materials[2])
+    core.remember_material(context, materials[0])
+
+    assert listed_names(draw_list(context)) == ["Alpha", "Gamma", "Beta", "Delta"]
+    assert context.window_manager.material_menu_page == 0
+
+
+def test_menu_follows_removed_materials(context):
+    materials = [bpy.data.materials.new(f"Material_{i}") for i in range(3)]
+    assert len(listed_names(draw_list(context))) == 3
+
+    bpy.data.materials.remove(materials[1])
+
+    assert listed_names(draw_list(context)) == ["Material_0", "Material_2"]
+
+
+def test_previews_render_in_timer_ticks(context, preferences):
+    for i in range(6):
+        bpy.data.materials.new(f"Material_{i}")
+
+    layout = draw_list(context)
+    assert {item[3] for item in layout.drawn if item[1] == "object.material_assign"} == {'VIEWZOOM', 'MATERIAL_DATA'}
+
+    # one timer for all queued previews, rendering previews_per_tick at a time
+    assert len(bpy.app.timers.functions) == 1 + bpy.app.timers.is_registered(ui.warm_up_caches)
+    bpy.app.timers.run()
+    rendered = [m for m in bpy.data.materials if m.preview is not None]
+    assert len(rendered) == preferences.previews_per_tick
+
+    bpy.app.timers.run()
+    assert not bpy.app.timers.is_registered(ui.material_previews.timer)
+    layout = draw_list(context)
+    assert all(isinstance(item[3], int) for item in layout.drawn if item[1] == "object.material_assign" and item[2] != "Search")
+
+
+def test_clearing_previews_unregisters_the_timer(context):
+    bpy.data.materials.new("Material")
+    draw_list(context)
+    assert bpy.app.timers.is_registered(ui.material_previews.timer)
+
+    ui.material_previews.clear()
+
+    assert not bpy.app.timers.is_registered(ui.material_previews.timer)
+
+
+def test_search_ranks_prefix_matches_first(context):
+    for name in ("Metal", "Gunmetal", "Metal_Rough", "Wood", "Meta"):
+        bpy.data.materials.new(name)
+
+    results = core.material_search.ensure().query("metal")
+
+    assert results[:2] == ["Metal", "Metal_Rough"]
+    assert "Gunmetal" in results and "Wood" not in results
+    # typos still find fuzzy matches
+    assert "Metal" in core.material_search.query("metl")
+
+
+def test_search_follows_removals_outside_the_depsgraph(context):
+    material = bpy.data.materials.new("Metal")
+    assert core.material_search.ensure().query("metal") == ["Metal"]
+
+    bpy.data.materials.remove(material)
+
+    assert core.material_search.ensure().query("metal") == []
+
+
+def test_search_follows_depsgraph_renames(context):
+    material = bpy.data.materials.new("Metal")
+    core.material_search.ensure()
+
+    material.name = "Steel"
+    standin.depsgraph_update(material)
+
+    assert core.material_search.ensure().query("steel") == ["Steel"]
+    assert core.material_search.query("metal") == []
@@ -0,0 +1,107 @@
+import numpy as np
+
+import bpy
+import pytest
+import standin
+
+from mathutils import Matrix, Vector
+
+from create_assign_material import picking
+
+
+class FakeTree():
+    """Hits the top of the object's bounding box, records which objects got a tree"""
+    built = []
+
+    def __init__(self, object):
+        corners = np.array(object.bound_box)
+        self.low, self.high = corners.min(axis=0), corners.max(axis=0)
+
+    @classmethod
+    def FromObject(cls, object, depsgraph):
+        cls.built.append(object.name)
+        return cls(object)
+
+    def ray_cast(self, origin, direction):
+        if not ((self.low[:2] <= origin[:2]) & (origin[:2] <= self.high[:2])).all():
+            return None, None, None, None
+        location = Vector((origin[0], origin[1], self.high[2]))
+        return location, None, 0, (location - Vector(origin)).length
+
+
+@pytest.fixture
+def trees(monkeypatch):
+    FakeTree.built = []
+    monkeypatch.setattr(picking, "BVHTree", FakeTree)
+    yield FakeTree.built
+    picking.pick_cache.clear()
+
+
+def make_tile(name, x, z=0.0, material=None):
+    """A unit square at (x, 0, z) with one face"""
+    object = standin.make_mesh_object(name, 1)
+    mesh = object.data
+    mesh.vertices.add(4)
+    mesh.vertices.foreach_set("co", np.array([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)], dtype=np.float32).ravel())
+    object.matrix_world = Matrix.Translation((x, 0.0, z))
+    mesh.materials.append(material or bpy.data.materials.new(name))
+    return object
+
+
+def cast(context, x, y):
+    depsgraph = context.evaluated_depsgraph_get()
+    return picking.pick_cache.ray_cast(context, depsgraph, Vector((x, y, 10.0)), Vector((0.0, 0.0, -1.0)))
+
+
+def test_ray_box_distance():
+    assert picking.ray_box_distance((0.5, 0.5, 10.0), (0.0, 0.0, -1.0), (0, 0, 0), (1, 1, 1)) == 9.0
+    assert picking.ray_box_distance((0.5, 0.5, 0.5), (0.0, 0.0, -1.0), (0, 0, 0), (1, 1, 1)) == 0.0
+    assert picking.ray_box_distance((2.0, 0.5, 10.0), (0.0, 0.0, -1.0), (0, 0, 0), (1, 1, 1)) is None
+    # pointing away
+    assert picking.ray_box_distance((0.5, 0.5, 10.0), (0.0, 0.0, 1.0), (0, 0, 0), (1, 1, 1)) is None
+
+
+def test_trees_are_built_only_for_objects_the_ray_crosses(context, trees):
+    tiles = [make_tile(f"Tile_{i}", i * 5.0) for i in range(3)]
+
+    assert cast(context, 5.5, 0.5) is tiles[1].data.materials[0]
+    assert trees == ["Tile_1"]
+    assert cast(context, 20.0, 0.5) is None
+    assert trees == ["Tile_1"]
+
+
+def test_boxes_behind_the_closest_hit_are_skipped(context, trees):
+    make_tile("Low", 0.0, z=-5.0)
+    high = make_tile("High", 0.0, z=0.0)
+
+    assert cast(context, 0.5, 0.5) is high.data.materials[0]
+    assert trees == ["High"]
+
+
+def test_entries_follow_objects_not_names(context, trees):
+    tile = make_tile("Tile", 0.0)
+    cast(context, 0.5, 0.5)
+
+    tile.name = "Renamed"
+    other = make_tile("Tile", 5.0)
+    assert cast(context, 0.5, 0.5) is tile.data.materials[0]
+    assert cast(context, 5.5, 0.5) is other.data.materials[0]
+    assert trees == ["Tile", "Tile"]
+
+    # moving keeps the tree, the matrices are taken again
+    tile.matrix_world = Matrix.Translation((10.0, 0.0, 0.0))
+    standin.depsgraph_update(tile, geometry=False)
+    assert cast(context, 10.5, 0.5) is tile.data.materials[0]
+    assert len(trees) == 2
+
+
+def test_the_cache_is_freed_when_the_pick_ends(context, trees):
+    make_tile("Tile", 0.0).select_set(True)
+    cast(context, 0.5, 0.5)
+    assert picking.pick_cache.entries
+
+    operator = bpy.utils.registered_operators["object.material_pick"]()
+    assert operator.invoke(context, bpy.types.Event('NONE')) == {'RUNNING_MODAL'}
+    assert operator.modal(context, bpy.types.Event('ESC')) == {'CANCELLED'}
+
+    assert picking.pick_cache.entries == {}
@@ -0,0 +1,23 @@
+import sys
+
+from create_assign_material import core, operators, profiling
+
+
+def test_enable_wraps_imported_functions_of_an_extension(addon, monkeypatch):
+    # installed as an extension the package lives below bl_ext.<repository>
+    package = "bl_ext.user_default.create_assign_material"
+    for name, module in list(sys.modules.items()):
+        if name == "create_assign_material" or name.startswith("create_assign_material."):
+            monkeypatch.setitem(sys.modules, package + name[len("create_assign_material"):], module)
+    monkeypatch.setattr(profiling, "__package__", package)
+    function = core.cleanup_material_slots
+
+    profiler = profiling.Profiler()
+    profiler.enable()
+    try:
+        assert core.cleanup_material_slots is not function
+        assert operators.cleanup_material_slots is core.cleanup_material_slots
+    finally:
+        profiler.disable()
+
+    assert operators.cleanup_material_slots is function
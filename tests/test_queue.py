@@ -0,0 +1,86 @@
+import bpy
+import standin
+
+from create_assign_material import core
+
+
+def test_queued_assignments_are_written_on_the_timer_tick(context):
+    object = standin.make_mesh_object("Grid", 4)
+    object.select_set(True)
+    material = bpy.data.materials.new("Red")
+
+    core.assignment_queue.record(context, material)
+    assert list(object.data.materials) == []
+    assert len(core.assignment_queue) == 1
+
+    bpy.app.timers.run()
+    assert list(object.data.materials) == [material]
+
+    assert core.assignment_queue.discard() == (1, 0)
+    assert list(object.data.materials) == []
+
+
+def test_discard_keeps_data_whose_topology_changed(context):
+    changed = standin.make_mesh_object("Changed", 4)
+    other = standin.make_mesh_object("Other", 4)
+    for object in (changed, other):
+        object.select_set(True)
+    material = bpy.data.materials.new("Red")
+
+    core.assignment_queue.record(context, material)
+    bpy.app.timers.run()
+    # e.g. an extrude in edit mode after the write
+    changed.data.polygons.add(2)
+
+    assert core.assignment_queue.discard() == (2, 1)
+    assert list(changed.data.materials) == [material]
+    assert list(other.data.materials) == []
+    assert len(core.assignment_queue) == 0
+
+
+def test_undo_drops_written_deltas(context):
+    object = standin.make_mesh_object("Grid", 4)
+    object.select_set(True)
+    core.assignment_queue.record(context, bpy.data.materials.new("Red"))
+    bpy.app.timers.run()
+
+    # undoing the step another operator pushed in between reverts the file, the deltas refer to a lost state
+    for handler in bpy.app.handlers.undo_post:
+        handler(None)
+
+    assert len(core.assignment_queue) == 0
+    assert not bpy.app.timers.is_registered(core.assignment_queue.timer)
+
+
+def test_data_without_elements_is_assigned_directly(context):
+    object = standin.make_mesh_object("Grid", 4)
+    empty_mesh = bpy.data.objects.new("Empty Mesh", bpy.data.meshes.new("Empty Mesh"))
+    metaball = bpy.data.objects.new("Meta", bpy.data.metaballs.new("Meta"))
+    for selected in (object, empty_mesh, metaball):
+        selected.select_set(True)
+    material = bpy.data.materials.new("Red")
+
+    assert core.assignment_queue.record(context, material) == [empty_mesh, metaball]
+
+    # nothing to hold a delta, so these don't wait for the tick
+    assert list(empty_mesh.data.materials) == [material]
+    assert list(metaball.data.materials) == [material]
+    assert len(core.assignment_queue) == 1
+
+    bpy.app.timers.run()
+    assert list(object.data.materials) == [material]
+
+
+def test_assign_operator_reports_direct_assignments(context, preferences):
+    preferences.queue_assignments = True
+    metaball = bpy.data.objects.new("Meta", bpy.data.metaballs.new("Meta"))
+    metaball.select_set(True)
+    material = bpy.data.materials.new("Red")
+
+    operator = bpy.utils.registered_operators["object.material_assign"]()
+    operator.material_name = "Red"
+    # the queue commits the undo step
+    assert operator.execute(context) == {'CANCELLED'}
+
+    assert list(metaball.data.materials) == [material]
+    assert operator.reports == [({'INFO'}, "Assigned directly to 1 objects without faces or splines to queue")]